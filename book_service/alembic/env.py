@@ -5,6 +5,8 @@ from sqlalchemy import pool
 from src.config import settings
 from src.database import Base
 from src.books.models import BookModel #noqa
+from src.outbox.models import OutboxEventModel #noqa
+from src.reconciliation.models import KeyDigestBucketModel #noqa
 from alembic import context
 
 config = context.config
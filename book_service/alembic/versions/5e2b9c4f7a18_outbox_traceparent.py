@@ -0,0 +1,28 @@
+"""outbox_traceparent
+
+Revision ID: 5e2b9c4f7a18
+Revises: 8d4e2a6b1c93
+Create Date: 2026-10-19 18:42:11.380517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b9c4f7a18'
+down_revision: Union[str, None] = '8d4e2a6b1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outbox_events', sa.Column('traceparent', sa.String(length=55), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('outbox_events', 'traceparent')
@@ -0,0 +1,28 @@
+"""outbox_operation_id
+
+Revision ID: 8d4e2a6b1c93
+Revises: 3b1f0c7d9a2e
+Create Date: 2026-10-19 14:05:27.604112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e2a6b1c93'
+down_revision: Union[str, None] = '3b1f0c7d9a2e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outbox_events', sa.Column('operation_id', sa.UUID(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('outbox_events', 'operation_id')
@@ -0,0 +1,83 @@
+"""key_digest_buckets
+
+Revision ID: 9c7d3e1f2b64
+Revises: 5e2b9c4f7a18
+Create Date: 2026-10-19 21:04:37.512843
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c7d3e1f2b64'
+down_revision: Union[str, None] = '5e2b9c4f7a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Корзина — первые три hex-символа ключа; хеш — сумма первых 60 бит md5 ключей,
+# как в common.reconciliation.digest.key_hash. Ключи books не изменяются, поэтому
+# триггеры нужны только на INSERT, DELETE и TRUNCATE.
+BUCKET_ROWS = """
+    SELECT substr(replace(id::text, '-', ''), 1, 3) AS bucket,
+           {sign} * count(*) AS count,
+           {sign} * sum(('x' || substr(md5(id::text), 1, 15))::bit(60)::bigint) AS hash
+    FROM {source}
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+# ORDER BY в BUCKET_ROWS: параллельные транзакции обновляют корзины в одном порядке и не взаимоблокируются.
+APPLY_FUNCTION = """
+CREATE FUNCTION books_digest_{name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO key_digest_buckets AS b (bucket, count, hash)
+    {rows}
+    ON CONFLICT (bucket) DO UPDATE SET count = b.count + EXCLUDED.count, hash = b.hash + EXCLUDED.hash;
+    RETURN NULL;
+END $$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('key_digest_buckets',
+    sa.Column('bucket', sa.String(length=3), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('hash', sa.Numeric(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket')
+    )
+    # Записи в books ждут конца миграции: заполнение и триггеры видят одно и то же множество ключей.
+    op.execute("LOCK TABLE books IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(APPLY_FUNCTION.format(name="insert", rows=BUCKET_ROWS.format(sign=1, source="inserted")))
+    op.execute(APPLY_FUNCTION.format(name="delete", rows=BUCKET_ROWS.format(sign=-1, source="deleted")))
+    op.execute("""
+        CREATE FUNCTION books_digest_truncate() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM key_digest_buckets;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER books_digest_insert AFTER INSERT ON books
+        REFERENCING NEW TABLE AS inserted FOR EACH STATEMENT EXECUTE FUNCTION books_digest_insert()
+    """)
+    op.execute("""
+        CREATE TRIGGER books_digest_delete AFTER DELETE ON books
+        REFERENCING OLD TABLE AS deleted FOR EACH STATEMENT EXECUTE FUNCTION books_digest_delete()
+    """)
+    op.execute("""
+        CREATE TRIGGER books_digest_truncate AFTER TRUNCATE ON books
+        FOR EACH STATEMENT EXECUTE FUNCTION books_digest_truncate()
+    """)
+    op.execute("INSERT INTO key_digest_buckets (bucket, count, hash)" + BUCKET_ROWS.format(sign=1, source="books"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in ("insert", "delete", "truncate"):
+        op.execute(f"DROP TRIGGER books_digest_{operation} ON books")
+        op.execute(f"DROP FUNCTION books_digest_{operation}()")
+    op.drop_table('key_digest_buckets')
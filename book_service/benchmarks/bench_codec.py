@@ -0,0 +1,60 @@
+"""Кодирование/декодирование BookEvent: JSON против бинарного формата v1, по одному и конвертами.
+
+    python -m benchmarks.bench_codec --events 100000 --envelope 100 --repeat 5
+
+Каждая скорость — лучшая из --repeat попыток: на общей машине худшие попытки меряют соседей.
+"""
+import argparse
+import time
+from typing import Callable, List, Tuple
+from uuid import uuid4
+from common.rabbit.codec import decode_event, decode_events, encode_event, encode_events
+from common.rabbit.schemas import BookEvent
+
+
+def best_seconds(work: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench(label: str, events: int, encode: Callable[[], List[Tuple[bytes, str]]],
+          decode: Callable[[bytes, str], object], repeat: int) -> None:
+    encoded = encode()
+    encode_s = best_seconds(encode, repeat)
+
+    def decode_all() -> None:
+        for body, content_type in encoded:
+            decode(body, content_type)
+
+    decode_s = best_seconds(decode_all, repeat)
+    size = sum(len(body) for body, _ in encoded) / events
+    print(f"{label:<11} encode {events / encode_s:>10.0f} ev/s  "
+          f"decode {events / decode_s:>10.0f} ev/s  {size:>5.1f} bytes/event")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--envelope", type=int, default=100, help="Событий в конверте")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = [BookEvent(book_id=uuid4(), action=("created", "deleted")[i % 2]) for i in range(args.events)]
+    for encoding in ("json", "binary"):
+        bench(encoding, len(events), lambda: [encode_event(event, encoding) for event in events],
+              decode_event, args.repeat)
+
+    # В конверте у событий одно действие.
+    created = [BookEvent(book_id=event.book_id, action="created") for event in events]
+    batches = [created[i:i + args.envelope] for i in range(0, len(created), args.envelope)]
+    for encoding in ("json", "binary"):
+        bench(f"{encoding} ×{args.envelope}", len(created), lambda: [encode_events(batch, encoding) for batch in batches],
+              decode_events, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Горячие функции book_service на каждый запрос и каждое событие."""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from starlette.requests import Request
+
+from common.benchmarks.harness import benchmark
+from benchmarks.memory import MemoryBookRepository, MemoryOutboxRepository
+from src.auth.auth import security
+from src.auth.permissions import require_authenticated
+from src.books.models import BookModel
+from src.books.schemas import Book, BookBase, BookCreate, BookUpdate
+from src.books.service import BookService
+from common.monitoring.http import HTTPMetricsMiddleware
+from common.rabbit.codec import decode_event, decode_events, encode_event, encode_events
+from common.rabbit.schemas import BookEvent
+
+PAGE_SIZE = 100
+
+BOOK_PAYLOAD = {
+    "title": "Мастер и Маргарита",
+    "author": "Михаил Булгаков",
+    "isbn": "9785170000000",
+    "description": "Роман о визите дьявола в Москву 1930-х годов.",
+    "language": "ru",
+    "genre": "fiction",
+}
+BOOK_JSON = BookCreate(**BOOK_PAYLOAD).model_dump_json().encode()
+BOOK_CREATE = BookCreate(**BOOK_PAYLOAD)
+BOOK_MODEL = BookModel(id=uuid4(), **BOOK_PAYLOAD)
+
+
+@benchmark("schemas.validate_isbn")
+def validate_isbn():
+    BookBase.validate_isbn("9785170000000")
+
+
+@benchmark("schemas.BookCreate.model_validate")
+def book_create_validate():
+    BookCreate.model_validate(BOOK_PAYLOAD)
+
+
+@benchmark("schemas.BookCreate.model_validate_json")
+def book_create_validate_json():
+    BookCreate.model_validate_json(BOOK_JSON)
+
+
+@benchmark("schemas.Book.model_validate(orm)")
+def book_from_orm():
+    Book.model_validate(BOOK_MODEL)
+
+
+EVENT = BookEvent(book_id=uuid4(), action="created", published_at=datetime.now(timezone.utc))
+EVENTS = [BookEvent(book_id=uuid4(), action="created") for _ in range(PAGE_SIZE)]
+PUBLISHED_AT = datetime.now(timezone.utc)
+ENCODED = {encoding: encode_event(EVENT, encoding) for encoding in ("json", "binary")}
+ENCODED_ENVELOPES = {encoding: encode_events(EVENTS, encoding, PUBLISHED_AT) for encoding in ("json", "binary")}
+
+
+def _register_codec(encoding: str):
+    body, content_type = ENCODED[encoding]
+    envelope, envelope_content_type = ENCODED_ENVELOPES[encoding]
+
+    benchmark(f"codec.encode_event[{encoding}]")(lambda: encode_event(EVENT, encoding))
+    benchmark(f"codec.decode_event[{encoding}]")(lambda: decode_event(body, content_type))
+    benchmark(f"codec.encode_events[{encoding},{PAGE_SIZE}]")(lambda: encode_events(EVENTS, encoding, PUBLISHED_AT))
+    benchmark(f"codec.decode_events[{encoding},{PAGE_SIZE}]")(lambda: decode_events(envelope, envelope_content_type))
+
+
+for _encoding in ("json", "binary"):
+    _register_codec(_encoding)
+
+
+ACCESS_TOKEN = security.create_access_token(uid=str(uuid4()), data={"role": "user"})
+ACCESS_TOKEN_REQUIRED = security.access_token_required
+REQUEST_SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/books/",
+    "query_string": b"",
+    "headers": [(b"authorization", f"Bearer {ACCESS_TOKEN}".encode())],
+}
+
+
+@benchmark("auth.access_token_required")
+async def access_token_required():
+    await ACCESS_TOKEN_REQUIRED(Request(REQUEST_SCOPE))
+
+
+@benchmark("auth.require_authenticated")
+async def authenticated():
+    await require_authenticated(await ACCESS_TOKEN_REQUIRED(Request(REQUEST_SCOPE)))
+
+
+PAGE = [BookModel(id=uuid4(), **{**BOOK_PAYLOAD, "isbn": f"{9780000000000 + index}"}) for index in range(PAGE_SIZE)]
+read_service = BookService(MemoryBookRepository(PAGE), MemoryOutboxRepository())
+write_repo, write_outbox = MemoryBookRepository(), MemoryOutboxRepository()
+write_service = BookService(write_repo, write_outbox)
+BOOK_ID = PAGE[0].id
+BOOK_UPDATE = BookUpdate(title="Белая гвардия")
+
+
+@benchmark("service.get_book")
+async def get_book():
+    await read_service.get_book(BOOK_ID)
+
+
+@benchmark(f"service.list_books[{PAGE_SIZE}]")
+async def list_books():
+    await read_service.list_books(limit=PAGE_SIZE)
+
+
+@benchmark(f"service.list_book_rows[{PAGE_SIZE}]")
+async def list_book_rows():
+    await read_service.list_book_rows(limit=PAGE_SIZE)
+
+
+@benchmark("service.update_book")
+async def update_book():
+    await read_service.update_book(BOOK_ID, BOOK_UPDATE)
+
+
+@benchmark("service.create_book+delete_book")
+async def create_and_delete_book():
+    book = await write_service.create_book(BOOK_CREATE)
+    await write_service.delete_book(book.id)
+    write_outbox.events.clear()
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+
+
+async def _noop_send(message):
+    pass
+
+
+metrics_middleware = HTTPMetricsMiddleware(_noop_app)
+METRICS_SCOPE = {"type": "http", "method": "GET", "path": "/books/"}
+
+
+@benchmark("monitoring.HTTPMetricsMiddleware.record")
+def record_request_metrics():
+    metrics_middleware.record("GET", "/books/{book_id}", 200, 0.0042)
+
+
+@benchmark("monitoring.HTTPMetricsMiddleware(noop app)")
+async def metrics_middleware_call():
+    await metrics_middleware(METRICS_SCOPE, None, _noop_send)
+
+
+@benchmark("monitoring.noop app")
+async def noop_app_call():
+    await _noop_app(METRICS_SCOPE, None, _noop_send)
@@ -0,0 +1,87 @@
+"""Пропускная способность публикации событий с publisher confirms.
+
+Сравнивает последовательный `send_event` (каждая публикация ждёт свой Basic.Ack)
+с конвейерным `publish_many` на заглушке брокера с заданным RTT подтверждения.
+
+    python -m benchmarks.bench_publish --events 5000 --rtt-ms 1
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from src.rabbit.producer import RabbitMQProducer
+from common.rabbit.schemas import BookEvent
+
+
+class BrokerStandIn:
+    """Exchange-заглушка: запись в канал сериализована, Ack приходит через `rtt` секунд."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.received = 0
+        self._channel_lock = asyncio.Lock()
+
+    async def publish(self, message, routing_key):
+        async with self._channel_lock:
+            self.received += 1
+        await asyncio.sleep(self.rtt)
+
+
+class StubPool:
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def exchange_for(self, key):
+        return self.exchange
+
+
+def make_producer(rtt: float, max_in_flight: int) -> RabbitMQProducer:
+    producer = RabbitMQProducer("amqp://stand-in", max_in_flight=max_in_flight)
+    producer.pool = StubPool(BrokerStandIn(rtt))
+    producer.is_connected = AsyncMock(return_value=True)
+    return producer
+
+
+async def bench_sequential(events: list[BookEvent], rtt: float) -> tuple[float, dict]:
+    producer = make_producer(rtt, max_in_flight=1)
+    started = time.perf_counter()
+    for event in events:
+        await producer.send_event(event.book_id, event.action)
+    return time.perf_counter() - started, producer.stats.snapshot()
+
+
+async def bench_pipelined(events: list[BookEvent], rtt: float, batch: int, max_in_flight: int) -> tuple[float, dict]:
+    producer = make_producer(rtt, max_in_flight=max_in_flight)
+    started = time.perf_counter()
+    for i in range(0, len(events), batch):
+        await producer.publish_many(events[i:i + batch])
+    return time.perf_counter() - started, producer.stats.snapshot()
+
+
+def report(name: str, count: int, elapsed: float, stats: dict) -> None:
+    print(f"{name:<28} {count / elapsed:>10.0f} events/s  "
+          f"confirm avg {stats['confirm_latency_avg_ms']:.2f} ms  max in flight {stats['max_in_flight']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    args = parser.parse_args()
+
+    rtt = args.rtt_ms / 1000
+    events = [BookEvent(book_id=uuid4(), action="created") for _ in range(args.events)]
+
+    sequential_events = events[:max(1, min(len(events), int(2 / max(rtt, 1e-4))))]
+    elapsed, stats = await bench_sequential(sequential_events, rtt)
+    report("sequential send_event", len(sequential_events), elapsed, stats)
+
+    elapsed, stats = await bench_pipelined(events, rtt, args.batch, args.max_in_flight)
+    report(f"publish_many(batch={args.batch})", len(events), elapsed, stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""Репозитории в памяти для бенчмарков сервисного слоя: без БД замеряется только код сервиса."""
+from datetime import timedelta
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from src.books.models import BookModel
+from src.books.repository import BOOK_COLUMNS, IBookRepository
+from src.outbox.models import OutboxEventModel
+from src.outbox.repository import IOutboxRepository
+from common.reconciliation.digest import RangeDigest
+
+_ROW_KEYS = tuple(column.key for column in BOOK_COLUMNS)
+
+
+class MemoryBookRepository(IBookRepository):
+    def __init__(self, books: List[BookModel] = ()):
+        self.books: Dict[UUID, BookModel] = {book.id: book for book in books}
+
+    async def create(self, book: BookModel) -> BookModel:
+        self.books[book.id] = book
+        return book
+
+    async def create_many(self, books: List[BookModel]) -> List[BookModel]:
+        for book in books:
+            self.books[book.id] = book
+        return books
+
+    def _filtered(self, skip: int, limit: int, language: Optional[str], author: Optional[str]) -> List[BookModel]:
+        books = [book for book in self.books.values()
+                 if (language is None or book.language == language) and (author is None or book.author == author)]
+        return books[skip:skip + limit]
+
+    async def get_all(self, skip: int = 0, limit: int = 100, language: Optional[str] = None,
+                      author: Optional[str] = None) -> List[BookModel]:
+        return self._filtered(skip, limit, language, author)
+
+    async def get(self, id: UUID) -> BookModel | None:
+        return self.books.get(id)
+
+    async def get_all_rows(self, skip: int = 0, limit: int = 100, language: Optional[str] = None,
+                           author: Optional[str] = None) -> List[Dict]:
+        return [{key: getattr(book, key) for key in _ROW_KEYS} for book in self._filtered(skip, limit, language, author)]
+
+    async def get_row(self, id: UUID) -> Dict | None:
+        book = self.books.get(id)
+        return {key: getattr(book, key) for key in _ROW_KEYS} if book is not None else None
+
+    async def update(self, book: BookModel) -> BookModel:
+        self.books[book.id] = book
+        return book
+
+    async def delete(self, book_id: UUID) -> int:
+        return 1 if self.books.pop(book_id, None) is not None else 0
+
+    async def delete_many(self, book_ids: List[UUID]) -> List[UUID]:
+        return [book_id for book_id in book_ids if self.books.pop(book_id, None) is not None]
+
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        return []
+
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        return []
+
+
+class MemoryOutboxRepository(IOutboxRepository):
+    """Копит события без ограничения; бенчмарк сам очищает `events` между сериями."""
+
+    def __init__(self):
+        self.events: List[OutboxEventModel] = []
+
+    async def add(self, book_id: UUID, action: str, operation_id: Optional[UUID] = None) -> None:
+        self.events.append(OutboxEventModel(book_id=book_id, action=action, operation_id=operation_id))
+
+    async def claim_batch(self, limit: int) -> List[OutboxEventModel]:
+        return self.events[:limit]
+
+    async def mark_sent(self, ids: List[int]) -> None:
+        pass
+
+    async def purge_sent(self, retention: timedelta) -> int:
+        return 0
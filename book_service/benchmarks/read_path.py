@@ -0,0 +1,86 @@
+"""CPU на один запрос страницы из 100 книг: ORM + двойная валидация против быстрого пути.
+
+Запуск из каталога book_service: `python -m benchmarks.read_path [--requests N]`.
+БД — SQLite в памяти с той же моделью BookModel, так что в замер входят загрузка строк,
+identity map, валидация и сериализация, но не сеть до Postgres. HTTP-обвязка одинакова
+для обоих вариантов и входит в оба замера.
+"""
+import argparse
+import time
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.books.models import BookModel
+from src.books.repository import BOOK_COLUMNS
+from src.books.schemas import Book
+from src.responses import TrustedJSONResponse
+
+PAGE_SIZE = 100
+
+
+def build_app() -> FastAPI:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    BookModel.metadata.create_all(engine, tables=[BookModel.__table__])
+    with Session(engine) as session:
+        session.add_all(
+            BookModel(
+                id=uuid.uuid4(),
+                title=f"Книга номер {index}",
+                author=f"Автор {index % 17}",
+                isbn=f"{9780000000000 + index}",
+                description="Описание " * 20,
+                language="ru",
+                genre="fiction",
+            )
+            for index in range(PAGE_SIZE)
+        )
+        session.commit()
+
+    app = FastAPI()
+
+    @app.get("/orm", response_model=list[Book])
+    async def orm_page():
+        with Session(engine) as session:
+            books = session.execute(select(BookModel).limit(PAGE_SIZE)).scalars().all()
+            return [Book.model_validate(book) for book in books]
+
+    @app.get("/fast", response_model=list[Book])
+    async def fast_page():
+        with Session(engine) as session:
+            rows = [dict(row) for row in session.execute(select(*BOOK_COLUMNS).limit(PAGE_SIZE)).mappings()]
+        return TrustedJSONResponse(rows)
+
+    return app
+
+
+def cpu_per_request(client: TestClient, path: str, requests: int) -> float:
+    for _ in range(min(50, requests)):
+        client.get(path)
+    started = time.process_time()
+    for _ in range(requests):
+        client.get(path)
+    return (time.process_time() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    client = TestClient(build_app())
+    assert client.get("/orm").content == client.get("/fast").content, "fast path must return identical JSON"
+
+    before = cpu_per_request(client, "/orm", args.requests)
+    after = cpu_per_request(client, "/fast", args.requests)
+    print(f"ORM + model_validate + response_model: {before * 1e6:9.0f} us CPU/request")
+    print(f"Core rows + TrustedJSONResponse:       {after * 1e6:9.0f} us CPU/request")
+    print(f"Speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,37 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, exc, delete
 from src.books.models import BookModel
+from src.reconciliation.models import KeyDigestBucketModel
 from uuid import UUID
 from src.books.exceptions import RepositoryError
+from common.reconciliation.digest import RangeDigest, range_digest_query, ids_in_range_query, to_range_digests
+from common.monitoring.timing import timed_methods
+from common.monitoring.tracing import traced_methods
 from typing import Optional
 
+# Порядок колонок совпадает с порядком полей схемы Book, чтобы JSON быстрого пути не отличался.
+BOOK_COLUMNS = (
+    BookModel.title,
+    BookModel.author,
+    BookModel.isbn,
+    BookModel.description,
+    BookModel.language,
+    BookModel.genre,
+    BookModel.id,
+)
+
 
 class IBookRepository(ABC):
     @abstractmethod
     async def create(self, book: BookModel) -> BookModel:
         ...
 
+    @abstractmethod
+    async def create_many(self, books: List[BookModel]) -> List[BookModel]:
+        ...
+
     @abstractmethod
     async def get_all(self,
                       skip: int = 0,
@@ -25,6 +44,20 @@ class IBookRepository(ABC):
     @abstractmethod
     async def get(self, id: UUID) -> BookModel | None:
         ...
+
+    @abstractmethod
+    async def get_all_rows(self,
+                           skip: int = 0,
+                           limit: int = 100,
+                           language: Optional[str] = None,
+                           author: Optional[str] = None
+                         ) -> List[Dict]:
+        """То же, что get_all, но строками-словарями в обход ORM."""
+        ...
+
+    @abstractmethod
+    async def get_row(self, id: UUID) -> Dict | None:
+        ...
     
     @abstractmethod
     async def update(self, book: BookModel) -> BookModel:
@@ -34,7 +67,21 @@ class IBookRepository(ABC):
     async def delete(self, book: BookModel) -> int:
         ...
 
+    @abstractmethod
+    async def delete_many(self, book_ids: List[UUID]) -> List[UUID]:
+        ...
+
+    @abstractmethod
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        ...
+
+    @abstractmethod
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        ...
 
+
+@traced_methods
+@timed_methods("db")
 class SqlBookRepository(IBookRepository):
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -50,14 +97,30 @@ class SqlBookRepository(IBookRepository):
             raise RepositoryError("Database operation failed during book creation", original_error=e) from e
 
 
+    async def create_many(self, books: List[BookModel]) -> List[BookModel]:
+        try:
+            self._session.add_all(books)
+            await self._session.commit()
+            for book in books:
+                await self._session.refresh(book)
+            return books
+        except exc.SQLAlchemyError as e:
+            await self._session.rollback()
+            raise RepositoryError("Database operation failed during bulk book creation", original_error=e) from e
+
+
+    @staticmethod
+    def _filtered(query, skip: int, limit: int, language: Optional[str], author: Optional[str]):
+        if language is not None:
+            query = query.where(BookModel.language == language)
+        if author is not None:
+            query = query.where(BookModel.author == author)
+        return query.offset(skip).limit(limit)
+
+
     async def get_all(self, skip: int = 0, limit: int = 100,language: Optional[str] = None, author: Optional[str] = None) -> List[BookModel]:
         try:
-            query = select(BookModel)
-            if language is not None:
-                query = query.where(BookModel.language == language)
-            if author is not None:
-                query = query.where(BookModel.author == author)
-            query = query.offset(skip).limit(limit)
+            query = self._filtered(select(BookModel), skip, limit, language, author)
             result = await self._session.execute(
                 query)
             return list(result.scalars().all())
@@ -65,6 +128,24 @@ class SqlBookRepository(IBookRepository):
             raise RepositoryError("Database operation failed while retrieving books", original_error=e) from e
 
 
+    async def get_all_rows(self, skip: int = 0, limit: int = 100, language: Optional[str] = None, author: Optional[str] = None) -> List[Dict]:
+        try:
+            query = self._filtered(select(*BOOK_COLUMNS), skip, limit, language, author)
+            result = await self._session.execute(query)
+            return [dict(row) for row in result.mappings()]
+        except exc.SQLAlchemyError as e:
+            raise RepositoryError("Database operation failed while retrieving books", original_error=e) from e
+
+
+    async def get_row(self, id: UUID) -> Dict | None:
+        try:
+            result = await self._session.execute(select(*BOOK_COLUMNS).where(BookModel.id == id))
+            row = result.mappings().one_or_none()
+            return dict(row) if row is not None else None
+        except exc.SQLAlchemyError as e:
+            raise RepositoryError(f"Database operation failed while retrieving book with ID {id}", original_error=e) from e
+
+
     async def get(self, id: UUID) -> BookModel | None:
         try:
             result = await self._session.execute(
@@ -90,9 +171,45 @@ class SqlBookRepository(IBookRepository):
         try:
             stmt = delete(BookModel).where(BookModel.id == book_id)
             result = await self._session.execute(stmt)
-            await self._session.commit()
             deleted_count = result.rowcount 
+            if deleted_count == 0:
+                # Нечего фиксировать: заодно отбрасываем события, поставленные в outbox для этой операции.
+                await self._session.rollback()
+                return 0
+            await self._session.commit()
             return deleted_count 
         except exc.SQLAlchemyError as e: 
             await self._session.rollback()
             raise RepositoryError(f"Database operation failed while deleting book with ID {book_id}", original_error=e) from e
+
+
+    async def delete_many(self, book_ids: List[UUID]) -> List[UUID]:
+        try:
+            stmt = delete(BookModel).where(BookModel.id.in_(book_ids)).returning(BookModel.id)
+            result = await self._session.execute(stmt)
+            deleted_ids = list(result.scalars().all())
+            if len(deleted_ids) != len(set(book_ids)):
+                # Удаляем все книги или ни одной: события в outbox поставлены на весь список.
+                await self._session.rollback()
+                return deleted_ids
+            await self._session.commit()
+            return deleted_ids
+        except exc.SQLAlchemyError as e:
+            await self._session.rollback()
+            raise RepositoryError("Database operation failed during bulk book deletion", original_error=e) from e
+
+
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        try:
+            result = await self._session.execute(range_digest_query(BookModel.id, KeyDigestBucketModel, prefix))
+            return to_range_digests(result)
+        except exc.SQLAlchemyError as e:
+            raise RepositoryError(f"Database operation failed while computing digest for range '{prefix}'", original_error=e) from e
+
+
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        try:
+            result = await self._session.execute(ids_in_range_query(BookModel.id, prefix, limit))
+            return list(result.scalars().all())
+        except exc.SQLAlchemyError as e:
+            raise RepositoryError(f"Database operation failed while listing IDs in range '{prefix}'", original_error=e) from e
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, status, Query, HTTPException
+from fastapi import APIRouter, Body, Depends, status, Query, HTTPException
 from uuid import UUID
 from typing import Optional
 
 from src.books.schemas import Book, BookCreate, BookUpdate
 from src.books.service import BookService
-from src.dependencies import get_book_service
+from src.dependencies import get_book_read_service, get_book_service
 from authx import RequestToken
 from src.auth.permissions import require_admin, require_authenticated
+from src.responses import TrustedJSONResponse
 
 router = APIRouter(prefix="/books", tags=["books"])
 
@@ -33,6 +34,50 @@ async def create_book(
     return await service.create_book(book_data)
 
 
+@router.post(
+    "/bulk",
+    response_model=list[Book],
+    status_code=status.HTTP_201_CREATED,
+    summary="Создать несколько книг",
+    description="Добавляет книги одной транзакцией: при ошибке не создаётся ни одна. Требуются права администратора.",
+    response_description="Созданные книги",
+    responses={
+        201: {"description": "Книги успешно созданы"},
+        401: {"description": "Необходима авторизация"},
+        403: {"description": "Нет прав администратора"},
+        409: {"description": "Книга с таким ISBN уже существует"},
+        422: {"description": "Ошибка валидации входных данных"},
+    }
+)
+async def create_books(
+    books_data: list[BookCreate] = Body(..., min_length=1, max_length=500),
+    token: RequestToken = Depends(require_admin),
+    service: BookService = Depends(get_book_service)
+):
+    return await service.create_books(books_data)
+
+
+@router.post(
+    "/bulk-delete",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Удалить несколько книг",
+    description="Удаляет книги по списку ID одной транзакцией: если хотя бы одной нет, не удаляется ни одна. Только для администратора.",
+    response_description="Книги удалены",
+    responses={
+        204: {"description": "Книги успешно удалены"},
+        401: {"description": "Необходима авторизация"},
+        403: {"description": "Нет прав администратора"},
+        404: {"description": "Книга не найдена"},
+    }
+)
+async def delete_books(
+    book_ids: list[UUID] = Body(..., min_length=1, max_length=500),
+    token: RequestToken = Depends(require_admin),
+    service: BookService = Depends(get_book_service)
+):
+    await service.delete_books(book_ids)
+
+
 @router.get(
     "/",
     response_model=list[Book],
@@ -50,14 +95,14 @@ async def list_books(
     limit: int = Query(100, ge=1, le=100),
     language: Optional[str] = Query(None, description="Фильтрация по языку"),
     author: Optional[str] = Query(None, description="Фильтрация по автору"),
-    service: BookService = Depends(get_book_service)
+    service: BookService = Depends(get_book_read_service)
 ):
-    return await service.list_books(
+    return TrustedJSONResponse(await service.list_book_rows(
         skip=skip,
         limit=limit,
         language=language,
         author=author
-    )
+    ))
 
 
 @router.get(
@@ -75,9 +120,9 @@ async def list_books(
 async def get_book(
     book_id: UUID,
     token: RequestToken = Depends(require_authenticated),
-    service: BookService = Depends(get_book_service)
+    service: BookService = Depends(get_book_read_service)
 ):
-    return await service.get_book(book_id)
+    return TrustedJSONResponse(await service.get_book_row(book_id))
 
 
 @router.patch(
@@ -7,22 +7,31 @@ from sqlalchemy.exc import IntegrityError
 from src.books.repository import IBookRepository 
 from src.books.schemas import Book, BookCreate, BookUpdate
 from src.books.models import BookModel
-from uuid import UUID
-from typing import Optional
-from src.rabbit.producer import RabbitMQProducer
+from src.outbox.repository import IOutboxRepository
+from common.reconciliation.digest import RangeDigest
+from uuid import UUID, uuid4
+from typing import Dict, List, Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# DETAIL:  Key (isbn)=(9780000000000) already exists.
+_DUPLICATE_ISBN = re.compile(r"Key \(isbn\)=\((\d+)\)")
 
 class BookService:
-    def __init__(self, repo: IBookRepository, producer: RabbitMQProducer):
+    def __init__(self, repo: IBookRepository, outbox: IOutboxRepository):
         self._repo = repo
-        self._producer = producer 
+        self._outbox = outbox
 
 
     async def create_book(self, book_data: BookCreate) -> Book:
         try:
-            db_book = BookModel(**book_data.model_dump())
+            db_book = BookModel(id=uuid4(), **book_data.model_dump())
+            # Событие фиксируется в одной транзакции с книгой; публикует его OutboxRelay.
+            await self._outbox.add(db_book.id, "created")
             created_book = await self._repo.create(db_book) 
-            await self._producer.send_event(created_book.id, "created")
-            print("----------send-for-create-----------")
+            logger.debug(f"Queued 'created' event for book {created_book.id}")
             return Book.model_validate(created_book)
         except RepositoryError as e:
             original_sqla_error = e.original_error
@@ -37,6 +46,31 @@ class BookService:
             raise ServiceError("An unexpected error occurred during book creation", original_error=e) from e
 
 
+    async def create_books(self, books_data: List[BookCreate]) -> list[Book]:
+        """Создаёт книги одной транзакцией; события операции уходят одним конвертом."""
+        operation_id = uuid4()
+        try:
+            db_books = [BookModel(id=uuid4(), **book_data.model_dump()) for book_data in books_data]
+            for db_book in db_books:
+                await self._outbox.add(db_book.id, "created", operation_id)
+            created_books = await self._repo.create_many(db_books)
+            logger.debug(f"Queued {len(created_books)} 'created' events for operation {operation_id}")
+            return [Book.model_validate(db_book) for db_book in created_books]
+        except RepositoryError as e:
+            original_sqla_error = e.original_error
+            if isinstance(original_sqla_error, IntegrityError):
+                error_string = str(original_sqla_error).lower()
+                if "isbn" in error_string or "unique constraint" in error_string:
+                    match = _DUPLICATE_ISBN.search(str(original_sqla_error))
+                    isbn = match.group(1) if match else ", ".join(book_data.isbn for book_data in books_data)
+                    raise ISBNAlreadyExistsError(isbn) from original_sqla_error
+                else:
+                    raise ServiceError("Unexpected database integrity violation", original_error=e) from e
+            raise ServiceError(f"Repository error: {e}", original_error=e) from e
+        except Exception as e:
+            raise ServiceError("An unexpected error occurred during bulk book creation", original_error=e) from e
+
+
     async def list_books(self,
                         skip: int = 0,
                         limit: int = 100,
@@ -70,6 +104,40 @@ class BookService:
             raise ServiceError(f"An unexpected error occurred while getting book with ID {id}", original_error=e) from e
 
 
+    async def list_book_rows(self,
+                             skip: int = 0,
+                             limit: int = 100,
+                             language: Optional[str] = None,
+                             author: Optional[str] = None
+                             ) -> List[Dict]:
+        """Быстрый путь list_books: строки в форме схемы Book без ORM и повторной валидации.
+
+        Данные в таблице уже прошли BookCreate/BookUpdate, поэтому обработчик отдаёт их
+        через TrustedJSONResponse сразу в JSON.
+        """
+        try:
+            return await self._repo.get_all_rows(skip=skip, limit=limit, language=language, author=author)
+        except RepositoryError as e:
+            raise ServiceError(f"Repository error during listing books: {e}", original_error=e) from e
+        except Exception as e:
+            raise ServiceError("An unexpected error occurred while listing books", original_error=e) from e
+
+
+    async def get_book_row(self, id: UUID) -> Dict:
+        """Быстрый путь get_book, см. list_book_rows."""
+        try:
+            row = await self._repo.get_row(id)
+            if row is None:
+                raise BookNotFoundError(str(id))
+            return row
+        except RepositoryError as e:
+            raise ServiceError(f"Repository error during getting book with ID {id}: {e}", original_error=e) from e
+        except BookNotFoundError:
+            raise
+        except Exception as e:
+            raise ServiceError(f"An unexpected error occurred while getting book with ID {id}", original_error=e) from e
+
+
     async def update_book(self, book_id: UUID, update_data: BookUpdate) -> Book:
         try:
             book = await self._repo.get(book_id) 
@@ -97,11 +165,11 @@ class BookService:
 
     async def delete_book(self, book_id: UUID) -> None:
         try:
+            await self._outbox.add(book_id, "deleted")
             deleted_count = await self._repo.delete(book_id)
             if deleted_count == 0:
                 raise BookNotFoundError(book_id)
-            await self._producer.send_event(book_id,"deleted")
-            print("----------send-for-delete-----------")
+            logger.debug(f"Queued 'deleted' event for book {book_id}")
             return None
         except RepositoryError as e:
             raise ServiceError(f"Repository error during getting book with ID {id}: {e}", original_error=e) from e
@@ -110,3 +178,38 @@ class BookService:
         except Exception as e:
             raise ServiceError(f"An unexpected error occurred while getting book with ID {id}", original_error=e) from e
 
+
+
+    async def delete_books(self, book_ids: List[UUID]) -> None:
+        """Удаляет книги одной транзакцией: если хотя бы одной нет, не удаляется ни одна."""
+        operation_id = uuid4()
+        book_ids = list(dict.fromkeys(book_ids))
+        try:
+            for book_id in book_ids:
+                await self._outbox.add(book_id, "deleted", operation_id)
+            deleted_ids = set(await self._repo.delete_many(book_ids))
+            missing = [book_id for book_id in book_ids if book_id not in deleted_ids]
+            if missing:
+                raise BookNotFoundError(missing[0])
+            logger.debug(f"Queued {len(book_ids)} 'deleted' events for operation {operation_id}")
+            return None
+        except RepositoryError as e:
+            raise ServiceError(f"Repository error during bulk book deletion: {e}", original_error=e) from e
+        except BookNotFoundError:
+            raise
+        except Exception as e:
+            raise ServiceError("An unexpected error occurred during bulk book deletion", original_error=e) from e
+
+
+    async def get_range_digest(self, prefix: str) -> List[RangeDigest]:
+        try:
+            return await self._repo.range_digest(prefix)
+        except RepositoryError as e:
+            raise ServiceError(f"Repository error during digest of range '{prefix}': {e}", original_error=e) from e
+
+
+    async def get_ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        try:
+            return await self._repo.ids_in_range(prefix, limit)
+        except RepositoryError as e:
+            raise ServiceError(f"Repository error during listing IDs in range '{prefix}': {e}", original_error=e) from e
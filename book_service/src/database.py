@@ -1,19 +1,72 @@
+from uuid import uuid4
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base
-from src.config import settings
+from src.config import Settings, settings
+from common.monitoring.pool import InstrumentedAsyncAdaptedQueuePool, register_pool_metrics
+from common.monitoring.sql import instrument_engine
+from common.replicas import ReplicaRouter
+from fastapi import Request
 from typing import AsyncGenerator
 
+
+def engine_options(settings: Settings) -> dict:
+    """Параметры пула SQLAlchemy и подключения asyncpg из настроек."""
+    connect_args = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_COMMAND_TIMEOUT:
+        connect_args["command_timeout"] = settings.DB_COMMAND_TIMEOUT
+    if settings.DB_PGBOUNCER:
+        # В transaction pooling соседние транзакции идут через разные серверные соединения:
+        # кэшированные подготовленные запросы там не живут, а одинаковые имена конфликтуют.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
 engine = create_async_engine(
     url=settings.DATABASE_URL,
-    echo=True,  
-    pool_size=10,  
-    max_overflow=20,
+    echo=settings.SQL_ECHO,
+    **engine_options(settings),
 )
+instrument_engine(engine, settings.SQL_SLOW_QUERY_MS, settings.SQL_SLOW_QUERY_SAMPLES)
 
 session_factory = async_sessionmaker(engine)
 
+replica_engines = [
+    create_async_engine(url=url.strip(), echo=settings.SQL_ECHO, **engine_options(settings))
+    for url in settings.DB_REPLICA_URLS.split(",") if url.strip()
+]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine, settings.SQL_SLOW_QUERY_MS, settings.SQL_SLOW_QUERY_SAMPLES)
+
+register_pool_metrics({"primary": engine, **{f"replica-{index}": replica_engine
+                                             for index, replica_engine in enumerate(replica_engines)}})
+
+replica_router = ReplicaRouter(
+    session_factory,
+    [async_sessionmaker(replica_engine) for replica_engine in replica_engines],
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    read_your_writes_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
+
 Base = declarative_base()
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with session_factory() as session:
+        yield session
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия для обработчиков только на чтение: реплика, если она достаточно свежая."""
+    async with replica_router.read_session(replica_router.enabled and replica_router.wrote_recently(request)) as session:
         yield session
\ No newline at end of file
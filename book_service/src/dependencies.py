@@ -1,10 +1,9 @@
-from src.database import get_session
+from src.database import get_read_session, get_session
 from src.books.repository import SqlBookRepository, IBookRepository
 from src.books.service import BookService
+from src.outbox.repository import SqlOutboxRepository, IOutboxRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
-from src.rabbit.dependencies import get_rabbit_producer
-from src.rabbit.producer import RabbitMQProducer
 
 
 async def get_book_repository(
@@ -12,8 +11,19 @@ async def get_book_repository(
 ) -> IBookRepository:
     return SqlBookRepository(session)
 
+async def get_outbox_repository(
+    session: AsyncSession = Depends(get_session)
+) -> IOutboxRepository:
+    return SqlOutboxRepository(session)
+
 async def get_book_service(
     repo: IBookRepository = Depends(get_book_repository),
-    producer: RabbitMQProducer = Depends(get_rabbit_producer)
+    outbox: IOutboxRepository = Depends(get_outbox_repository)
+) -> BookService:
+    return BookService(repo, outbox)
+
+async def get_book_read_service(
+    session: AsyncSession = Depends(get_read_session)
 ) -> BookService:
-    return BookService(repo, producer)
\ No newline at end of file
+    """Сервис для обработчиков только на чтение: сессия может быть открыта на реплике."""
+    return BookService(SqlBookRepository(session), SqlOutboxRepository(session))
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from starlette import status
-from authx.exceptions import MissingTokenError, JWTDecodeError
+from authx.exceptions import MissingTokenError, JWTDecodeError, RevokedTokenError
 
 from src.books.exceptions import (
     BookNotFoundError,
@@ -26,6 +26,12 @@ async def jwt_decode_handler(request: Request, exc: JWTDecodeError):
         content={"detail": detail},
     )
 
+async def revoked_token_handler(request: Request, exc: RevokedTokenError):
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"detail": "Token has been revoked"},
+    )
+
 async def forbidden_handler(request: Request, exc: PermissionError):
     return JSONResponse(
         status_code=status.HTTP_403_FORBIDDEN,
@@ -74,6 +80,7 @@ async def repository_error_handler(request: Request, exc: RepositoryError):
 def register_exception_handlers(app):
     app.add_exception_handler(MissingTokenError, missing_token_handler)
     app.add_exception_handler(JWTDecodeError, jwt_decode_handler)
+    app.add_exception_handler(RevokedTokenError, revoked_token_handler)
     app.add_exception_handler(PermissionError, forbidden_handler)
 
     app.add_exception_handler(BookNotFoundError, book_not_found_handler)
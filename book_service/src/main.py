@@ -1,27 +1,84 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+import asyncio
 import logging
+from datetime import timedelta
 from src.config import settings
+from src.database import replica_router, session_factory
+from src.outbox.relay import OutboxRelay
+from src.auth.auth import revocation_list
 from src.rabbit.producer import RabbitMQProducer
+from common.rabbit.revocations import RevocationConsumer
 from src.books.router import router as books_router
+from src.reconciliation.router import router as reconciliation_router
+from src.monitoring.router import router as monitoring_router
+from common.monitoring.http import HTTPMetricsMiddleware
+from src.auth.permissions import is_admin_token
+from common.monitoring.logs import configure_logging
+from common.monitoring.loop import loop_monitor
+from common.monitoring.multiprocess import multiprocess_metrics
+from common.monitoring.memory import install_gc_metrics, memory_tracker
+from common.monitoring.profiling import ProfilingMiddleware, profiler
+from common.monitoring.timing import ServerTimingMiddleware, TimedJSONResponse
+from common.monitoring.tracing import TracingMiddleware, load_exporter, tracer
+from common.monitoring.sql import QueryBudgetMiddleware
+from common.replicas import ReadYourWritesMiddleware
 from src.openapi_config import configure_swagger
 from src.exception_handlers import register_exception_handlers
 
 logger = logging.getLogger(__name__)
 
+configure_logging("book_service", settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLING, settings.LOG_QUEUE_SIZE)
+tracer.configure("book_service", load_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE),
+                 settings.TRACING_SAMPLE_RATIO)
+profiler.configure(settings.PROFILING_DIR, settings.PROFILING_MAX_PER_MINUTE, settings.PROFILING_KEEP)
+install_gc_metrics()
+loop_monitor.configure(settings.LOOP_LAG_INTERVAL_MS / 1000, settings.LOOP_BLOCK_THRESHOLD_MS / 1000)
+if settings.TRACEMALLOC_FRAMES:
+    memory_tracker.start(settings.TRACEMALLOC_FRAMES)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    producer = RabbitMQProducer(settings.RABBITMQ_URL)
+    loop_monitor.start()
+    await multiprocess_metrics.start()
+    await replica_router.start()
+    producer = RabbitMQProducer(
+        settings.RABBITMQ_URL,
+        max_in_flight=settings.RABBITMQ_MAX_IN_FLIGHT,
+        channel_pool_size=settings.RABBITMQ_CHANNEL_POOL_SIZE,
+        encoding=settings.RABBITMQ_EVENT_ENCODING,
+    )
     try:
-        await producer.connect()
+        await producer.start()
         app.state.rabbitmq_producer = producer
         logger.info("RabbitMQ producer connected successfully")
     except Exception as e:
         logger.error(f"Failed to connect RabbitMQ: {str(e)}")
         raise
 
+    relay = OutboxRelay(
+        session_factory,
+        producer,
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        poll_interval=settings.OUTBOX_POLL_INTERVAL,
+        retention=timedelta(hours=settings.OUTBOX_RETENTION_HOURS),
+        max_envelope_size=settings.OUTBOX_MAX_ENVELOPE_SIZE,
+    )
+    relay_task = asyncio.create_task(relay.run())
+    app.state.outbox_relay_task = relay_task
+
+    revocation_consumer = RevocationConsumer(settings.RABBITMQ_URL, revocation_list)
+    revocation_task = asyncio.create_task(revocation_consumer.consume())
+
     yield
-    
+
+    for task in (relay_task, revocation_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
     if hasattr(app.state, 'rabbitmq_producer'):
         try:
             await producer.disconnect()
@@ -29,7 +86,22 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error disconnecting RabbitMQ: {str(e)}")
 
-app = FastAPI(lifespan=lifespan)
+    await replica_router.stop()
+    await multiprocess_metrics.stop()
+    await loop_monitor.stop()
+    tracer.shutdown()
+
+app = FastAPI(lifespan=lifespan, default_response_class=TimedJSONResponse)
 app.include_router(books_router)
+app.include_router(reconciliation_router)
+app.include_router(monitoring_router)
+app.add_middleware(QueryBudgetMiddleware, budget=settings.SQL_QUERY_BUDGET)
+if replica_router.enabled:
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+app.add_middleware(ServerTimingMiddleware, mode=settings.SERVER_TIMING)
+app.add_middleware(ProfilingMiddleware, authorize=is_admin_token)
+app.add_middleware(TracingMiddleware)
+# Добавляется последним, чтобы быть внешним: в гистограмму попадает время всех middleware.
+app.add_middleware(HTTPMetricsMiddleware)
 configure_swagger(app)
 register_exception_handlers(app)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, String, UUID, DateTime, Index, func
+from src.database import Base
+
+
+class OutboxEventModel(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    book_id = Column(UUID(as_uuid=True), nullable=False)
+    action = Column(String, nullable=False)
+    # События одной массовой операции делят operation_id и публикуются одним конвертом.
+    operation_id = Column(UUID(as_uuid=True))
+    # Контекст трассировки запроса, поставившего событие: публикация продолжает его трассу.
+    traceparent = Column(String(55))
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_outbox_events_unsent", "id", postgresql_where=sent_at.is_(None)),
+    )
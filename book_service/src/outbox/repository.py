@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.outbox.models import OutboxEventModel
+from common.monitoring.timing import timed_methods
+from common.monitoring.tracing import current_traceparent, traced_methods
+
+
+class IOutboxRepository(ABC):
+    @abstractmethod
+    async def add(self, book_id: UUID, action: str, operation_id: Optional[UUID] = None) -> None:
+        """Ставит событие в outbox той же сессии; фиксируется вместе с изменением книги."""
+        ...
+
+    @abstractmethod
+    async def claim_batch(self, limit: int) -> List[OutboxEventModel]:
+        ...
+
+    @abstractmethod
+    async def mark_sent(self, ids: List[int]) -> None:
+        ...
+
+    @abstractmethod
+    async def purge_sent(self, retention: timedelta) -> int:
+        ...
+
+
+@traced_methods
+@timed_methods("db")
+class SqlOutboxRepository(IOutboxRepository):
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def add(self, book_id: UUID, action: str, operation_id: Optional[UUID] = None) -> None:
+        self._session.add(OutboxEventModel(book_id=book_id, action=action, operation_id=operation_id,
+                                           traceparent=current_traceparent()))
+
+    async def claim_batch(self, limit: int) -> List[OutboxEventModel]:
+        # SKIP LOCKED позволяет нескольким релеям разбирать outbox параллельно, не блокируя друг друга.
+        result = await self._session.execute(
+            select(OutboxEventModel)
+            .where(OutboxEventModel.sent_at.is_(None))
+            .order_by(OutboxEventModel.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    async def mark_sent(self, ids: List[int]) -> None:
+        await self._session.execute(
+            update(OutboxEventModel)
+            .where(OutboxEventModel.id.in_(ids))
+            .values(sent_at=func.now())
+        )
+
+    async def purge_sent(self, retention: timedelta) -> int:
+        result = await self._session.execute(
+            delete(OutboxEventModel).where(OutboxEventModel.sent_at < func.now() - retention)
+        )
+        return result.rowcount
@@ -0,0 +1,69 @@
+import aio_pika
+import logging
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractRobustConnection
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelPool:
+    """Фиксированный набор каналов с publisher confirms для одного exchange.
+
+    Канал выбирается по ключу (идентификатору книги): RabbitMQ сохраняет порядок
+    сообщений только внутри канала, поэтому события одной книги идут одним каналом.
+    Публикации не держат канал на время ожидания подтверждения, поэтому каждый канал
+    остаётся конвейерным. Закрытые каналы пропускаются и заменяются при `heal()`.
+    """
+
+    def __init__(self, size: int, exchange_name: str, exchange_type: aio_pika.ExchangeType):
+        self.size = max(1, size)
+        self._exchange_name = exchange_name
+        self._exchange_type = exchange_type
+        self._connection: Optional[AbstractRobustConnection] = None
+        self._slots: List[Optional[Tuple[AbstractChannel, AbstractExchange]]] = []
+        self.reopened = 0
+
+    async def open(self, connection: AbstractRobustConnection) -> None:
+        self._connection = connection
+        self._slots = [None] * self.size
+        for index in range(self.size):
+            self._slots[index] = await self._open_slot()
+
+    async def _open_slot(self) -> Tuple[AbstractChannel, AbstractExchange]:
+        channel = await self._connection.channel(publisher_confirms=True)
+        exchange = await channel.declare_exchange(self._exchange_name, self._exchange_type, durable=True)
+        return channel, exchange
+
+    def healthy_count(self) -> int:
+        return sum(1 for slot in self._slots if slot is not None and not slot[0].is_closed)
+
+    def exchange_for(self, key: int) -> AbstractExchange:
+        """Канал ключа; если он закрыт — следующий открытый, тоже одинаковый для одного ключа."""
+        for offset in range(len(self._slots)):
+            slot = self._slots[(key + offset) % len(self._slots)]
+            if slot is not None and not slot[0].is_closed:
+                return slot[1]
+        raise ConnectionError("No open RabbitMQ channels")
+
+    async def heal(self) -> int:
+        """Переоткрывает закрытые каналы. Возвращает количество заменённых."""
+        if self._connection is None or self._connection.is_closed:
+            return 0
+        replaced = 0
+        for index, slot in enumerate(self._slots):
+            if slot is not None and not slot[0].is_closed:
+                continue
+            try:
+                self._slots[index] = await self._open_slot()
+                replaced += 1
+            except Exception as e:
+                logger.warning(f"Failed to reopen RabbitMQ channel: {e}")
+                break
+        self.reopened += replaced
+        return replaced
+
+    async def close(self) -> None:
+        for slot in self._slots:
+            if slot is not None and not slot[0].is_closed:
+                await slot[0].close()
+        self._slots = []
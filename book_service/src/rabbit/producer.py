@@ -1,56 +1,220 @@
 import aio_pika
+import asyncio
+import bisect
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
 from uuid import UUID
-from src.rabbit.schemas import BookEvent
+from common.monitoring.metrics import registry
+from common.monitoring.timing import phase
+from common.monitoring.tracing import inject_headers, parse_traceparent, tracer
+from src.rabbit.channel_pool import ChannelPool
+from common.rabbit.connection import connect
+from common.rabbit.codec import encode_events
+from common.rabbit.schemas import BookEvent
 import logging
 
 logger = logging.getLogger(__name__)
 
+CONFIRM_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+PUBLISHED = registry.counter("rabbitmq_published_total", "Сообщения, отправленные в RabbitMQ, по исходу", ["outcome"])
+CONFIRM_LATENCY = registry.histogram(
+    "rabbitmq_publish_confirm_seconds", "Время от отправки сообщения до подтверждения брокером",
+    buckets=[bound / 1000 for bound in CONFIRM_LATENCY_BUCKETS_MS],
+)
+IN_FLIGHT = registry.gauge("rabbitmq_publish_in_flight", "Сообщения, ждущие подтверждения брокером")
+_confirmed = PUBLISHED.labels(outcome="confirmed")
+_failed = PUBLISHED.labels(outcome="failed")
+_in_flight = IN_FLIGHT.labels()
+
+
+class PublisherStats:
+    """Счётчики публикаций: сколько сообщений ждут подтверждения и как долго брокер их подтверждает."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.published = 0
+        self.failed = 0
+        self.confirm_latency_sum_ms = 0.0
+        self.confirm_latency_max_ms = 0.0
+        self.confirm_latency_buckets = [0] * (len(CONFIRM_LATENCY_BUCKETS_MS) + 1)
+
+    def observe_confirm(self, latency_ms: float) -> None:
+        self.published += 1
+        _confirmed.inc()
+        CONFIRM_LATENCY.observe(latency_ms / 1000)
+        self.confirm_latency_sum_ms += latency_ms
+        if latency_ms > self.confirm_latency_max_ms:
+            self.confirm_latency_max_ms = latency_ms
+        self.confirm_latency_buckets[bisect.bisect_left(CONFIRM_LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "published": self.published,
+            "failed": self.failed,
+            "confirm_latency_avg_ms": self.confirm_latency_sum_ms / self.published if self.published else 0.0,
+            "confirm_latency_max_ms": self.confirm_latency_max_ms,
+            "confirm_latency_buckets_ms": dict(zip([*map(str, CONFIRM_LATENCY_BUCKETS_MS), "+Inf"], self.confirm_latency_buckets)),
+        }
+
+
 class RabbitMQProducer:
-    def __init__(self, amqp_url: str):
+    def __init__(self,
+                 amqp_url: str,
+                 max_in_flight: int = 256,
+                 channel_pool_size: int = 4,
+                 reconnect_interval: float = 1.0,
+                 max_reconnect_interval: float = 30.0,
+                 encoding: str = "json"):
         self.amqp_url = amqp_url
+        self.encoding = encoding
         self.connection = None
-        self.channel = None
-        self.exchange = None
+        self.pool = ChannelPool(channel_pool_size, "book_events", aio_pika.ExchangeType.TOPIC)
+        self.stats = PublisherStats()
+        self._in_flight_limit = asyncio.Semaphore(max_in_flight)
+        self._reconnect_interval = reconnect_interval
+        self._max_reconnect_interval = max_reconnect_interval
+        self._maintenance_task = None
+
+    async def start(self):
+        """Первая попытка подключения и запуск фонового переподключения и проверки каналов."""
+        await self.connect()
+        self._maintenance_task = asyncio.create_task(self._maintain())
 
     async def connect(self):
         try:
-            self.connection = await aio_pika.connect_robust(self.amqp_url)
-            self.channel = await self.connection.channel()
-            self.exchange = await self.channel.declare_exchange(
-                "book_events",
-                aio_pika.ExchangeType.TOPIC,
-                durable=True
-            )
-            logger.info("Connected to RabbitMQ")
+            if not self.connection or self.connection.is_closed:
+                self.connection = await connect(self.amqp_url)
+            await self.pool.open(self.connection)
+            logger.info(f"Connected to RabbitMQ with {self.pool.size} channels")
             return True
         except Exception as e:
             logger.error(f"Connection error: {str(e)}")
             return False
 
     async def is_connected(self):
-        return self.connection and not self.connection.is_closed
+        return bool(
+            self.connection
+            and not self.connection.is_closed
+            and self.connection.connected.is_set()
+            and self.pool.healthy_count()
+        )
 
-    async def send_event(self, book_id: UUID, action: str):
+    async def _maintain(self):
+        delay = self._reconnect_interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                if self.connection and not self.connection.is_closed:
+                    # Само соединение (и его каналы) восстанавливает connect_robust;
+                    # здесь лечим каналы, закрытые брокером при живом соединении.
+                    if self.connection.connected.is_set():
+                        await self.pool.heal()
+                    delay = self._reconnect_interval
+                elif await self.connect():
+                    delay = self._reconnect_interval
+                else:
+                    delay = min(delay * 2, self._max_reconnect_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"RabbitMQ maintenance error: {e}")
+
+    async def _ensure_connected(self):
+        # Подключение никогда не выполняется на пути запроса: при недоступном брокере сразу отказываем.
         if not await self.is_connected():
-            if not await self.connect():
-                raise ConnectionError("RabbitMQ connection failed")
-        
-        try:
-            event = BookEvent(book_id=book_id, action=action)
-            await self.exchange.publish(
-                aio_pika.Message(
-                    body=event.model_dump_json().encode(),
-                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-                ),
-                routing_key=f"book.{action}"
-            )
-            logger.debug(f"Sent event: {event}")
-            return True
-        except Exception as e:
-            logger.error(f"Error sending event: {str(e)}")
+            raise ConnectionError("RabbitMQ is not connected")
+
+    async def send_event(self, book_id: UUID, action: str):
+        await self._ensure_connected()
+        return await self._publish([BookEvent(book_id=book_id, action=action)])
+
+    async def publish_many(self, events: List[BookEvent]) -> List[bool]:
+        """Публикует события конвейером: все уходят в канал сразу, подтверждения собираются асинхронно.
+
+        Возвращает признак подтверждения брокером для каждого события в исходном порядке.
+        """
+        return await self.publish_groups([[event] for event in events])
+
+    async def publish_groups(self, groups: List[List[BookEvent]],
+                             traceparents: Optional[List[Optional[str]]] = None) -> List[bool]:
+        """Как `publish_many`, но каждая группа из нескольких событий уходит одним сообщением-конвертом.
+
+        Группы без общих книг публикуются одновременно. Группа, в которой есть книга из более
+        ранней группы, ждёт её подтверждения, а если та не подтверждена — не публикуется:
+        иначе `deleted` может обогнать `created` той же книги, ушедший другим каналом.
+        `traceparents` — контекст трассировки для каждой группы (из outbox); без него — текущий.
+        """
+        await self._ensure_connected()
+        traceparents = traceparents or [None] * len(groups)
+        last_publish: Dict[UUID, asyncio.Task] = {}
+        publishes = []
+        for group, traceparent in zip(groups, traceparents):
+            book_ids = {event.book_id for event in group}
+            previous = {last_publish[book_id] for book_id in book_ids if book_id in last_publish}
+            publish = asyncio.ensure_future(self._publish_after(previous, group, traceparent))
+            for book_id in book_ids:
+                last_publish[book_id] = publish
+            publishes.append(publish)
+        return list(await asyncio.gather(*publishes))
+
+    async def _publish_after(self, previous: Set[asyncio.Task], events: List[BookEvent],
+                             traceparent: Optional[str]) -> bool:
+        if previous and not all(await asyncio.gather(*previous)):
             return False
+        return await self._publish(events, traceparent)
+
+    async def _publish(self, events: List[BookEvent], traceparent: Optional[str] = None) -> bool:
+        with tracer.span(f"publish book.{events[0].action}", kind="producer", parent=parse_traceparent(traceparent),
+                         **{"messaging.batch_size": len(events)}) as span, phase("publish"):
+            published = await self._publish_traced(events)
+            if span is not None and not published:
+                span.status = "error"
+            return published
+
+    async def _publish_traced(self, events: List[BookEvent]) -> bool:
+        async with self._in_flight_limit:
+            stats = self.stats
+            stats.in_flight += 1
+            _in_flight.inc()
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            started = time.perf_counter()
+            try:
+                body, content_type = encode_events(events, self.encoding, published_at=datetime.now(timezone.utc))
+                # С publisher confirms publish завершается только после Basic.Ack от брокера.
+                await self.pool.exchange_for(events[0].book_id.int).publish(
+                    aio_pika.Message(
+                        body=body,
+                        content_type=content_type,
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        headers=inject_headers({}),
+                    ),
+                    routing_key=f"book.{events[0].action}"
+                )
+            except Exception as e:
+                stats.failed += 1
+                _failed.inc()
+                logger.error(f"Error sending event: {str(e)}")
+                return False
+            finally:
+                stats.in_flight -= 1
+                _in_flight.dec()
+            stats.observe_confirm((time.perf_counter() - started) * 1000)
+            logger.debug(f"Sent {len(events)} event(s): {events[0].action}")
+            return True
 
     async def disconnect(self):
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
         if self.connection and not self.connection.is_closed:
+            await self.pool.close()
             await self.connection.close()
-            logger.info("Disconnected from RabbitMQ")
\ No newline at end of file
+            logger.info("Disconnected from RabbitMQ")
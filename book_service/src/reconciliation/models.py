@@ -0,0 +1,11 @@
+from sqlalchemy import Column, BigInteger, Numeric, String
+from src.database import Base
+
+
+class KeyDigestBucketModel(Base):
+    """Количество и сумма хешей ключей по первым трём hex-символам; ведётся триггерами таблицы ключей."""
+    __tablename__ = "key_digest_buckets"
+
+    bucket = Column(String(3), primary_key=True)
+    count = Column(BigInteger, nullable=False)
+    hash = Column(Numeric, nullable=False)
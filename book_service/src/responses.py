@@ -0,0 +1,20 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import Response
+
+from common.monitoring.timing import phase
+
+
+class TrustedJSONResponse(Response):
+    """JSON-ответ из уже проверенных данных: без jsonable_encoder и валидации по response_model.
+
+    `to_json` сам сериализует UUID, datetime и Enum, так что строки из БД уходят как есть.
+    Обработчик оставляет `response_model` для схемы OpenAPI: FastAPI не применяет его к
+    возвращённому экземпляру Response.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialization"):
+            return to_json(content)
@@ -0,0 +1,20 @@
+"""Производственный запуск сервиса: `python -m src.server [--workers N] [--port P]`.
+
+Общее для сервисов — число воркеров, сводный /metrics, параметры uvicorn — в common.server.
+У каждого воркера book_service свой релей outbox: пачки делятся через SKIP LOCKED.
+"""
+from typing import List, Optional
+
+from src.config import settings
+from common.server import main as run_server
+
+SERVICE = "book_service"
+APPS = {"web": "src.main:app"}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    run_server(SERVICE, APPS, settings, argv)
+
+
+if __name__ == "__main__":
+    main()
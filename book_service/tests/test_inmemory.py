@@ -0,0 +1,113 @@
+import aio_pika
+import asyncio
+import pytest
+from uuid import uuid4
+from common.rabbit.codec import decode_events
+from common.rabbit.inmemory import FaultProfile, InMemoryBroker, install_broker
+from src.rabbit.producer import RabbitMQProducer
+from common.rabbit.schemas import BookEvent
+
+
+async def subscribe(broker, routing_key="book.*", no_ack=False):
+    connection = await broker.connect()
+    channel = await connection.channel()
+    exchange = await channel.declare_exchange("book_events", aio_pika.ExchangeType.TOPIC, durable=True)
+    queue = await channel.declare_queue("library", durable=True)
+    await queue.bind(exchange, routing_key=routing_key)
+    return connection, queue
+
+
+async def started_producer(broker_name):
+    producer = RabbitMQProducer(f"memory://{broker_name}", channel_pool_size=2)
+    await producer.start()
+    return producer
+
+
+@pytest.mark.asyncio
+async def test_producer_publishes_through_topic_routing():
+    broker = InMemoryBroker()
+    install_broker(broker, "routing")
+    _, queue = await subscribe(broker, routing_key="book.created")
+    producer = await started_producer("routing")
+
+    events = [BookEvent(book_id=uuid4(), action="created"), BookEvent(book_id=uuid4(), action="deleted")]
+    assert await producer.publish_many(events) == [True, True]
+
+    message = await queue.get()
+    decoded, = decode_events(message.body, message.content_type)
+    assert (decoded.book_id, decoded.action) == (events[0].book_id, "created")
+    assert decoded.published_at is not None
+    assert await queue.get(fail=False) is None
+    assert broker.stats.unroutable == 1
+    await producer.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_hash_binding_matches_zero_words():
+    broker = InMemoryBroker()
+    connection, queue = await subscribe(broker, routing_key="book.#")
+    channel = await connection.channel()
+    exchange = await channel.declare_exchange("book_events", aio_pika.ExchangeType.TOPIC, durable=True)
+
+    for routing_key in ("book", "book.created", "book.created.v1", "books"):
+        await exchange.publish(aio_pika.Message(body=routing_key.encode()), routing_key=routing_key)
+
+    delivered = []
+    while (message := await queue.get(fail=False)) is not None:
+        delivered.append(message.body.decode())
+        await message.ack()
+    assert delivered == ["book", "book.created", "book.created.v1"]
+    assert broker.stats.unroutable == 1
+
+
+@pytest.mark.asyncio
+async def test_nacks_are_reported_to_producer():
+    broker = InMemoryBroker(FaultProfile(nack_rate=1.0))
+    install_broker(broker, "nacks")
+    producer = await started_producer("nacks")
+
+    assert await producer.publish_many([BookEvent(book_id=uuid4(), action="created")]) == [False]
+    assert producer.stats.failed == 1
+    await producer.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_redelivers_unacked_messages():
+    broker = InMemoryBroker()
+    connection, queue = await subscribe(broker)
+    deliveries = []
+
+    async def record(message):
+        deliveries.append(message)
+
+    await queue.consume(record)
+    exchange = await (await connection.channel()).declare_exchange("book_events", aio_pika.ExchangeType.TOPIC)
+
+    await exchange.publish(aio_pika.Message(body=b"1"), routing_key="book.created")
+    await asyncio.sleep(0.01)
+    broker.disconnect(seconds=0.01)
+    await deliveries[0].ack()
+    await asyncio.sleep(0.05)
+
+    assert [message.redelivered for message in deliveries] == [False, True]
+    await deliveries[1].ack()
+    assert broker.stats.acked == 1
+    broker.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_ttl_dead_letters_back_to_target_queue():
+    broker = InMemoryBroker()
+    connection = await broker.connect()
+    channel = await connection.channel()
+    target = await channel.declare_queue("main")
+    await channel.declare_queue("main.retry", arguments={
+        "x-message-ttl": 10, "x-dead-letter-exchange": "", "x-dead-letter-routing-key": "main",
+    })
+
+    await channel.default_exchange.publish(aio_pika.Message(body=b"retry me"), routing_key="main.retry")
+    assert await target.get(fail=False) is None
+    await asyncio.sleep(0.03)
+
+    assert (await target.get()).body == b"retry me"
+    assert broker.stats.dead_lettered == 1
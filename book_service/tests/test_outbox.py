@@ -0,0 +1,82 @@
+import pytest
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from src.outbox.models import OutboxEventModel
+from src.outbox.relay import OutboxRelay
+
+
+def make_events(count):
+    return [OutboxEventModel(id=i, book_id=uuid4(), action="created") for i in range(1, count + 1)]
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_marks_published_events_sent():
+    events = make_events(3)
+    repo = AsyncMock()
+    repo.claim_batch.return_value = events
+    producer = AsyncMock()
+    producer.publish_groups.return_value = [True, True, True]
+
+    relay = OutboxRelay(AsyncMock(), producer, batch_size=10)
+    relayed = await relay._publish_batch(repo)
+
+    assert relayed == 3
+    repo.claim_batch.assert_awaited_once_with(10)
+    repo.mark_sent.assert_awaited_once_with([1, 2, 3])
+    published = producer.publish_groups.await_args.args[0]
+    assert [[(e.book_id, e.action) for e in group] for group in published] == \
+        [[(e.book_id, e.action)] for e in events]
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_marks_only_confirmed_prefix():
+    events = make_events(3)
+    repo = AsyncMock()
+    repo.claim_batch.return_value = events
+    producer = AsyncMock()
+    producer.publish_groups.return_value = [True, False, True]
+
+    relay = OutboxRelay(AsyncMock(), producer)
+    relayed = await relay._publish_batch(repo)
+
+    assert relayed == 1
+    repo.mark_sent.assert_awaited_once_with([1])
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_broker_unavailable():
+    repo = AsyncMock()
+    repo.claim_batch.return_value = make_events(2)
+    producer = AsyncMock()
+    producer.publish_groups.side_effect = ConnectionError("RabbitMQ connection failed")
+
+    relay = OutboxRelay(AsyncMock(), producer)
+    relayed = await relay._publish_batch(repo)
+
+    assert relayed == 0
+    repo.mark_sent.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_groups_events_of_one_operation():
+    operation_id = uuid4()
+    events = [
+        OutboxEventModel(id=1, book_id=uuid4(), action="created", operation_id=operation_id),
+        OutboxEventModel(id=2, book_id=uuid4(), action="created", operation_id=operation_id),
+        OutboxEventModel(id=3, book_id=uuid4(), action="deleted"),
+        OutboxEventModel(id=4, book_id=uuid4(), action="created", operation_id=operation_id),
+        OutboxEventModel(id=5, book_id=uuid4(), action="created", operation_id=operation_id),
+        OutboxEventModel(id=6, book_id=uuid4(), action="created", operation_id=operation_id),
+    ]
+    repo = AsyncMock()
+    repo.claim_batch.return_value = events
+    producer = AsyncMock()
+    producer.publish_groups.return_value = [True, True, True, False]
+
+    relay = OutboxRelay(AsyncMock(), producer, max_envelope_size=2)
+    relayed = await relay._publish_batch(repo)
+
+    published = producer.publish_groups.await_args.args[0]
+    assert [len(group) for group in published] == [2, 1, 2, 1]
+    assert relayed == 5
+    repo.mark_sent.assert_awaited_once_with([1, 2, 3, 4, 5])
@@ -0,0 +1,44 @@
+import sqlite3
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+from src.config import settings
+from src.database import engine_options
+from common.monitoring.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedPoolMixin, pool_status
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+def test_pool_counts_overflow_and_timeouts():
+    pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=1, timeout=0.01)
+
+    first = pool.connect()
+    second = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    status = pool_status(SimpleNamespace(pool=pool))
+    assert status["checked_out"] == 2
+    assert status["overflow"] == 1
+    assert status["utilization"] == 1.0
+    assert status["checkouts"] == 2
+    assert status["overflow_opened"] == 1
+    assert status["timeouts"] == 1
+
+    first.close()
+    second.close()
+    assert pool_status(SimpleNamespace(pool=pool))["checked_out"] == 0
+
+
+def test_engine_options_pgbouncer_disables_statement_cache():
+    options = engine_options(settings.model_copy(update={"DB_PGBOUNCER": True, "DB_COMMAND_TIMEOUT": 5}))
+    connect_args = options["connect_args"]
+
+    assert options["poolclass"] is InstrumentedAsyncAdaptedQueuePool
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["command_timeout"] == 5
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
@@ -0,0 +1,185 @@
+import aio_pika
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+from src.rabbit.channel_pool import ChannelPool
+from src.rabbit.producer import RabbitMQProducer
+from common.rabbit.schemas import BookEvent
+
+
+class SlowConfirmExchange:
+    def __init__(self, delay: float, fail_on: int | None = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.routing_keys = []
+
+    async def publish(self, message, routing_key):
+        index = len(self.routing_keys)
+        self.routing_keys.append(routing_key)
+        await asyncio.sleep(self.delay)
+        if index == self.fail_on:
+            raise RuntimeError("nack")
+
+
+class StubPool:
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def exchange_for(self, key):
+        return self.exchange
+
+
+def connected_producer(exchange, max_in_flight=256):
+    producer = RabbitMQProducer("amqp://test", max_in_flight=max_in_flight)
+    producer.pool = StubPool(exchange)
+    producer.is_connected = AsyncMock(return_value=True)
+    return producer
+
+
+@pytest.mark.asyncio
+async def test_publish_many_keeps_publishes_in_flight():
+    producer = connected_producer(SlowConfirmExchange(delay=0.05))
+    events = [BookEvent(book_id=uuid4(), action="created") for _ in range(20)]
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await producer.publish_many(events)
+
+    assert results == [True] * 20
+    assert loop.time() - started < 0.5
+    assert producer.stats.max_in_flight == 20
+    assert producer.stats.in_flight == 0
+    assert producer.stats.published == 20
+
+
+@pytest.mark.asyncio
+async def test_publish_many_reports_failures_per_event():
+    producer = connected_producer(SlowConfirmExchange(delay=0, fail_on=1))
+    events = [BookEvent(book_id=uuid4(), action=action) for action in ("created", "deleted", "created")]
+
+    results = await producer.publish_many(events)
+
+    assert results == [True, False, True]
+    assert producer.stats.failed == 1
+    assert producer.pool.exchange.routing_keys == ["book.created", "book.deleted", "book.created"]
+
+
+@pytest.mark.asyncio
+async def test_publish_many_respects_in_flight_limit():
+    producer = connected_producer(SlowConfirmExchange(delay=0.01), max_in_flight=4)
+
+    await producer.publish_many([BookEvent(book_id=uuid4(), action="created") for _ in range(12)])
+
+    assert producer.stats.max_in_flight == 4
+
+
+class ArrivalExchange:
+    """Канал, подтверждающий через `delay`; `arrivals` — общий порядок, в котором сообщения дошли до брокера."""
+
+    def __init__(self, delay: float, arrivals: list, fail: bool = False):
+        self.delay = delay
+        self.arrivals = arrivals
+        self.fail = fail
+
+    async def publish(self, message, routing_key):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("nack")
+        self.arrivals.append(message.body)
+
+
+class PinnedPool:
+    def __init__(self, exchanges):
+        self.exchanges = exchanges
+
+    def exchange_for(self, key):
+        return self.exchanges[key % len(self.exchanges)]
+
+
+@pytest.mark.asyncio
+async def test_publish_groups_keeps_order_of_one_book_across_channels():
+    arrivals = []
+    producer = connected_producer(None)
+    producer.pool = PinnedPool([ArrivalExchange(0.05, arrivals), ArrivalExchange(0, arrivals)])
+    first, second = UUID(int=0), UUID(int=1)
+    # Конверт массовой операции уходит каналом первой книги (медленным), а `deleted` второй книги — быстрым.
+    bulk = [BookEvent(book_id=first, action="created"), BookEvent(book_id=second, action="created")]
+    deleted = [BookEvent(book_id=second, action="deleted")]
+
+    assert await producer.publish_groups([bulk, deleted]) == [True, True]
+
+    assert [b"deleted" in body for body in arrivals] == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_publish_groups_skips_events_after_unconfirmed_event_of_same_book():
+    arrivals = []
+    producer = connected_producer(None)
+    producer.pool = PinnedPool([ArrivalExchange(0, arrivals, fail=True), ArrivalExchange(0, arrivals)])
+    book_id, other = UUID(int=0), UUID(int=1)
+
+    results = await producer.publish_groups([[BookEvent(book_id=book_id, action="created")],
+                                             [BookEvent(book_id=other, action="created")],
+                                             [BookEvent(book_id=book_id, action="deleted")]])
+
+    assert results == [False, True, False]
+    assert len(arrivals) == 1
+
+
+class FakeChannel:
+    def __init__(self, name):
+        self.name = name
+        self.is_closed = False
+
+    async def declare_exchange(self, name, type, durable):
+        return f"exchange-{self.name}"
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.is_closed = False
+        self.opened = 0
+
+    async def channel(self, publisher_confirms):
+        self.opened += 1
+        return FakeChannel(self.opened)
+
+
+@pytest.mark.asyncio
+async def test_channel_pool_pins_keys_and_skips_closed_channels():
+    pool = ChannelPool(3, "book_events", aio_pika.ExchangeType.TOPIC)
+    await pool.open(FakeConnection())
+
+    assert [pool.exchange_for(key) for key in (0, 1, 2, 4)] == ["exchange-1", "exchange-2", "exchange-3", "exchange-2"]
+
+    pool._slots[1][0].is_closed = True
+    assert [pool.exchange_for(key) for key in (1, 4)] == ["exchange-3", "exchange-3"]
+    assert pool.healthy_count() == 2
+
+
+@pytest.mark.asyncio
+async def test_channel_pool_heal_reopens_closed_channels():
+    connection = FakeConnection()
+    pool = ChannelPool(2, "book_events", aio_pika.ExchangeType.TOPIC)
+    await pool.open(connection)
+    for channel, _ in pool._slots:
+        channel.is_closed = True
+
+    with pytest.raises(ConnectionError):
+        pool.exchange_for(0)
+
+    assert await pool.heal() == 2
+    assert pool.healthy_count() == 2
+    assert pool.reopened == 2
+
+
+@pytest.mark.asyncio
+async def test_send_event_fails_fast_without_connection():
+    producer = RabbitMQProducer("amqp://test")
+
+    with pytest.raises(ConnectionError):
+        await producer.send_event(uuid4(), "created")
@@ -0,0 +1,29 @@
+from uuid import uuid4
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.books.schemas import Book
+from src.responses import TrustedJSONResponse
+
+
+def test_trusted_response_matches_response_model_output():
+    rows = [
+        {"title": "Мастер и Маргарита", "author": "Булгаков", "isbn": "9785170000000",
+         "description": None, "language": "ru", "genre": "fiction", "id": uuid4()},
+        {"title": "Dune", "author": "Herbert", "isbn": "0441013597",
+         "description": "Arrakis \"spice\"", "language": "en", "genre": "fiction", "id": uuid4()},
+    ]
+    app = FastAPI()
+
+    @app.get("/validated", response_model=list[Book])
+    async def validated():
+        return rows
+
+    @app.get("/trusted", response_model=list[Book])
+    async def trusted():
+        return TrustedJSONResponse(rows)
+
+    client = TestClient(app)
+    response = client.get("/trusted")
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == client.get("/validated").content
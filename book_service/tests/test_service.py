@@ -30,15 +30,16 @@ async def test_create_book_success():
     mock_repo = AsyncMock()
     mock_repo.create.return_value = db_book
     
-    mock_producer = AsyncMock()
+    mock_outbox = AsyncMock()
     
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     result = await service.create_book(book_data)
     
     assert isinstance(result, Book)
     assert result.id == fake_id
     mock_repo.create.assert_called_once()
-    mock_producer.send_event.assert_called_once_with(fake_id, "created")
+    staged_book = mock_repo.create.call_args.args[0]
+    mock_outbox.add.assert_awaited_once_with(staged_book.id, "created")
 
 @pytest.mark.asyncio
 async def test_create_book_isbn_exists():
@@ -52,13 +53,13 @@ async def test_create_book_isbn_exists():
         genre="fiction"
     )
     mock_repo = AsyncMock()
-    mock_producer = AsyncMock()
+    mock_outbox = AsyncMock()
 
     integrity_error = IntegrityError("duplicate key value violates unique constraint", {}, None)
     repo_error = Exception("Repo", integrity_error)
     mock_repo.create.side_effect = repo_error
 
-    service = BookService(mock_repo, mock_producer)
+    service = BookService(mock_repo, mock_outbox)
 
     # Act & Assert
     with pytest.raises(Exception):  # можно заменить на ServiceError, если обернул
@@ -78,9 +79,9 @@ async def test_create_book_generic_repo_error():
     
     mock_repo = AsyncMock()
     mock_repo.create.side_effect = RepositoryError("Something went wrong")
-    mock_producer = AsyncMock()
+    mock_outbox = AsyncMock()
     
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     
     with pytest.raises(ServiceError) as exc:
         await service.create_book(book_data)
@@ -110,9 +111,9 @@ async def test_get_book_success():
 async def test_list_books_repo_error():
     mock_repo = AsyncMock()
     mock_repo.get_all.side_effect = RepositoryError("DB fail")
-    mock_producer = AsyncMock()
+    mock_outbox = AsyncMock()
     
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     with pytest.raises(ServiceError):
         await service.list_books()
 
@@ -124,9 +125,9 @@ async def test_get_book_found():
     
     mock_repo = AsyncMock()
     mock_repo.get.return_value = mock_book
-    mock_producer = AsyncMock()
+    mock_outbox = AsyncMock()
     
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     book = await service.get_book(book_id)
     
     assert isinstance(book, Book)
@@ -173,8 +174,8 @@ async def test_update_book_not_found():
     
     mock_repo = AsyncMock()
     mock_repo.get.return_value = None
-    mock_producer = AsyncMock()
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    mock_outbox = AsyncMock()
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     
     with pytest.raises(BookNotFoundError):
         await service.update_book(book_id, update_data)
@@ -191,8 +192,8 @@ async def test_update_book_isbn_conflict():
     err = RepositoryError(original_error=IntegrityError("UNIQUE constraint failed: isbn", None, None))
     mock_repo.update.side_effect = err
     
-    mock_producer = AsyncMock()
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    mock_outbox = AsyncMock()
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     
     with pytest.raises(ISBNAlreadyExistsError):
         await service.update_book(book_id, update_data)
@@ -205,12 +206,12 @@ async def test_delete_book_success():
     mock_repo = AsyncMock()
     mock_repo.delete.return_value = 1
     
-    mock_producer = AsyncMock()
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    mock_outbox = AsyncMock()
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     
     result = await service.delete_book(book_id)
     assert result is None
-    mock_producer.send_event.assert_called_once_with(book_id, "deleted")
+    mock_outbox.add.assert_awaited_once_with(book_id, "deleted")
 
 
 @pytest.mark.asyncio
@@ -220,8 +221,8 @@ async def test_delete_book_not_found():
     mock_repo = AsyncMock()
     mock_repo.delete.return_value = 0
     
-    mock_producer = AsyncMock()
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    mock_outbox = AsyncMock()
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     
     with pytest.raises(BookNotFoundError):
         await service.delete_book(book_id)
@@ -234,8 +235,55 @@ async def test_delete_book_repo_error():
     mock_repo = AsyncMock()
     mock_repo.delete.side_effect = RepositoryError("DB error")
     
-    mock_producer = AsyncMock()
-    service = BookService(repo=mock_repo, producer=mock_producer)
+    mock_outbox = AsyncMock()
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
     
     with pytest.raises(ServiceError):
         await service.delete_book(book_id)
+
+
+@pytest.mark.asyncio
+async def test_create_books_share_operation_id():
+    books_data = [
+        BookCreate(title=f"Title {i}", author="Author", isbn=f"123456789{i}", language="en", genre="fiction")
+        for i in range(3)
+    ]
+    mock_repo = AsyncMock()
+    mock_repo.create_many.side_effect = lambda books: books
+    mock_outbox = AsyncMock()
+    service = BookService(repo=mock_repo, outbox=mock_outbox)
+
+    result = await service.create_books(books_data)
+
+    assert [book.isbn for book in result] == [data.isbn for data in books_data]
+    calls = mock_outbox.add.await_args_list
+    assert [call.args[0] for call in calls] == [book.id for book in result]
+    assert {call.args[2] for call in calls} == {calls[0].args[2]}
+
+
+@pytest.mark.asyncio
+async def test_create_books_isbn_conflict():
+    books_data = [BookCreate(title="Title", author="Author", isbn="1234567890", language="en", genre="fiction")]
+    integrity_error = IntegrityError(
+        "duplicate key value violates unique constraint", {},
+        Exception("DETAIL:  Key (isbn)=(1234567890) already exists.")
+    )
+    mock_repo = AsyncMock()
+    mock_repo.create_many.side_effect = RepositoryError("DB error", original_error=integrity_error)
+    service = BookService(repo=mock_repo, outbox=AsyncMock())
+
+    with pytest.raises(ISBNAlreadyExistsError) as exc_info:
+        await service.create_books(books_data)
+    assert exc_info.value.isbn == "1234567890"
+
+
+@pytest.mark.asyncio
+async def test_delete_books_missing_book():
+    present, missing = uuid4(), uuid4()
+    mock_repo = AsyncMock()
+    mock_repo.delete_many.return_value = [present]
+    service = BookService(repo=mock_repo, outbox=AsyncMock())
+
+    with pytest.raises(BookNotFoundError) as exc_info:
+        await service.delete_books([present, missing])
+    assert exc_info.value.book_id == missing
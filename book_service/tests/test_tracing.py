@@ -0,0 +1,79 @@
+import aio_pika
+import pytest
+from uuid import uuid4
+from common.monitoring.tracing import SpanExporter, Tracer, current_traceparent, parse_traceparent, tracer
+from common.rabbit.inmemory import InMemoryBroker, install_broker
+from src.rabbit.producer import RabbitMQProducer
+from common.rabbit.schemas import BookEvent
+
+PARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exported():
+    exporter = ListExporter()
+    previous = tracer.service, tracer.exporter, tracer.sample_ratio
+    tracer.configure("book_service", exporter, 1.0)
+    yield exporter.spans
+    tracer.configure(*previous)
+
+
+def test_parse_traceparent():
+    context = parse_traceparent(PARENT)
+    assert context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert context.sampled
+    assert context.traceparent == PARENT
+    assert parse_traceparent("00-00000000000000000000000000000000-00f067aa0ba902b7-01") is None
+    assert parse_traceparent("garbage") is None
+
+
+def test_child_spans_follow_parent_sampling_decision():
+    exporter = ListExporter()
+    local = Tracer("book_service", exporter, sample_ratio=1.0)
+
+    with local.span("sampled", parent=parse_traceparent(PARENT)):
+        with local.span("child") as child:
+            assert child is not None
+    assert [span.name for span in exporter.spans] == ["child", "sampled"]
+    assert exporter.spans[0].parent_id == exporter.spans[1].context.span_id
+    assert exporter.spans[1].parent_id == "00f067aa0ba902b7"
+
+    exporter.spans.clear()
+    with local.span("not sampled", parent=parse_traceparent(PARENT[:-2] + "00")) as span:
+        assert span is None
+        with local.span("child") as child:
+            assert child is None
+        # Решение «не записывать» всё равно передаётся дальше.
+        assert current_traceparent().startswith("00-4bf92f3577b34da6a3ce929d0e0e4736-")
+        assert current_traceparent().endswith("-00")
+    assert exporter.spans == []
+
+
+@pytest.mark.asyncio
+async def test_publish_continues_trace_from_outbox(exported):
+    broker = InMemoryBroker()
+    install_broker(broker, "tracing")
+    connection = await broker.connect()
+    channel = await connection.channel()
+    exchange = await channel.declare_exchange("book_events", aio_pika.ExchangeType.TOPIC, durable=True)
+    queue = await channel.declare_queue("library", durable=True)
+    await queue.bind(exchange, routing_key="book.*")
+    producer = RabbitMQProducer("memory://tracing", channel_pool_size=1)
+    await producer.start()
+
+    assert await producer.publish_groups([[BookEvent(book_id=uuid4(), action="created")]], traceparents=[PARENT]) == [True]
+
+    publish_span, = exported
+    assert publish_span.name == "publish book.created"
+    assert publish_span.parent_id == "00f067aa0ba902b7"
+    message = await queue.get()
+    assert parse_traceparent(message.headers["traceparent"]) == publish_span.context
+    await producer.disconnect()
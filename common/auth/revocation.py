@@ -0,0 +1,84 @@
+import math
+import time
+from hashlib import blake2b
+from typing import Optional
+
+
+class BloomFilter:
+    """Битовый Bloom-фильтр: `False` — ключа точно нет, `True` — ключ, возможно, есть."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Двойное хеширование: k позиций из одного 128-битного дайджеста.
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class RevocationList:
+    """Список отозванных токенов в памяти процесса.
+
+    Bloom-фильтр отвечает на частый вопрос «не отозван ли токен» без обращения
+    к точному множеству; точное множество хранит срок жизни каждой записи и
+    отсекает ложные срабатывания фильтра.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self._error_rate = error_rate
+        self._expires: dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def revoke(self, key: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        self._expires[key] = max(expires_at, self._expires.get(key, 0.0))
+        self._bloom.add(key)
+        if len(self._expires) > self._bloom.capacity:
+            self._rebuild(self._bloom.capacity * 2)
+
+    def is_revoked(self, key: str) -> bool:
+        if key not in self._bloom:
+            return False
+        expires_at = self._expires.get(key)
+        return expires_at is not None and expires_at > time.time()
+
+    def is_token_revoked(self, sub: Optional[str], jti: Optional[str]) -> bool:
+        return (sub is not None and self.is_revoked(f"sub:{sub}")) or \
+               (jti is not None and self.is_revoked(f"jti:{jti}"))
+
+    def purge_expired(self) -> int:
+        """Удаляет истёкшие записи и пересобирает фильтр. Возвращает количество удалённых."""
+        now = time.time()
+        expired = [key for key, expires_at in self._expires.items() if expires_at <= now]
+        for key in expired:
+            del self._expires[key]
+        if expired:
+            self._rebuild(self._bloom.capacity)
+        return len(expired)
+
+    def _rebuild(self, capacity: int) -> None:
+        bloom = BloomFilter(capacity, self._error_rate)
+        for key in self._expires:
+            bloom.add(key)
+        self._bloom = bloom
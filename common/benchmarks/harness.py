@@ -0,0 +1,202 @@
+"""Минимальный раннер микробенчмарков: регистрация, замер, базовая линия в JSON и сравнение.
+
+Замер как у timeit: число вызовов в серии подбирается так, чтобы серия длилась не меньше
+`min_time`, затем серия повторяется `repeats` раз. Сравнение идёт по минимальному времени
+серии — оно меньше всего зависит от фонового шума машины.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 0.15
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[[], Any]
+    is_async: bool
+
+
+@dataclass
+class Result:
+    name: str
+    number: int
+    repeats: int
+    min_ns: float
+    median_ns: float
+
+    def to_dict(self) -> Dict:
+        return {"number": self.number, "repeats": self.repeats, "min_ns": round(self.min_ns, 1), "median_ns": round(self.median_ns, 1)}
+
+
+_registry: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Регистрирует функцию без аргументов (обычную или async) как бенчмарк `name`."""
+    def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+        if name in _registry:
+            raise ValueError(f"Benchmark {name!r} is already registered")
+        _registry[name] = Benchmark(name, func, asyncio.iscoroutinefunction(func))
+        return func
+    return decorator
+
+
+def registered() -> List[Benchmark]:
+    return list(_registry.values())
+
+
+def _timer(bench: Benchmark, loop: asyncio.AbstractEventLoop) -> Callable[[int], int]:
+    if bench.is_async:
+        async def run(number: int) -> None:
+            for _ in range(number):
+                await bench.func()
+
+        def timed(number: int) -> int:
+            started = time.perf_counter_ns()
+            loop.run_until_complete(run(number))
+            return time.perf_counter_ns() - started
+        return timed
+
+    func = bench.func
+
+    def timed(number: int) -> int:
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        return time.perf_counter_ns() - started
+    return timed
+
+
+def measure(bench: Benchmark, min_time: float = 0.2, repeats: int = 5) -> Result:
+    loop = asyncio.new_event_loop()
+    # Как timeit: сборщик мусора выключен, чтобы паузы GC от чужих объектов не попадали в замер.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        timed = _timer(bench, loop)
+        number = 1
+        while True:
+            elapsed = timed(number)
+            if elapsed >= min_time * 1e9 or number >= 1 << 24:
+                break
+            # Оценка по прошлой серии с запасом, но не больше чем в 10 раз за шаг.
+            number = min(number * 10, max(number * 2, int(number * min_time * 1e9 / max(elapsed, 1) * 1.2)))
+        samples = [timed(number) / number for _ in range(repeats)]
+    finally:
+        loop.close()
+        if gc_enabled:
+            gc.enable()
+    return Result(bench.name, number, repeats, min(samples), statistics.median(samples))
+
+
+def machine_info() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_baseline(results: List[Result], path: Path, merge: bool = False) -> None:
+    """Записывает базовую линию; с `merge` обновляет только замеренные бенчмарки."""
+    previous = load_baseline(path)["results"] if merge and path.exists() else {}
+    document = {
+        "version": BASELINE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "results": {**previous, **{result.name: result.to_dict() for result in results}},
+    }
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> Dict:
+    document = json.loads(path.read_text(encoding="utf-8"))
+    if document.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version in {path}: {document.get('version')}")
+    return document
+
+
+def compare(results: List[Result], baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Сравнивает с базовой линией по `min_ns`: status — regression, improvement, ok или new."""
+    rows = []
+    for result in results:
+        reference = baseline["results"].get(result.name)
+        if reference is None:
+            rows.append({"name": result.name, "status": "new", "ratio": None, "min_ns": result.min_ns, "baseline_ns": None})
+            continue
+        ratio = result.min_ns / reference["min_ns"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": result.name, "status": status, "ratio": ratio,
+                     "min_ns": result.min_ns, "baseline_ns": reference["min_ns"]})
+    return rows
+
+
+def _format_ns(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value:.0f} ns"
+
+
+def main(baseline: Path, argv: Optional[List[str]] = None) -> int:
+    """CLI бенчмарков сервиса; `baseline` — базовая линия этого сервиса по умолчанию."""
+    parser = argparse.ArgumentParser(description="Микробенчмарки горячих функций сервиса")
+    parser.add_argument("-k", "--filter", default="", help="Только бенчмарки, в имени которых есть подстрока")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Минимальная длительность серии, с")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=baseline)
+    parser.add_argument("--save", action="store_true", help="Записать результаты как новую базовую линию")
+    parser.add_argument("--compare", action="store_true", help="Сравнить с базовой линией; код 1 при регрессии")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Допустимое замедление, доля")
+    parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for bench in registered():
+        if args.filter in bench.name:
+            result = measure(bench, args.min_time, args.repeats)
+            results.append(result)
+            if not args.json:
+                print(f"{bench.name:<56} {_format_ns(result.min_ns):>10} (median {_format_ns(result.median_ns)})",
+                      file=sys.stderr)
+
+    exit_code = 0
+    if args.compare:
+        baseline = load_baseline(args.baseline)
+        if baseline["machine"] != machine_info():
+            print("warning: baseline was recorded on a different machine", file=sys.stderr)
+        rows = compare(results, baseline, args.threshold)
+        for row in rows:
+            ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+            print(f"{row['status']:<12} {row['name']:<56} {_format_ns(row['baseline_ns']):>10} -> "
+                  f"{_format_ns(row['min_ns']):>10} {ratio:>7}", file=sys.stderr)
+        if any(row["status"] == "regression" for row in rows):
+            exit_code = 1
+    if args.json:
+        print(json.dumps({result.name: result.to_dict() for result in results}, indent=2))
+    if args.save:
+        save_baseline(results, args.baseline, merge=bool(args.filter))
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    return exit_code
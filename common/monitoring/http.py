@@ -0,0 +1,70 @@
+import asyncio
+import time
+from typing import Dict, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.monitoring.metrics import registry
+
+# Запросы к путям без маршрута (сканеры, опечатки) не должны плодить серии меток.
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = registry.counter("http_requests_total", "HTTP-запросы по методу, шаблону пути и коду ответа",
+                            ["method", "route", "status"])
+DURATION = registry.histogram("http_request_duration_seconds", "Время обработки HTTP-запроса",
+                              ["method", "route"])
+IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP-запросы в обработке")
+registry.gauge("asyncio_tasks", "Задачи event loop", function=lambda: len(asyncio.all_tasks()))
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Маршруты Starlette без шаблона (/docs, /openapi.json) оставляют только endpoint; путь у них постоянный.
+    return scope["path"] if "endpoint" in scope else UNMATCHED_ROUTE
+
+
+class HTTPMetricsMiddleware:
+    """ASGI-middleware с метриками запросов: счётчик по коду ответа, гистограмма времени, запросы в обработке.
+
+    Путь берётся из шаблона маршрута (`/books/{book_id}`), а не из URL. Метрики с метками
+    разбираются один раз на сочетание метода, маршрута и кода, дальше запись — это пара
+    операций со словарём без проверки меток.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._in_flight = IN_FLIGHT.labels()
+        self._series: Dict[Tuple[str, str, int], tuple] = {}
+
+    def record(self, method: str, route: str, status: int, elapsed: float) -> None:
+        series = self._series.get((method, route, status))
+        if series is None:
+            series = self._series[(method, route, status)] = (
+                REQUESTS.labels(method=method, route=route, status=str(status)),
+                DURATION.labels(method=method, route=route),
+            )
+        series[0].inc()
+        series[1].observe(elapsed)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._in_flight.dec()
+            self.record(scope["method"], route_template(scope), status, time.perf_counter() - started)
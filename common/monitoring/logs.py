@@ -0,0 +1,160 @@
+"""Неблокирующее логирование: запись уходит в очередь, форматирование и вывод — в отдельном потоке.
+
+В вызывающем потоке остаётся только подстановка аргументов в сообщение и привязка к текущей
+трассе. Очередь ограничена: если stdout не успевает, лишние записи отбрасываются и считаются
+в log_records_dropped_total, а не останавливают event loop.
+
+Сэмплирование задаётся по префиксам логгеров (`uvicorn.access=0.1,src.library=0.5`) и касается
+только записей ниже WARNING: предупреждения и ошибки пишутся всегда.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from common.monitoring.metrics import registry
+from common.monitoring.tracing import current_context
+
+LOG_FORMATS = ("json", "text")
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Логгеры uvicorn со своими синхронными обработчиками переводятся на общую очередь.
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+DROPPED = registry.counter("log_records_dropped_total", "Записи лога, не поместившиеся в очередь")
+SAMPLED_OUT = registry.counter("log_records_sampled_out_total", "Записи лога, отброшенные сэмплированием", ["logger"])
+
+# Атрибуты LogRecord; всё остальное пришло через extra= и попадает в JSON отдельными полями.
+# color_message — копия сообщения с ANSI-цветами, которую uvicorn передаёт для своей консоли.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "color_message"}
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """`логгер=доля,логгер=доля` → {префикс логгера: доля записей, которые пишутся}."""
+    rates = {}
+    for item in spec.split(","):
+        if item.strip():
+            name, _, rate = item.partition("=")
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает долю `rate` записей ниже WARNING для логгеров с самым длинным совпавшим префиксом."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Длинные префиксы первыми: `src.library.consumer` уточняет `src.library`.
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self._sampled_out = {name: SAMPLED_OUT.labels(logger=name) for name in rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                if random.random() < rate:
+                    return True
+                self._sampled_out[prefix].inc()
+                return False
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — один JSON-объект в строке: время, уровень, логгер, сообщение, трасса и поля из extra."""
+
+    def __init__(self, service: str):
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "service": self.service,
+            "pid": record.process,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, который при переполнении очереди отбрасывает запись вместо ожидания."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Стандартный prepare форматирует запись целиком в вызывающем потоке; здесь — только
+        # то, что нельзя отложить: аргументы сообщения, исключение и контекст трассы.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        context = current_context()
+        if context is not None:
+            record.trace_id = context.trace_id
+            record.span_id = context.span_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.inc()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@atexit.register
+def _stop_listener() -> None:
+    """Дописывает оставшиеся в очереди записи и останавливает поток вывода."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(service: str, level: str = "INFO", log_format: str = "json", sampling: str = "",
+                      queue_size: int = 10000) -> None:
+    """Направляет корневой логгер и логгеры uvicorn в очередь с выводом в stdout из отдельного потока."""
+    global _listener
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format}")
+    root = logging.getLogger()
+    # Как basicConfig(force=True): обработчики, добавленные при импорте библиотек, писали бы в обход очереди.
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _stop_listener()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter(service) if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    log_queue: queue.Queue = queue.Queue(queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    rates = parse_sampling(sampling)
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
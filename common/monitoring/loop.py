@@ -0,0 +1,106 @@
+"""Задержка event loop и обнаружение блокирующих вызовов.
+
+Фоновая задача засыпает на `interval` и измеряет, насколько позже она проснулась: это время,
+которое готовые к выполнению корутины ждали своей очереди. Всё, что не отдаёт управление
+(bcrypt, синхронный ввод-вывод, тяжёлая сериализация), видно здесь как всплеск задержки.
+
+Если задан порог, отдельный поток-сторож замечает, что задача не проснулась вовремя, и снимает
+стек потока event loop через `sys._current_frames`: в лог вместе с длительностью блокировки
+попадает то, что выполнялось. Код на C, не отпускающий GIL, сторож прервать не может — тогда
+стек снимается сразу после такого вызова и указывает на его вызывающую сторону.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from common.monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LAG = registry.histogram(
+    "event_loop_lag_seconds", "Задержка пробуждения задач event loop сверх запланированного",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+BLOCKS = registry.counter("event_loop_blocks_total", "Блокировки event loop дольше LOOP_BLOCK_THRESHOLD_MS")
+
+
+class LoopMonitor:
+    """Измеряет задержку event loop каждые `interval` секунд; `threshold` > 0 включает сторожа."""
+
+    def __init__(self, interval: float = 0.0, threshold: float = 0.0, stack_limit: int = 20):
+        self.configure(interval, threshold, stack_limit)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def configure(self, interval: float, threshold: float, stack_limit: int = 20) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_limit = stack_limit
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self) -> None:
+        """Запускает замер в текущем event loop; вызывается из lifespan."""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        # Начало текущего ожидания пробуждения; None — задача сейчас выполняется.
+        self._beat: Optional[float] = None
+        self._sampled_beat: Optional[float] = None
+        self._stack: Optional[str] = None
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._probe())
+        if self.threshold > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            beat = self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._beat = None
+            lag = max(0.0, time.monotonic() - beat - self.interval)
+            LAG.observe(lag)
+            if self.threshold > 0 and lag >= self.threshold:
+                BLOCKS.inc()
+                stack = self._stack if self._sampled_beat == beat else None
+                logger.warning(
+                    f"Event loop blocked for {lag * 1000:.0f} ms"
+                    + (f"; running:\n{stack}" if stack else "")
+                )
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 4):
+            beat = self._beat
+            if beat is None or beat == self._sampled_beat:
+                continue
+            if time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._stack = "".join(traceback.format_stack(frame, self.stack_limit)).rstrip()
+                self._sampled_beat = beat
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,170 @@
+"""Память процесса: метрики RSS и сборщика мусора и снимки tracemalloc по запросу.
+
+tracemalloc включается и выключается через /admin/memory без перезапуска. Пока он включён,
+каждое выделение памяти дороже примерно вдвое, поэтому держать его включённым стоит только
+на время поиска утечки: снимок до, снимок после, сравнение.
+"""
+import gc
+import os
+import resource
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from common.monitoring.metrics import registry
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# Кадры самого tracemalloc и импорта модулей только засоряют топ.
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> float:
+    """Текущий RSS из /proc; где его нет — пиковый из getrusage."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return float(int(statm.read().split()[1]) * _PAGE_SIZE)
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return float(peak if sys.platform == "darwin" else peak * 1024)
+
+
+registry.gauge("process_resident_memory_bytes", "Резидентная память процесса", function=rss_bytes)
+registry.gauge("process_peak_resident_memory_bytes", "Пиковая резидентная память процесса",
+               function=lambda: float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                                      * (1 if sys.platform == "darwin" else 1024)))
+registry.counter("python_gc_collections_total", "Сборки мусора по поколениям", ["generation"],
+                 function=lambda: {(str(gen),): float(stats["collections"]) for gen, stats in enumerate(gc.get_stats())})
+registry.counter("python_gc_objects_collected_total", "Объекты, собранные сборщиком мусора", ["generation"],
+                 function=lambda: {(str(gen),): float(stats["collected"]) for gen, stats in enumerate(gc.get_stats())})
+registry.gauge("python_gc_pending_objects", "Выделения с последней сборки по поколениям", ["generation"],
+               function=lambda: {(str(gen),): float(count) for gen, count in enumerate(gc.get_count())})
+registry.gauge("tracemalloc_traced_bytes", "Память, отслеживаемая tracemalloc; 0 — выключен",
+               function=lambda: float(tracemalloc.get_traced_memory()[0]))
+GC_PAUSE = registry.histogram(
+    "python_gc_pause_seconds", "Длительность сборки мусора (event loop стоит)", ["generation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+_gc_pause_series = [GC_PAUSE.labels(generation=str(generation)) for generation in range(3)]
+_gc_started = 0.0
+
+
+def _gc_callback(phase: str, info: Dict) -> None:
+    global _gc_started
+    if phase == "start":
+        _gc_started = time.perf_counter()
+    else:
+        _gc_pause_series[info["generation"]].observe(time.perf_counter() - _gc_started)
+
+
+def install_gc_metrics() -> None:
+    """Подключает гистограмму пауз сборщика мусора; повторный вызов ничего не меняет."""
+    if _gc_callback not in gc.callbacks:
+        gc.callbacks.append(_gc_callback)
+
+
+class MemoryTracker:
+    """Управление tracemalloc и последние `keep` снимков памяти."""
+
+    def __init__(self, keep: int = 5):
+        self.keep = keep
+        self._snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self._info: Dict[str, Dict] = {}
+
+    def status(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "rss_bytes": int(rss_bytes()),
+            "gc_counts": gc.get_count(),
+            "gc_stats": gc.get_stats(),
+            "snapshots": list(self._info.values()),
+        }
+
+    def start(self, frames: int = 1) -> bool:
+        """Включает tracemalloc; False, если он уже включён."""
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(frames)
+        return True
+
+    def stop(self) -> bool:
+        """Выключает tracemalloc и сбрасывает снимки: их трассы без него уже не с чем сравнивать."""
+        if not tracemalloc.is_tracing():
+            return False
+        tracemalloc.stop()
+        self._snapshots.clear()
+        self._info.clear()
+        return True
+
+    def take_snapshot(self) -> Dict:
+        """Снимок текущих выделений; вызывающий проверяет, что tracemalloc включён."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        snapshot_id = uuid.uuid4().hex[:12]
+        current, peak = tracemalloc.get_traced_memory()
+        self._snapshots[snapshot_id] = snapshot
+        self._info[snapshot_id] = {
+            "id": snapshot_id,
+            "taken_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "rss_bytes": int(rss_bytes()),
+        }
+        while len(self._snapshots) > self.keep:
+            oldest = next(iter(self._snapshots))
+            del self._snapshots[oldest]
+            del self._info[oldest]
+        return self._info[snapshot_id]
+
+    def get(self, snapshot_id: str) -> Optional[tracemalloc.Snapshot]:
+        return self._snapshots.get(snapshot_id)
+
+    @staticmethod
+    def object_counts(limit: int = 30) -> List[Dict]:
+        """Самые многочисленные типы объектов, отслеживаемых сборщиком мусора.
+
+        Работает и без tracemalloc: растущее число Session, InstanceState или LogRecord видно сразу.
+        """
+        counts = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+        return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
+
+    @staticmethod
+    def top(snapshot: tracemalloc.Snapshot, group_by: str = "lineno", limit: int = 20) -> List[Dict]:
+        return [
+            {
+                "size_bytes": stat.size,
+                "count": stat.count,
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            }
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    @staticmethod
+    def diff(base: tracemalloc.Snapshot, target: tracemalloc.Snapshot, group_by: str = "lineno",
+             limit: int = 20) -> List[Dict]:
+        """Места с наибольшим ростом памяти от `base` к `target`."""
+        return [
+            {
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            }
+            for stat in target.compare_to(base, group_by)[:limit]
+        ]
+
+
+memory_tracker = MemoryTracker()
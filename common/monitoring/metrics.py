@@ -0,0 +1,259 @@
+import bisect
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Метрики обновляются из одного event loop, поэтому обходятся без блокировок.
+# Формат выдачи — текстовый формат Prometheus 0.0.4.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> dict:
+        """Значения метрики в виде, пригодном для JSON: для сводки метрик нескольких процессов."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _ValueMetric(_Metric):
+    """Счётчик или gauge: значения по наборам меток или функция, вызываемая в момент выдачи.
+
+    Функция метрики без меток возвращает число, с метками — словарь {кортеж значений меток: число}.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], object]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {} if labelnames or function else {(): 0.0}
+        self._function = function
+
+    def _current(self) -> Dict[LabelValues, float]:
+        if self._function is None:
+            return self._values
+        if not self.labelnames:
+            return {(): float(self._function())}
+        return self._function()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def labels(self, **labels: str) -> "_BoundValue":
+        """Метрика с заранее разобранными метками — для горячего пути без проверки меток на каждый вызов."""
+        return _BoundValue(self._values, self._key(labels))
+
+    def value(self, **labels: str) -> float:
+        return self._current().get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._current().items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def snapshot(self) -> dict:
+        return {"type": self.type_name, "help": self.documentation, "labelnames": list(self.labelnames),
+                "series": [[list(key), value] for key, value in self._current().items()]}
+
+
+class _BoundValue:
+    __slots__ = ("_values", "_key")
+
+    def __init__(self, values: Dict[LabelValues, float], key: LabelValues):
+        self._values = values
+        self._key = key
+        values.setdefault(key, 0.0)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values[self._key] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._values[self._key] -= amount
+
+    def set(self, value: float) -> None:
+        self._values[self._key] = value
+
+
+class Counter(_ValueMetric):
+    type_name = "counter"
+
+
+class Gauge(_ValueMetric):
+    """Значение задаётся явно или вычисляется функцией в момент выдачи."""
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets: List[float] = sorted(buckets)
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def _get_series(self, key: LabelValues) -> _HistogramSeries:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+        return series
+
+    def observe(self, value: float, **labels: str) -> None:
+        series = self._get_series(self._key(labels))
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def labels(self, **labels: str) -> "_BoundHistogram":
+        return _BoundHistogram(self.buckets, self._get_series(self._key(labels)))
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series.count if series else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, math.inf], series.counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series.sum)}"
+            yield f"{self.name}_count{labels} {series.count}"
+
+    def snapshot(self) -> dict:
+        return {"type": self.type_name, "help": self.documentation, "labelnames": list(self.labelnames),
+                "buckets": self.buckets,
+                "series": [[list(key), series.counts, series.sum, series.count] for key, series in self._series.items()]}
+
+
+class _BoundHistogram:
+    __slots__ = ("_buckets", "_series")
+
+    def __init__(self, buckets: List[float], series: _HistogramSeries):
+        self._buckets = buckets
+        self._series = series
+
+    def observe(self, value: float) -> None:
+        series = self._series
+        series.counts[bisect.bisect_left(self._buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # Повторный импорт модуля (например, в тестах) возвращает ту же метрику.
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                function: Optional[Callable[[], object]] = None) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, function))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              function: Optional[Callable[[], object]] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+def merge_snapshots(snapshots: Iterable[Tuple[str, Dict[str, dict], bool]]) -> MetricsRegistry:
+    """Сводит снимки registry нескольких процессов `(воркер, снимок, процесс жив)` в один registry.
+
+    Счётчики и гистограммы складываются: в сумму входят и завершившиеся воркеры, иначе
+    счётчик уменьшался бы. Gauge — мгновенное состояние процесса, поэтому он отдаётся
+    по воркерам с меткой `worker` и только для живых процессов.
+    """
+    merged = MetricsRegistry()
+    for worker, snapshot, alive in snapshots:
+        for name, data in snapshot.items():
+            labelnames = data["labelnames"]
+            if data["type"] == "histogram":
+                histogram = merged.histogram(name, data["help"], labelnames, data["buckets"])
+                for key, counts, total, count in data["series"]:
+                    series = histogram._get_series(tuple(key))
+                    series.counts = [a + b for a, b in zip(series.counts, counts)]
+                    series.sum += total
+                    series.count += count
+            elif data["type"] == "counter":
+                counter = merged.counter(name, data["help"], labelnames)
+                for key, value in data["series"]:
+                    counter._values[tuple(key)] = counter._values.get(tuple(key), 0.0) + value
+            elif alive:
+                gauge = merged.gauge(name, data["help"], [*labelnames, "worker"])
+                for key, value in data["series"]:
+                    gauge._values[(*key, worker)] = value
+    return merged
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,102 @@
+"""Сводный /metrics для сервиса с несколькими воркерами uvicorn.
+
+Каждый воркер — отдельный процесс со своим registry, а запрос /metrics попадает в случайный
+из них. Если задан каталог METRICS_MULTIPROC_DIR (его создаёт common.server при запуске
+нескольких воркеров), воркер раз в `interval` секунд и при остановке записывает снимок своего
+registry в `<pid>.json`, а /metrics сводит снимки всех воркеров через `merge_snapshots`.
+Свой снимок отвечающий воркер записывает перед сводкой; снимки остальных отстают
+не больше чем на `interval`.
+"""
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from common.monitoring.metrics import MetricsRegistry, merge_snapshots, registry
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_DIR_ENV = "METRICS_MULTIPROC_DIR"
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_directory(directory: Path) -> None:
+    """Удаляет снимки прошлого запуска; вызывается до старта воркеров."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+class MultiprocessMetrics:
+    def __init__(self, source: MetricsRegistry, directory: Optional[str], interval: float = 5.0):
+        self.source = source
+        self.directory = Path(directory) if directory else None
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def write(self) -> None:
+        path = self.directory / f"{os.getpid()}.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.source.snapshot()), encoding="utf-8")
+        # Замена атомарна: читатель видит либо прошлый, либо новый снимок целиком.
+        os.replace(temporary, path)
+
+    def _snapshots(self) -> Iterator[Tuple[str, dict, bool]]:
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping metrics snapshot {path.name}: {e}")
+                continue
+            yield path.stem, snapshot, _alive(int(path.stem))
+
+    def render(self) -> str:
+        """Текст /metrics: сводка всех воркеров или registry процесса, если каталог не задан."""
+        if not self.enabled:
+            return self.source.render()
+        self.write()
+        return merge_snapshots(self._snapshots()).render()
+
+    async def start(self) -> None:
+        """Запускает периодическую запись снимка; вызывается из lifespan."""
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._write_periodically())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Последний снимок: счётчики завершившегося воркера остаются в сумме.
+        self.write()
+
+    async def _write_periodically(self) -> None:
+        while True:
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Cannot write metrics snapshot: {e}")
+            await asyncio.sleep(self.interval)
+
+
+multiprocess_metrics = MultiprocessMetrics(registry, os.environ.get(MULTIPROC_DIR_ENV))
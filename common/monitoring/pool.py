@@ -0,0 +1,121 @@
+import time
+from collections import deque
+from typing import Callable, Deque, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from common.monitoring.metrics import registry
+
+WAIT_SAMPLES = 1024
+
+
+class PoolStats:
+    """Счётчики выдачи соединений из пула; последние `WAIT_SAMPLES` ожиданий хранятся для перцентилей."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_opened = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def observe_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        self.recent_waits.append(seconds)
+
+    def wait_percentile(self, percentile: float) -> float:
+        if not self.recent_waits:
+            return 0.0
+        ordered = sorted(self.recent_waits)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+class InstrumentedPoolMixin:
+    """Замеряет ожидание соединения в `connect()` и считает таймауты и открытия сверх `pool_size`.
+
+    Время ожидания включает открытие нового соединения и pre-ping, если они случились:
+    для запроса это одна и та же задержка перед первым обращением к БД.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        if opened and self._overflow > 0:
+            self.stats.overflow_opened += 1
+        return opened
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine: AsyncEngine) -> Dict:
+    """Текущее состояние пула движка и накопленная статистика ожидания."""
+    pool = engine.pool
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    status = {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "utilization": pool.checkedout() / capacity if capacity else 0.0,
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update({
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "overflow_opened": stats.overflow_opened,
+            "wait_seconds_total": stats.wait_seconds_total,
+            "wait_seconds_max": stats.max_wait_seconds,
+            "wait_seconds_p50": stats.wait_percentile(0.5),
+            "wait_seconds_p99": stats.wait_percentile(0.99),
+        })
+    return status
+
+
+_metric_engines: Dict[str, AsyncEngine] = {}
+
+
+def _per_pool(read) -> Callable[[], Dict]:
+    return lambda: {(name,): float(read(engine.pool)) for name, engine in _metric_engines.items()}
+
+
+def _stat(pool, name: str) -> float:
+    stats = getattr(pool, "stats", None)
+    return getattr(stats, name) if stats is not None else 0.0
+
+
+def register_pool_metrics(engines: Dict[str, AsyncEngine]) -> None:
+    """Метрики пулов по имени пула; значения читаются из пулов в момент выдачи /metrics."""
+    _metric_engines.update(engines)
+    registry.gauge("db_pool_size", "Постоянный размер пула", ["pool"], function=_per_pool(lambda pool: pool.size()))
+    registry.gauge("db_pool_checked_out", "Выданные соединения", ["pool"],
+                   function=_per_pool(lambda pool: pool.checkedout()))
+    registry.gauge("db_pool_overflow", "Открытые соединения сверх pool_size", ["pool"],
+                   function=_per_pool(lambda pool: max(pool.overflow(), 0)))
+    registry.counter("db_pool_checkouts_total", "Выдачи соединений из пула", ["pool"],
+                     function=_per_pool(lambda pool: _stat(pool, "checkouts")))
+    registry.counter("db_pool_timeouts_total", "Таймауты ожидания соединения", ["pool"],
+                     function=_per_pool(lambda pool: _stat(pool, "timeouts")))
+    registry.counter("db_pool_wait_seconds_total", "Суммарное ожидание соединения", ["pool"],
+                     function=_per_pool(lambda pool: _stat(pool, "wait_seconds_total")))
@@ -0,0 +1,156 @@
+"""Профилирование отдельных запросов по заголовку `X-Profile: 1` с токеном администратора.
+
+Запрос выполняется под cProfile, профиль сохраняется файлом pstats (открывается в snakeviz,
+speedscope, `python -m pstats`) и отдаётся через /admin/profiles. cProfile видит весь поток,
+поэтому в профиль попадают и запросы, выполнявшиеся на том же event loop одновременно
+с профилируемым: одновременно идёт не больше одного профиля.
+
+Без заголовка middleware только просматривает список заголовков. Число профилей в минуту
+ограничено; запросы сверх лимита выполняются как обычно, с `X-Profile: rate-limited`.
+"""
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+
+class RequestProfiler:
+    """Лимит частоты профилей и хранилище последних `keep` из них в каталоге `directory`."""
+
+    def __init__(self, directory: str = "profiles", max_per_minute: int = 0, keep: int = 20):
+        self.configure(directory, max_per_minute, keep)
+
+    def configure(self, directory: str, max_per_minute: int, keep: int) -> None:
+        self.directory = Path(directory)
+        self.max_per_minute = max_per_minute
+        self.keep = keep
+        self._started: List[float] = []
+        self._active = False
+        self._profiles: Dict[str, Dict] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_per_minute > 0
+
+    def acquire(self) -> Optional[str]:
+        """Причина отказа (`busy`, `rate-limited`) или None, если профиль можно снимать."""
+        now = time.monotonic()
+        self._started = [started for started in self._started if now - started < 60]
+        if self._active:
+            return "busy"
+        if len(self._started) >= self.max_per_minute:
+            return "rate-limited"
+        self._started.append(now)
+        self._active = True
+        return None
+
+    def release(self) -> None:
+        self._active = False
+
+    async def save(self, profile: cProfile.Profile, info: Dict) -> None:
+        path = self.directory / f"{info['id']}.pstats"
+        # Запись файла — блокирующий ввод-вывод, выносим его из event loop.
+        await asyncio.to_thread(self._dump, profile, path)
+        self._profiles[info["id"]] = {**info, "size": path.stat().st_size}
+        for stale in sorted(self._profiles.values(), key=lambda entry: entry["created_at"])[:-self.keep or None]:
+            del self._profiles[stale["id"]]
+            (self.directory / f"{stale['id']}.pstats").unlink(missing_ok=True)
+
+    def _dump(self, profile: cProfile.Profile, path: Path) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        profile.dump_stats(path)
+
+    def list(self) -> List[Dict]:
+        return sorted(self._profiles.values(), key=lambda entry: entry["created_at"], reverse=True)
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        return self.directory / f"{profile_id}.pstats" if profile_id in self._profiles else None
+
+    def summary(self, profile_id: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        output = io.StringIO()
+        pstats.Stats(str(path), stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+profiler = RequestProfiler()
+
+
+def _header(scope: Scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+class ProfilingMiddleware:
+    """Профилирует запрос с `X-Profile: 1`, если `authorize` признал токен администраторским.
+
+    Ответ получает `X-Profile: <id>` — профиль можно скачать по /admin/profiles/<id>,
+    либо `X-Profile: rate-limited | busy | forbidden`, если профиль не снимался.
+    """
+
+    def __init__(self, app: ASGIApp, authorize: Callable[[str], bool], profiler: RequestProfiler = profiler):
+        self.app = app
+        self.authorize = authorize
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.enabled or _header(scope, PROFILE_HEADER) != b"1":
+            await self.app(scope, receive, send)
+            return
+
+        authorization = (_header(scope, b"authorization") or b"").decode("latin-1")
+        if not authorization.lower().startswith("bearer ") or not self.authorize(authorization[7:]):
+            await self.app(scope, receive, self._with_status(send, "forbidden"))
+            return
+        refused = self.profiler.acquire()
+        if refused is not None:
+            await self.app(scope, receive, self._with_status(send, refused))
+            return
+
+        info = {
+            "id": uuid.uuid4().hex,
+            "method": scope["method"],
+            "path": scope["path"],
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        }
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, self._with_status(send, info["id"]))
+        finally:
+            profile.disable()
+            self.profiler.release()
+            info["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            try:
+                await self.profiler.save(profile, info)
+            except OSError as e:
+                logger.error(f"Cannot save profile {info['id']}: {e}")
+            else:
+                logger.info(f"Profiled {info['method']} {info['path']} in {info['duration_ms']} ms: {info['id']}")
+
+    @staticmethod
+    def _with_status(send: Send, value: str) -> Send:
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile", value)
+            await send(message)
+        return send_with_status
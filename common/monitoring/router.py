@@ -0,0 +1,253 @@
+"""Эндпоинты мониторинга, общие для сервисов: /metrics и /admin/*.
+
+Сервис собирает свой экземпляр через `create_monitoring_router`, передавая зависимость
+проверки администратора, движки БД и при необходимости свои дополнительные маршруты.
+Всё, кроме /metrics, описывает тот воркер, которому достался запрос (см. common.server).
+"""
+import asyncio
+import tracemalloc
+from typing import Any, Callable, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse, PlainTextResponse
+from authx import RequestToken
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from common.monitoring.metrics import CONTENT_TYPE
+from common.monitoring.multiprocess import multiprocess_metrics
+from common.monitoring.memory import memory_tracker
+from common.monitoring.pool import pool_status
+from common.monitoring.profiling import profiler
+from common.monitoring.sql import slow_queries
+from common.replicas import ReplicaRouter
+
+
+def create_monitoring_router(
+    require_admin: Callable[..., Any],
+    engine: AsyncEngine,
+    replica_engines: List[AsyncEngine],
+    replica_router: ReplicaRouter,
+    extra_routes: Optional[APIRouter] = None,
+) -> APIRouter:
+    """Роутер мониторинга сервиса; `extra_routes` подключаются к нему как есть (например, /admin/queues)."""
+    router = APIRouter(tags=["monitoring"])
+    if extra_routes is not None:
+        router.include_router(extra_routes)
+
+    @router.get(
+        "/metrics",
+        summary="Метрики в формате Prometheus",
+        response_class=Response,
+        include_in_schema=False,
+    )
+    async def metrics():
+        return Response(content=multiprocess_metrics.render(), media_type=CONTENT_TYPE)
+
+
+    @router.get(
+        "/admin/slow-queries",
+        summary="Самые медленные запросы к БД",
+        description="Нормализованные запросы дольше SQL_SLOW_QUERY_MS с количеством и временем выполнения. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+        }
+    )
+    async def get_slow_queries(token: RequestToken = Depends(require_admin)):
+        return slow_queries.top()
+
+
+    @router.get(
+        "/admin/db-pool",
+        summary="Состояние пула соединений с БД",
+        description="Размер и занятость пулов мастера и реплик, открытия сверх pool_size, таймауты, время ожидания соединения и распределение чтений. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+        }
+    )
+    async def get_db_pool(token: RequestToken = Depends(require_admin)):
+        return {
+            "primary": pool_status(engine),
+            "replicas": [
+                {**replica, "pool": pool_status(replica_engine)}
+                for replica, replica_engine in zip(replica_router.status(), replica_engines)
+            ],
+            "reads": replica_router.reads,
+        }
+
+
+    @router.get(
+        "/admin/profiles",
+        summary="Профили запросов",
+        description="Профили, снятые по заголовку X-Profile: 1 с токеном администратора, от новых к старым. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+        }
+    )
+    async def list_profiles(token: RequestToken = Depends(require_admin)):
+        return profiler.list()
+
+
+    @router.get(
+        "/admin/profiles/{profile_id}",
+        summary="Скачать профиль запроса",
+        description="Файл pstats: `python -m pstats`, snakeviz или speedscope. Только для администратора.",
+        response_class=FileResponse,
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+            404: {"description": "Профиль не найден"},
+        }
+    )
+    async def download_profile(profile_id: str, token: RequestToken = Depends(require_admin)):
+        path = profiler.path(profile_id)
+        if path is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+    @router.get(
+        "/admin/profiles/{profile_id}/summary",
+        summary="Сводка профиля запроса",
+        description="Самые затратные функции профиля в текстовом виде pstats. Только для администратора.",
+        response_class=PlainTextResponse,
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+            404: {"description": "Профиль не найден"},
+        }
+    )
+    async def profile_summary(
+        profile_id: str,
+        sort: Literal["cumulative", "tottime", "ncalls"] = "cumulative",
+        limit: int = Query(40, ge=1, le=500),
+        token: RequestToken = Depends(require_admin),
+    ):
+        summary = await asyncio.to_thread(profiler.summary, profile_id, sort, limit)
+        if summary is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+        return summary
+
+
+    @router.get(
+        "/admin/memory",
+        summary="Память процесса",
+        description="RSS, статистика сборщика мусора, состояние tracemalloc и список снимков памяти. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+        }
+    )
+    async def memory_status(token: RequestToken = Depends(require_admin)):
+        return memory_tracker.status()
+
+
+    @router.get(
+        "/admin/memory/objects",
+        summary="Типы объектов в памяти",
+        description="Самые многочисленные типы объектов, отслеживаемых сборщиком мусора. Обход кучи занимает время, пропорциональное числу объектов. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+        }
+    )
+    async def memory_objects(limit: int = Query(30, ge=1, le=500), token: RequestToken = Depends(require_admin)):
+        return memory_tracker.object_counts(limit)
+
+
+    @router.post(
+        "/admin/memory/tracemalloc/start",
+        summary="Включить tracemalloc",
+        description="Начинает отслеживать выделения памяти с глубиной стека `frames`. Замедляет выделения, включайте только на время поиска утечки. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+            409: {"description": "tracemalloc уже включён"},
+        }
+    )
+    async def start_tracemalloc(frames: int = Query(1, ge=1, le=50), token: RequestToken = Depends(require_admin)):
+        if not memory_tracker.start(frames):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc is already tracing")
+        return memory_tracker.status()
+
+
+    @router.post(
+        "/admin/memory/tracemalloc/stop",
+        summary="Выключить tracemalloc",
+        description="Прекращает отслеживание выделений и удаляет снятые снимки. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+            409: {"description": "tracemalloc не включён"},
+        }
+    )
+    async def stop_tracemalloc(token: RequestToken = Depends(require_admin)):
+        if not memory_tracker.stop():
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc is not tracing")
+        return memory_tracker.status()
+
+
+    @router.post(
+        "/admin/memory/snapshots",
+        summary="Снять снимок памяти",
+        description="Снимок выделений tracemalloc; хранятся последние пять. Только для администратора.",
+        status_code=status.HTTP_201_CREATED,
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+            409: {"description": "tracemalloc не включён"},
+        }
+    )
+    async def take_memory_snapshot(token: RequestToken = Depends(require_admin)):
+        if not tracemalloc.is_tracing():
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc is not tracing")
+        return await asyncio.to_thread(memory_tracker.take_snapshot)
+
+
+    @router.get(
+        "/admin/memory/snapshots/{snapshot_id}",
+        summary="Главные места выделения памяти",
+        description="Места с наибольшим объёмом памяти в снимке, сгруппированные по строке, файлу или стеку. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+            404: {"description": "Снимок не найден"},
+        }
+    )
+    async def memory_snapshot_top(
+        snapshot_id: str,
+        group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+        limit: int = Query(20, ge=1, le=500),
+        token: RequestToken = Depends(require_admin),
+    ):
+        snapshot = memory_tracker.get(snapshot_id)
+        if snapshot is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+        return await asyncio.to_thread(memory_tracker.top, snapshot, group_by, limit)
+
+
+    @router.get(
+        "/admin/memory/snapshots/{base_id}/diff/{target_id}",
+        summary="Разница двух снимков памяти",
+        description="Места, где память выросла сильнее всего от снимка `base_id` к `target_id`. Только для администратора.",
+        responses={
+            401: {"description": "Необходима авторизация"},
+            403: {"description": "Нет прав администратора"},
+            404: {"description": "Снимок не найден"},
+        }
+    )
+    async def memory_snapshot_diff(
+        base_id: str,
+        target_id: str,
+        group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+        limit: int = Query(20, ge=1, le=500),
+        token: RequestToken = Depends(require_admin),
+    ):
+        base, target = memory_tracker.get(base_id), memory_tracker.get(target_id)
+        if base is None or target is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+        return await asyncio.to_thread(memory_tracker.diff, base, target, group_by, limit)
+
+    return router
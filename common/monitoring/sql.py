@@ -0,0 +1,172 @@
+import heapq
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from common.monitoring.http import route_template
+from common.monitoring.metrics import registry
+from common.monitoring.timing import add_phase
+from common.monitoring.tracing import current_context, tracer
+
+logger = logging.getLogger(__name__)
+
+BUDGET_EXCEEDED = registry.counter("db_query_budget_exceeded_total",
+                                   "HTTP-запросы, прерванные на запросе к БД сверх SQL_QUERY_BUDGET",
+                                   ["method", "route"])
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# `::type` — приведение типа PostgreSQL, а не именованный параметр.
+_BIND_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):(?!:)\w+|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Приводит запрос к форме без значений: литералы и параметры заменяются на `?`, списки — на `(...)`."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Запрос к БД сверх SQL_QUERY_BUDGET; прерывает обработку HTTP-запроса до коммита."""
+
+    def __init__(self, count: int, budget: int):
+        super().__init__(f"Query budget exceeded: query {count}, budget is {budget}")
+        self.count = count
+        self.budget = budget
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "total_ms", "budget", "exceeded")
+
+    def __init__(self, budget: int = 0):
+        self.count = 0
+        self.total_ms = 0.0
+        self.budget = budget
+        self.exceeded = False
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _request_stats.get()
+
+
+class SlowQuerySampler:
+    """Самые медленные нормализованные запросы: по одной записи на форму запроса, не больше `size` форм."""
+
+    def __init__(self, size: int = 20):
+        self.size = size
+        self._by_statement: Dict[str, dict] = {}
+
+    def observe(self, statement: str, elapsed_ms: float) -> None:
+        entry = self._by_statement.get(statement)
+        if entry is not None:
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            return
+        if len(self._by_statement) >= self.size:
+            fastest = min(self._by_statement, key=lambda key: self._by_statement[key]["max_ms"])
+            if self._by_statement[fastest]["max_ms"] >= elapsed_ms:
+                return
+            del self._by_statement[fastest]
+        self._by_statement[statement] = {"statement": statement, "count": 1, "total_ms": elapsed_ms, "max_ms": elapsed_ms}
+
+    def top(self) -> List[dict]:
+        return heapq.nlargest(self.size, self._by_statement.values(), key=lambda entry: entry["max_ms"])
+
+
+slow_queries = SlowQuerySampler()
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_ms: float, samples: int = 20) -> None:
+    """Подписывается на события выполнения запросов вместо `echo=True`.
+
+    Каждый запрос учитывается в статистике текущего HTTP-запроса; запросы дольше
+    `slow_query_ms` нормализуются, попадают в выборку медленных и пишутся в лог.
+    """
+    slow_queries.size = samples
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+        stats = _request_stats.get()
+        if stats is not None and stats.budget and stats.count >= stats.budget:
+            # Отметка времени уже добавлена: её снимет handle_error.
+            stats.exceeded = True
+            raise QueryBudgetExceeded(stats.count + 1, stats.budget)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+        add_phase("sql", elapsed_ms / 1000)
+        normalized = None
+        if elapsed_ms >= slow_query_ms:
+            normalized = normalize_sql(statement)
+            slow_queries.observe(normalized, elapsed_ms)
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {normalized}")
+        current = current_context()
+        if current is not None and current.sampled:
+            tracer.record("db.query", elapsed_ms / 1000, kind="client",
+                          **{"db.statement": normalized or normalize_sql(statement)})
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+class QueryBudgetMiddleware(BaseHTTPMiddleware):
+    """Считает запросы к БД и время в БД для каждого HTTP-запроса.
+
+    При `budget > 0` (режим разработки) запрос к БД сверх `budget` не выполняется:
+    слушатель движка бросает QueryBudgetExceeded, обработка прерывается до коммита,
+    а клиент получает 500, чтобы N+1 не уходил незамеченным. Превышения считаются
+    в db_query_budget_exceeded_total.
+    """
+
+    def __init__(self, app, budget: int = 0):
+        super().__init__(app)
+        self.budget = budget
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        stats = RequestQueryStats(self.budget)
+        token = _request_stats.set(stats)
+        try:
+            response = await call_next(request)
+        except QueryBudgetExceeded:
+            response = None
+        finally:
+            _request_stats.reset(token)
+        logger.debug(f"{request.method} {request.url.path}: {stats.count} queries, {stats.total_ms:.1f} ms in DB")
+        if stats.exceeded:
+            # Сервисы оборачивают исключение в свои ошибки, поэтому ответ заменяется и тогда, когда оно не дошло сюда.
+            logger.error(f"Query budget exceeded by {request.method} {request.url.path}: budget is {self.budget}")
+            BUDGET_EXCEEDED.inc(method=request.method, route=route_template(request.scope))
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"detail": f"Query budget exceeded: more than {self.budget} queries"},
+            )
+        return response
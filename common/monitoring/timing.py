@@ -0,0 +1,160 @@
+"""Разбивка времени запроса по фазам для заголовка `Server-Timing`.
+
+Фазы: auth — проверка токена; db — вызовы репозиториев, включая ожидание соединения из
+пула; sql — сами запросы на стороне драйвера; publish — публикация в RabbitMQ;
+serialization — сборка тела ответа. Фаза считается по реальному времени: вложенный или
+параллельный вход в уже открытую фазу не учитывается второй раз.
+"""
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SERVER_TIMING_MODES = ("off", "admin", "all")
+
+
+class RequestTimings:
+    __slots__ = ("phases", "admin", "_open")
+
+    def __init__(self):
+        # фаза → [секунды, количество входов]
+        self.phases: Dict[str, List[float]] = {}
+        self.admin = False
+        self._open = set()
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self, total: float) -> str:
+        metrics = [
+            f'{name};dur={seconds * 1000:.3f};desc="{int(count)}x"'
+            for name, (seconds, count) in self.phases.items()
+        ]
+        metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _timings.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    timings = _timings.get()
+    if timings is None or name in timings._open:
+        yield
+        return
+    timings._open.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._open.discard(name)
+        timings.add(name, time.perf_counter() - started)
+
+
+def add_phase(name: str, seconds: float) -> None:
+    """Уже измеренное время (например, из событий SQLAlchemy) в фазу текущего запроса."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def timed_methods(name: str):
+    """Декоратор класса: время каждой публичной корутины класса идёт в фазу `name`."""
+    def decorator(cls):
+        for attribute, value in list(vars(cls).items()):
+            if not attribute.startswith("_") and inspect.iscoroutinefunction(value):
+                setattr(cls, attribute, _timed(name, value))
+        return cls
+    return decorator
+
+
+def _timed(name: str, func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with phase(name):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def timed_auth(dependency: Callable[[Request], Awaitable[Any]]) -> Callable[[Request], Awaitable[Any]]:
+    """Зависимость FastAPI для проверки токена с учётом времени в фазе auth."""
+    async def timed(request: Request) -> Any:
+        timings = _timings.get()
+        if timings is None:
+            return await dependency(request)
+        started = time.perf_counter()
+        try:
+            payload = await dependency(request)
+        finally:
+            timings.add("auth", time.perf_counter() - started)
+        return payload
+    return timed
+
+
+def mark_admin(payload: Any) -> None:
+    """Отмечает запрос с токеном администратора: в режиме `admin` заголовок отдаётся только им.
+
+    Вызывается после проверки отзыва, когда токен окончательно принят.
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings.admin = "admin" in getattr(payload, "role", [])
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse со временем сборки тела в фазе serialization; ответ приложения по умолчанию."""
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialization"):
+            return super().render(content)
+
+
+class ServerTimingMiddleware:
+    """Собирает фазы запроса и отдаёт их в `Server-Timing`.
+
+    В режиме `all` заголовок получает каждый ответ, в режиме `admin` — только запросы
+    с токеном администратора. Фазы собираются всегда: решение зависит от токена, который
+    проверяется уже внутри приложения.
+    """
+
+    def __init__(self, app: ASGIApp, mode: str = "admin"):
+        if mode not in SERVER_TIMING_MODES:
+            raise ValueError(f"Unknown Server-Timing mode: {mode}")
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and (self.mode == "all" or timings.admin):
+                MutableHeaders(scope=message).append("Server-Timing", timings.header(time.perf_counter() - started))
+            await send(message)
+
+        token = _timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
@@ -0,0 +1,300 @@
+"""Трассировка запросов между сервисами в формате W3C Trace Context.
+
+Контекст (trace_id, span_id, флаг выборки) передаётся в заголовке `traceparent` HTTP-запросов
+и AMQP-сообщений. Решение о выборке принимается один раз в корне трассы и дальше только
+наследуется, поэтому трасса либо записана целиком во всех сервисах, либо не записана вовсе.
+Спаны невыбранных трасс не создаются: сохраняется только контекст для передачи дальше.
+"""
+import functools
+import importlib
+import inspect
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.monitoring.http import route_template
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """`00-<trace_id>-<span_id>-<flags>` → SpanContext; некорректный заголовок игнорируется."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        if int(parts[1], 16) == 0 or int(parts[2], 16) == 0:
+            return None
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return SpanContext(parts[1], parts[2], bool(flags & 0x01))
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+_current: ContextVar[Optional[SpanContext]] = ContextVar("trace_context", default=None)
+
+
+def current_context() -> Optional[SpanContext]:
+    return _current.get()
+
+
+def current_traceparent() -> Optional[str]:
+    context = _current.get()
+    return context.traceparent if context is not None else None
+
+
+class Span:
+    __slots__ = ("name", "context", "parent_id", "kind", "service", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, context: SpanContext, parent_id: Optional[str], kind: str, service: str,
+                 attributes: Dict):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.service = service
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": self.service,
+            "start_ns": self.start_ns,
+            "duration_us": (self.end_ns - self.start_ns) // 1000,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Получатель завершённых спанов. `export` вызывается из event loop и не должен блокировать."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class LogExporter(SpanExporter):
+    def export(self, span: Span) -> None:
+        logger.info(json.dumps(span.to_dict(), ensure_ascii=False, default=str))
+
+
+class JsonFileExporter(SpanExporter):
+    """Дописывает спаны в файл по одному JSON на строку; запись идёт в отдельном потоке."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        self._queue.put(span.to_dict())
+
+    def _write(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                if self._queue.empty():
+                    file.flush()
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+def load_exporter(spec: str, path: str) -> Optional[SpanExporter]:
+    """Пусто — трассировка выключена; `json`, `log` или `модуль:фабрика` для своего экспортёра."""
+    if not spec:
+        return None
+    if spec == "json":
+        return JsonFileExporter(path)
+    if spec == "log":
+        return LogExporter()
+    module_name, _, factory = spec.partition(":")
+    return getattr(importlib.import_module(module_name), factory)()
+
+
+class Tracer:
+    def __init__(self, service: str = "", exporter: Optional[SpanExporter] = None, sample_ratio: float = 1.0):
+        self.service = service
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    def configure(self, service: str, exporter: Optional[SpanExporter], sample_ratio: float) -> None:
+        self.service = service
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", parent: Optional[SpanContext] = None,
+             **attributes) -> Iterator[Optional[Span]]:
+        """Спан вокруг блока. `parent` — контекст из заголовка; по умолчанию текущий.
+
+        Без родителя начинается новая трасса с выборкой `sample_ratio`. В невыбранной
+        трассе отдаёт None, но контекст для передачи дальше всё равно выставляет.
+        """
+        if self.exporter is None:
+            yield None
+            return
+        if parent is None:
+            parent = _current.get()
+            if parent is not None and not parent.sampled:
+                yield None
+                return
+        if parent is None:
+            context = SpanContext(_new_id(128), _new_id(64), random.random() < self.sample_ratio)
+        else:
+            context = SpanContext(parent.trace_id, _new_id(64), parent.sampled)
+        token = _current.set(context)
+        if not context.sampled:
+            try:
+                yield None
+            finally:
+                _current.reset(token)
+            return
+        span = Span(name, context, parent.span_id if parent is not None else None, kind, self.service, attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            self.exporter.export(span)
+
+    def record(self, name: str, duration_s: float, kind: str = "internal", **attributes) -> None:
+        """Уже завершённая операция (например, запрос к БД из событий SQLAlchemy) как дочерний спан текущего."""
+        parent = _current.get()
+        if self.exporter is None or parent is None or not parent.sampled:
+            return
+        span = Span(name, SpanContext(parent.trace_id, _new_id(64), True), parent.span_id, kind, self.service,
+                    attributes)
+        span.end_ns = span.start_ns
+        span.start_ns -= int(duration_s * 1e9)
+        self.exporter.export(span)
+
+
+tracer = Tracer()
+
+
+def traced(name: str) -> Callable:
+    """Оборачивает корутину в спан `name`, если она выполняется внутри выбранной трассы.
+
+    Новую трассу такой спан не начинает: иначе фоновые циклы (опрос outbox) порождали бы
+    по трассе на каждую итерацию.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            context = _current.get()
+            if context is None or not context.sampled:
+                return await func(*args, **kwargs)
+            with tracer.span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_methods(cls):
+    """Декоратор класса: каждая публичная корутина класса — спан `Класс.метод`."""
+    for attribute, value in list(vars(cls).items()):
+        if not attribute.startswith("_") and inspect.iscoroutinefunction(value):
+            setattr(cls, attribute, traced(f"{cls.__name__}.{attribute}")(value))
+    return cls
+
+
+def inject_headers(headers: Dict) -> Dict:
+    """Добавляет `traceparent` текущего контекста в заголовки исходящего запроса или сообщения."""
+    context = _current.get()
+    if context is not None:
+        headers[TRACEPARENT_HEADER] = context.traceparent
+    return headers
+
+
+class TracingMiddleware:
+    """Серверный спан на каждый HTTP-запрос; родитель берётся из заголовка `traceparent`."""
+
+    def __init__(self, app: ASGIApp, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with self.tracer.span(scope["method"], kind="server", parent=parent) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if span is not None:
+                    # Шаблон маршрута известен только после маршрутизации.
+                    span.name = f"{scope['method']} {route_template(scope)}"
+                    span.attributes["http.status_code"] = status
+                    if status >= 500:
+                        span.status = "error"
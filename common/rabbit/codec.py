@@ -0,0 +1,184 @@
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID, SafeUUID
+from pydantic import BaseModel
+from common.rabbit.schemas import BookEvent, BookEventEnvelope
+
+JSON_CONTENT_TYPE = "application/json"
+BINARY_CONTENT_TYPE = "application/x-book-event"
+JSON_ENVELOPE_CONTENT_TYPE = "application/vnd.book-event-envelope+json"
+BINARY_ENVELOPE_CONTENT_TYPE = "application/x-book-event-envelope"
+
+# v1: версия (1 байт) | код действия (1 байт) | book_id (16 байт) | флаги необязательных полей (1 байт)
+# Необязательные поля идут после заголовка в порядке битов флагов.
+BINARY_VERSION = 1
+_HEADER = struct.Struct(">BB16sB")
+# Конверт v1: версия | код действия | флаги | количество (4 байта) | необязательные поля | book_id × количество
+_ENVELOPE_HEADER = struct.Struct(">BBBI")
+
+# Флаг 0x01: время публикации, микросекунды Unix-времени (8 байт).
+FLAG_PUBLISHED_AT = 0x01
+KNOWN_FLAGS = FLAG_PUBLISHED_AT
+_PUBLISHED_AT = struct.Struct(">Q")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+ACTION_CODES = {"created": 1, "deleted": 2}
+CODE_ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+
+
+class EventDecodeError(ValueError):
+    pass
+
+
+_new = object.__new__
+_set_int = UUID.__dict__["int"].__set__
+_set_is_safe = UUID.__dict__["is_safe"].__set__
+_UNKNOWN_SAFETY = SafeUUID.unknown
+# Слоты BaseModel: запись через их дескрипторы минует BaseModel.__setattr__ и поиск по MRO.
+_set_dict = BaseModel.__dict__["__dict__"].__set__
+_set_fields_set = BaseModel.__dict__["__pydantic_fields_set__"].__set__
+_set_extra = BaseModel.__dict__["__pydantic_extra__"].__set__
+_set_private = BaseModel.__dict__["__pydantic_private__"].__set__
+
+
+def _uuid(raw) -> UUID:
+    """UUID из 16 байт без проверок конструктора UUID: длину уже проверил разбор заголовка."""
+    value = _new(UUID)
+    _set_int(value, int.from_bytes(raw, "big"))
+    _set_is_safe(value, _UNKNOWN_SAFETY)
+    return value
+
+
+def _event(book_id: UUID, action: str, published_at: Optional[datetime]) -> BookEvent:
+    """BookEvent из полей, которые декодер уже проверил, без повторной валидации pydantic.
+
+    То же, что `model_construct`, но без его обхода полей и значений по умолчанию: на бинарном
+    пути сборка события — основная стоимость декодирования.
+    """
+    event = _new(BookEvent)
+    _set_dict(event, {"book_id": book_id, "action": action, "published_at": published_at})
+    _set_fields_set(event, {"book_id", "action", "published_at"})
+    _set_extra(event, None)
+    _set_private(event, None)
+    return event
+
+
+def _encode_optional(published_at: Optional[datetime]) -> tuple[int, bytes]:
+    if published_at is None:
+        return 0, b""
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    return FLAG_PUBLISHED_AT, _PUBLISHED_AT.pack((published_at - _EPOCH) // _MICROSECOND)
+
+
+def _decode_optional(body: bytes, offset: int, flags: int) -> tuple[Optional[datetime], int]:
+    if not flags & FLAG_PUBLISHED_AT:
+        return None, offset
+    if len(body) < offset + _PUBLISHED_AT.size:
+        raise EventDecodeError("Binary event truncated in optional fields")
+    micros, = _PUBLISHED_AT.unpack_from(body, offset)
+    return _EPOCH + micros * _MICROSECOND, offset + _PUBLISHED_AT.size
+
+
+def encode_binary(event: BookEvent) -> bytes:
+    flags, optional = _encode_optional(event.published_at)
+    return _HEADER.pack(BINARY_VERSION, ACTION_CODES[event.action], event.book_id.bytes, flags) + optional
+
+
+def _decode_action(version: int, action_code: int, flags: int) -> str:
+    if version != BINARY_VERSION:
+        raise EventDecodeError(f"Unsupported binary event version: {version}")
+    if flags & ~KNOWN_FLAGS:
+        raise EventDecodeError(f"Unknown optional fields in binary event: {flags:#04x}")
+    action = CODE_ACTIONS.get(action_code)
+    if action is None:
+        raise EventDecodeError(f"Unknown action code: {action_code}")
+    return action
+
+
+def decode_binary(body: bytes) -> BookEvent:
+    if len(body) < _HEADER.size:
+        raise EventDecodeError(f"Binary event too short: {len(body)} bytes")
+    version, action_code, book_id, flags = _HEADER.unpack_from(body)
+    action = _decode_action(version, action_code, flags)
+    published_at, _ = _decode_optional(body, _HEADER.size, flags)
+    return _event(_uuid(book_id), action, published_at)
+
+
+def encode_binary_envelope(events: List[BookEvent]) -> bytes:
+    # Время публикации у событий конверта общее: берётся из первого.
+    flags, optional = _encode_optional(events[0].published_at)
+    header = _ENVELOPE_HEADER.pack(BINARY_VERSION, ACTION_CODES[events[0].action], flags, len(events))
+    return header + optional + b"".join(event.book_id.bytes for event in events)
+
+
+def decode_binary_envelope(body: bytes) -> List[BookEvent]:
+    if len(body) < _ENVELOPE_HEADER.size:
+        raise EventDecodeError(f"Binary envelope too short: {len(body)} bytes")
+    version, action_code, flags, count = _ENVELOPE_HEADER.unpack_from(body)
+    action = _decode_action(version, action_code, flags)
+    published_at, offset = _decode_optional(body, _ENVELOPE_HEADER.size, flags)
+    ids = memoryview(body)[offset:]
+    if len(ids) != count * 16:
+        raise EventDecodeError(f"Binary envelope declares {count} events but carries {len(ids)} bytes")
+    # Цикл _uuid/_event, развёрнутый в одну функцию: на сотнях событий конверта вызовы заметны.
+    events = []
+    append = events.append
+    from_bytes = int.from_bytes
+    for i in range(0, len(ids), 16):
+        book_id = _new(UUID)
+        _set_int(book_id, from_bytes(ids[i:i + 16], "big"))
+        _set_is_safe(book_id, _UNKNOWN_SAFETY)
+        event = _new(BookEvent)
+        _set_dict(event, {"book_id": book_id, "action": action, "published_at": published_at})
+        _set_fields_set(event, {"book_id", "action", "published_at"})
+        _set_extra(event, None)
+        _set_private(event, None)
+        append(event)
+    return events
+
+
+def encode_event(event: BookEvent, encoding: str = "json") -> tuple[bytes, str]:
+    """Кодирует событие и возвращает тело сообщения вместе с его AMQP content_type.
+
+    Действия, у которых нет бинарного кода, всегда уходят в JSON.
+    """
+    if encoding == "binary" and event.action in ACTION_CODES:
+        return encode_binary(event), BINARY_CONTENT_TYPE
+    return event.model_dump_json(exclude_none=True).encode(), JSON_CONTENT_TYPE
+
+
+def encode_events(events: List[BookEvent],
+                  encoding: str = "json",
+                  published_at: Optional[datetime] = None) -> tuple[bytes, str]:
+    """Одно событие кодируется как обычно, несколько — конвертом. Все события должны иметь одно действие.
+
+    `published_at` проставляется во все события сообщения.
+    """
+    if published_at is not None:
+        events = [event.model_copy(update={"published_at": published_at}) for event in events]
+    if len(events) == 1:
+        return encode_event(events[0], encoding)
+    if len({event.action for event in events}) != 1:
+        raise ValueError("All events in an envelope must share one action")
+    if encoding == "binary" and events[0].action in ACTION_CODES:
+        return encode_binary_envelope(events), BINARY_ENVELOPE_CONTENT_TYPE
+    return BookEventEnvelope(events=events).model_dump_json(exclude_none=True).encode(), JSON_ENVELOPE_CONTENT_TYPE
+
+
+def decode_event(body: bytes, content_type: str | None) -> BookEvent:
+    if content_type == BINARY_CONTENT_TYPE:
+        return decode_binary(body)
+    # Сообщения без content_type — от продюсеров до перехода на версионированный формат.
+    return BookEvent.model_validate_json(body)
+
+
+def decode_events(body: bytes, content_type: str | None) -> List[BookEvent]:
+    """Декодирует сообщение любого поддерживаемого типа в список событий."""
+    if content_type == BINARY_ENVELOPE_CONTENT_TYPE:
+        return decode_binary_envelope(body)
+    if content_type == JSON_ENVELOPE_CONTENT_TYPE:
+        return BookEventEnvelope.model_validate_json(body).events
+    return [decode_event(body, content_type)]
@@ -0,0 +1,9 @@
+import aio_pika
+from common.rabbit.inmemory import MEMORY_URL_SCHEME, get_broker
+
+
+async def connect(amqp_url: str):
+    """Robust-подключение к RabbitMQ либо к брокеру-заглушке для URL вида `memory://<имя>`."""
+    if amqp_url.startswith(MEMORY_URL_SCHEME):
+        return await get_broker(amqp_url[len(MEMORY_URL_SCHEME):] or "default").connect(amqp_url)
+    return await aio_pika.connect_robust(amqp_url)
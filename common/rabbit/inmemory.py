@@ -0,0 +1,589 @@
+import asyncio
+import itertools
+import logging
+import random
+import re
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import aio_pika
+from aio_pika.exceptions import ChannelInvalidStateError, ChannelNotFoundEntity, DeliveryError
+
+logger = logging.getLogger(__name__)
+
+MEMORY_URL_SCHEME = "memory://"
+
+
+class FaultProfile:
+    """Неисправности, которые брокер-заглушка вносит в публикацию и доставку.
+
+    `nack_rate` — доля публикаций, отвергнутых брокером (продюсер видит ошибку);
+    `drop_rate` — доля подтверждённых, но потерянных сообщений;
+    `disconnect_rate` — вероятность обрыва всех соединений на каждой публикации,
+    обрыв длится `disconnect_seconds`.
+    """
+
+    def __init__(self,
+                 publish_latency_ms: float = 0.0,
+                 delivery_latency_ms: float = 0.0,
+                 nack_rate: float = 0.0,
+                 drop_rate: float = 0.0,
+                 disconnect_rate: float = 0.0,
+                 disconnect_seconds: float = 1.0,
+                 seed: Optional[int] = None):
+        self.publish_latency_ms = publish_latency_ms
+        self.delivery_latency_ms = delivery_latency_ms
+        self.nack_rate = nack_rate
+        self.drop_rate = drop_rate
+        self.disconnect_rate = disconnect_rate
+        self.disconnect_seconds = disconnect_seconds
+        self.seed = seed
+
+
+class BrokerStats:
+    def __init__(self):
+        self.published = 0
+        self.nacked = 0
+        self.dropped = 0
+        self.unroutable = 0
+        self.delivered = 0
+        self.redelivered = 0
+        self.acked = 0
+        self.dead_lettered = 0
+        self.disconnects = 0
+
+    def snapshot(self) -> dict:
+        return dict(vars(self))
+
+
+class _StoredMessage:
+    __slots__ = ("body", "content_type", "headers", "message_id", "delivery_mode",
+                 "expiration", "exchange", "routing_key", "redelivered", "expired", "taken")
+
+    def __init__(self, message: aio_pika.Message, exchange: str, routing_key: str):
+        self.body = message.body
+        self.content_type = message.content_type
+        self.headers = dict(message.headers or {})
+        self.message_id = message.message_id
+        self.delivery_mode = message.delivery_mode
+        self.expiration = message.expiration
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.redelivered = False
+        self.expired = False
+        self.taken = False
+
+    def to_message(self) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=self.body,
+            content_type=self.content_type,
+            headers=dict(self.headers),
+            message_id=self.message_id,
+            delivery_mode=self.delivery_mode,
+        )
+
+
+def _topic_pattern(binding_key: str) -> re.Pattern:
+    """`*` — ровно одно слово, `#` — ноль или больше слов, как в RabbitMQ.
+
+    `#` забирает соседнюю точку в свою необязательную группу: `book.#` совпадает и с `book`,
+    `a.#.b` — с `a.b`.
+    """
+    words = binding_key.split(".")
+    pattern = ""
+    for i, word in enumerate(words):
+        if word == "#":
+            if len(words) == 1:
+                pattern += r".*"
+            elif i == 0:
+                pattern += r"(?:.*\.)?"
+            else:
+                pattern += r"(?:\..*)?"
+            continue
+        # После ведущего `#` точка уже в его группе.
+        if i > 0 and not (i == 1 and words[0] == "#"):
+            pattern += r"\."
+        pattern += r"[^.]+" if word == "*" else re.escape(word)
+    return re.compile(pattern + r"\Z")
+
+
+class _Exchange:
+    def __init__(self, name: str, exchange_type: aio_pika.ExchangeType):
+        self.name = name
+        self.type = exchange_type
+        self.bindings: List[Tuple[str, re.Pattern, "_Queue"]] = []
+
+    def route(self, routing_key: str) -> List["_Queue"]:
+        if self.type == aio_pika.ExchangeType.FANOUT:
+            return [queue for _, _, queue in self.bindings]
+        if self.type == aio_pika.ExchangeType.DIRECT:
+            return [queue for key, _, queue in self.bindings if key == routing_key]
+        return [queue for _, pattern, queue in self.bindings if pattern.match(routing_key)]
+
+
+class _Consumer:
+    def __init__(self, channel: "InMemoryChannel", callback: Callable[["InMemoryIncomingMessage"], Awaitable[None]], no_ack: bool,
+                 offset: int = 0):
+        self.channel = channel
+        self.callback = callback
+        self.no_ack = no_ack
+        # Позиция в журнале stream-очереди; для обычных очередей не используется.
+        self.offset = offset
+
+
+class _Queue:
+    """Очередь брокера: FIFO на deque, TTL и dead-letter как в RabbitMQ."""
+
+    def __init__(self, broker: "InMemoryBroker", name: str, arguments: Optional[dict], exclusive_owner=None):
+        self.broker = broker
+        self.name = name
+        self.arguments = dict(arguments or {})
+        self.exclusive_owner = exclusive_owner
+        self.messages: Deque[_StoredMessage] = deque()
+        self.consumers: List[_Consumer] = []
+        self._consumer_cursor = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @property
+    def message_count(self) -> int:
+        return sum(1 for message in self.messages if not message.expired)
+
+    def put(self, message: _StoredMessage, front: bool = False) -> None:
+        ttl_ms = self.arguments.get("x-message-ttl")
+        if message.expiration is not None:
+            per_message_ms = float(message.expiration) * 1000
+            ttl_ms = per_message_ms if ttl_ms is None else min(ttl_ms, per_message_ms)
+        if ttl_ms is not None and not front:
+            asyncio.get_running_loop().call_later(ttl_ms / 1000, self._expire, message)
+        if front:
+            self.messages.appendleft(message)
+        else:
+            self.messages.append(message)
+        self._wakeup.set()
+
+    def _expire(self, message: _StoredMessage) -> None:
+        if message.taken or message.expired:
+            return
+        message.expired = True
+        self.broker._dead_letter(self, message)
+
+    def take(self) -> Optional[_StoredMessage]:
+        while self.messages:
+            message = self.messages.popleft()
+            if not message.expired:
+                message.taken = True
+                return message
+        return None
+
+    def add_consumer(self, consumer: _Consumer) -> None:
+        self.consumers.append(consumer)
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+
+    def remove_channel(self, channel: "InMemoryChannel") -> None:
+        self.consumers = [consumer for consumer in self.consumers if consumer.channel is not channel]
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        if self._dispatcher:
+            self._dispatcher.cancel()
+
+    async def _dispatch(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.broker.connected.is_set():
+                active = [consumer for consumer in self.consumers if not consumer.channel.is_closed]
+                if not active:
+                    break
+                message = self.take()
+                if message is None:
+                    break
+                consumer = active[next(self._consumer_cursor) % len(active)]
+                consumer.channel._deliver(self, message, consumer)
+                # Уступаем циклу, чтобы доставка не монополизировала его при длинной очереди.
+                await asyncio.sleep(0)
+
+
+class _StreamQueue(_Queue):
+    """Stream-очередь (`x-queue-type: stream`): сообщения не удаляются при доставке, каждый
+    потребитель читает журнал со своей позиции (`x-stream-offset`: first, next или номер).
+
+    Доставки не требуют подтверждения и не возвращаются в очередь при обрыве. `x-max-age`
+    не применяется: журнал живёт, пока жив брокер.
+    """
+
+    def __init__(self, broker: "InMemoryBroker", name: str, arguments: Optional[dict], exclusive_owner=None):
+        super().__init__(broker, name, arguments, exclusive_owner)
+        self.log: List[_StoredMessage] = []
+
+    @property
+    def message_count(self) -> int:
+        return len(self.log)
+
+    def put(self, message: _StoredMessage, front: bool = False) -> None:
+        if not front:
+            self.log.append(message)
+            self._wakeup.set()
+
+    def take(self) -> Optional[_StoredMessage]:
+        return None
+
+    def start_offset(self, arguments: Optional[dict]) -> int:
+        offset = (arguments or {}).get("x-stream-offset", "next")
+        if offset == "first":
+            return 0
+        if isinstance(offset, int):
+            return min(max(offset, 0), len(self.log))
+        return len(self.log)
+
+    async def _dispatch(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.broker.connected.is_set():
+                pending = [consumer for consumer in self.consumers
+                           if not consumer.channel.is_closed and consumer.offset < len(self.log)]
+                if not pending:
+                    break
+                for consumer in pending:
+                    message = self.log[consumer.offset]
+                    consumer.offset += 1
+                    consumer.channel._deliver(self, message, consumer, no_ack=True)
+                await asyncio.sleep(0)
+
+
+class InMemoryBroker:
+    """Брокер-заглушка в памяти процесса с API, совместимым с той частью aio-pika, которую используют сервисы.
+
+    Поддерживает topic/fanout/direct exchange и exchange по умолчанию, подтверждения
+    и повторную доставку неподтверждённых сообщений при обрыве, TTL очередей и
+    сообщений, dead-letter аргументы очередей, stream-очереди и внесение неисправностей
+    (`FaultProfile`).
+    """
+
+    def __init__(self, faults: Optional[FaultProfile] = None):
+        self.faults = faults or FaultProfile()
+        self.stats = BrokerStats()
+        self.connected = asyncio.Event()
+        self.connected.set()
+        self._random = random.Random(self.faults.seed)
+        self._exchanges: Dict[str, _Exchange] = {}
+        self._queues: Dict[str, _Queue] = {}
+        self._connections: Set["InMemoryConnection"] = set()
+        self._anonymous = itertools.count(1)
+        self._restore_handle: Optional[asyncio.TimerHandle] = None
+
+    async def connect(self, url: str = "") -> "InMemoryConnection":
+        connection = InMemoryConnection(self)
+        self._connections.add(connection)
+        return connection
+
+    def queue(self, name: str) -> Optional[_Queue]:
+        return self._queues.get(name)
+
+    def disconnect(self, seconds: Optional[float] = None) -> None:
+        """Обрыв всех соединений: неподтверждённые доставки возвращаются в очереди с redelivered=True."""
+        if not self.connected.is_set():
+            return
+        self.stats.disconnects += 1
+        self.connected.clear()
+        for connection in list(self._connections):
+            connection._on_disconnect()
+        seconds = self.faults.disconnect_seconds if seconds is None else seconds
+        self._restore_handle = asyncio.get_running_loop().call_later(seconds, self.restore)
+
+    def restore(self) -> None:
+        self.connected.set()
+        for connection in list(self._connections):
+            connection.connected.set()
+        for queue in self._queues.values():
+            queue.wake()
+
+    def close(self) -> None:
+        if self._restore_handle:
+            self._restore_handle.cancel()
+        for queue in self._queues.values():
+            queue.stop()
+
+    def _declare_exchange(self, name: str, exchange_type: aio_pika.ExchangeType) -> _Exchange:
+        exchange = self._exchanges.get(name)
+        if exchange is None:
+            exchange = self._exchanges[name] = _Exchange(name, exchange_type)
+        return exchange
+
+    def _declare_queue(self, name: Optional[str], arguments: Optional[dict], exclusive_owner) -> _Queue:
+        if not name:
+            name = f"amq.gen-{next(self._anonymous)}"
+        queue = self._queues.get(name)
+        if queue is None:
+            queue_class = _StreamQueue if (arguments or {}).get("x-queue-type") == "stream" else _Queue
+            queue = self._queues[name] = queue_class(self, name, arguments, exclusive_owner)
+        return queue
+
+    def _delete_queue(self, queue: _Queue) -> None:
+        queue.stop()
+        self._queues.pop(queue.name, None)
+        for exchange in self._exchanges.values():
+            exchange.bindings = [binding for binding in exchange.bindings if binding[2] is not queue]
+
+    def _bind(self, queue: _Queue, exchange_name: str, routing_key: str) -> None:
+        exchange = self._exchanges[exchange_name]
+        exchange.bindings.append((routing_key, _topic_pattern(routing_key), queue))
+
+    def _route(self, exchange_name: str, routing_key: str) -> List[_Queue]:
+        if exchange_name == "":
+            queue = self._queues.get(routing_key)
+            return [queue] if queue else []
+        exchange = self._exchanges.get(exchange_name)
+        return exchange.route(routing_key) if exchange else []
+
+    async def _publish(self, exchange_name: str, message: aio_pika.Message, routing_key: str) -> None:
+        faults = self.faults
+        if not self.connected.is_set():
+            raise ConnectionError("In-memory broker is disconnected")
+        if faults.publish_latency_ms:
+            await asyncio.sleep(faults.publish_latency_ms / 1000)
+        if faults.disconnect_rate and self._random.random() < faults.disconnect_rate:
+            self.disconnect()
+            raise ConnectionError("In-memory broker connection dropped")
+        if faults.nack_rate and self._random.random() < faults.nack_rate:
+            self.stats.nacked += 1
+            raise DeliveryError(None, None)
+        self.stats.published += 1
+        if faults.drop_rate and self._random.random() < faults.drop_rate:
+            self.stats.dropped += 1
+            return
+        self._enqueue(exchange_name, routing_key, message)
+
+    def _enqueue(self, exchange_name: str, routing_key: str, message: aio_pika.Message) -> None:
+        queues = self._route(exchange_name, routing_key)
+        if not queues:
+            self.stats.unroutable += 1
+        for queue in queues:
+            queue.put(_StoredMessage(message, exchange_name, routing_key))
+
+    def _dead_letter(self, queue: _Queue, message: _StoredMessage) -> None:
+        exchange = queue.arguments.get("x-dead-letter-exchange")
+        if exchange is None:
+            return
+        self.stats.dead_lettered += 1
+        routing_key = queue.arguments.get("x-dead-letter-routing-key", message.routing_key)
+        self._enqueue(exchange, routing_key, message.to_message())
+
+
+class InMemoryConnection:
+    def __init__(self, broker: InMemoryBroker):
+        self.broker = broker
+        self.is_closed = False
+        self.connected = asyncio.Event()
+        if broker.connected.is_set():
+            self.connected.set()
+        self._channels: List["InMemoryChannel"] = []
+
+    async def channel(self, publisher_confirms: bool = True) -> "InMemoryChannel":
+        if self.is_closed:
+            raise ConnectionError("Connection is closed")
+        channel = InMemoryChannel(self)
+        self._channels.append(channel)
+        return channel
+
+    def _on_disconnect(self) -> None:
+        self.connected.clear()
+        for channel in self._channels:
+            channel._requeue_unacked()
+
+    async def close(self) -> None:
+        if self.is_closed:
+            return
+        for channel in self._channels:
+            await channel.close()
+        self.is_closed = True
+        self.broker._connections.discard(self)
+        for queue in list(self.broker._queues.values()):
+            if queue.exclusive_owner is self:
+                self.broker._delete_queue(queue)
+
+
+class InMemoryChannel:
+    def __init__(self, connection: InMemoryConnection):
+        self.connection = connection
+        self.is_closed = False
+        self.default_exchange = InMemoryExchange(self, "")
+        self._delivery_tags = itertools.count(1)
+        self._unacked: Dict[int, Tuple[_Queue, _StoredMessage]] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    @property
+    def broker(self) -> InMemoryBroker:
+        return self.connection.broker
+
+    async def declare_exchange(self, name: str, type: aio_pika.ExchangeType = aio_pika.ExchangeType.DIRECT,
+                               durable: bool = False, **kwargs) -> "InMemoryExchange":
+        self.broker._declare_exchange(name, aio_pika.ExchangeType(type))
+        return InMemoryExchange(self, name)
+
+    async def declare_queue(self, name: Optional[str] = None, durable: bool = False, exclusive: bool = False,
+                            auto_delete: bool = False, arguments: Optional[dict] = None,
+                            passive: bool = False, **kwargs) -> "InMemoryQueue":
+        if self.is_closed:
+            raise ChannelInvalidStateError("Channel is closed")
+        if passive and self.broker.queue(name) is None:
+            # Как RabbitMQ: ошибка 404 закрывает канал.
+            await self.close()
+            raise ChannelNotFoundEntity(f"Queue {name} does not exist")
+        owner = self.connection if exclusive else None
+        return InMemoryQueue(self, self.broker._declare_queue(name, arguments, owner))
+
+    async def set_qos(self, prefetch_count: int = 0, **kwargs) -> None:
+        # Заглушка доставляет без ограничения предвыборки, как aio-pika без set_qos.
+        pass
+
+    def _deliver(self, queue: _Queue, message: _StoredMessage, consumer: _Consumer, no_ack: bool = False) -> None:
+        incoming = self._incoming(queue, message, no_ack=no_ack or consumer.no_ack)
+        task = asyncio.create_task(self._run_callback(consumer, incoming))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _incoming(self, queue: _Queue, message: _StoredMessage, no_ack: bool) -> "InMemoryIncomingMessage":
+        tag = next(self._delivery_tags)
+        stats = self.broker.stats
+        stats.delivered += 1
+        if message.redelivered:
+            stats.redelivered += 1
+        if not no_ack:
+            self._unacked[tag] = (queue, message)
+        return InMemoryIncomingMessage(self, queue, message, tag)
+
+    async def _run_callback(self, consumer: _Consumer, incoming: "InMemoryIncomingMessage") -> None:
+        delay_ms = self.broker.faults.delivery_latency_ms
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        try:
+            await consumer.callback(incoming)
+        except Exception as e:
+            logger.error(f"In-memory consumer callback failed: {e}")
+
+    def _settle(self, tag: int, requeue: Optional[bool]) -> None:
+        """requeue=None — ack; True — вернуть в голову очереди; False — dead-letter или удалить."""
+        entry = self._unacked.pop(tag, None)
+        if entry is None:
+            # Доставка уже возвращена в очередь обрывом соединения, как с устаревшим delivery tag в AMQP.
+            return
+        queue, message = entry
+        if requeue is None:
+            self.broker.stats.acked += 1
+        elif requeue:
+            message.redelivered = True
+            message.taken = False
+            queue.put(message, front=True)
+        else:
+            self.broker._dead_letter(queue, message)
+
+    def _requeue_unacked(self) -> None:
+        for queue, message in reversed(list(self._unacked.values())):
+            message.redelivered = True
+            message.taken = False
+            queue.put(message, front=True)
+        self._unacked.clear()
+
+    async def close(self) -> None:
+        if self.is_closed:
+            return
+        self.is_closed = True
+        self._requeue_unacked()
+        for queue in self.broker._queues.values():
+            queue.remove_channel(self)
+        for task in list(self._pending):
+            task.cancel()
+
+
+class InMemoryExchange:
+    def __init__(self, channel: InMemoryChannel, name: str):
+        self.channel = channel
+        self.name = name
+
+    async def publish(self, message: aio_pika.Message, routing_key: str, **kwargs) -> None:
+        if self.channel.is_closed:
+            raise ConnectionError("Channel is closed")
+        await self.channel.broker._publish(self.name, message, routing_key)
+
+
+class _DeclarationResult:
+    def __init__(self, queue: _Queue):
+        self._queue = queue
+
+    @property
+    def message_count(self) -> int:
+        return self._queue.message_count
+
+    @property
+    def consumer_count(self) -> int:
+        return len(self._queue.consumers)
+
+
+class InMemoryQueue:
+    def __init__(self, channel: InMemoryChannel, queue: _Queue):
+        self.channel = channel
+        self.name = queue.name
+        self._queue = queue
+        self.declaration_result = _DeclarationResult(queue)
+
+    async def bind(self, exchange, routing_key: Optional[str] = None, **kwargs) -> None:
+        exchange_name = exchange if isinstance(exchange, str) else exchange.name
+        self.channel.broker._bind(self._queue, exchange_name, routing_key or "")
+
+    async def consume(self, callback, no_ack: bool = False, arguments: Optional[dict] = None, **kwargs) -> str:
+        offset = self._queue.start_offset(arguments) if isinstance(self._queue, _StreamQueue) else 0
+        self._queue.add_consumer(_Consumer(self.channel, callback, no_ack, offset))
+        return f"ctag-{id(callback)}"
+
+    async def get(self, no_ack: bool = False, fail: bool = True, **kwargs) -> Optional["InMemoryIncomingMessage"]:
+        message = self._queue.take() if self.channel.broker.connected.is_set() else None
+        if message is None:
+            if fail:
+                raise LookupError(f"Queue {self.name} is empty")
+            return None
+        return self.channel._incoming(self._queue, message, no_ack)
+
+
+class InMemoryIncomingMessage:
+    def __init__(self, channel: InMemoryChannel, queue: _Queue, message: _StoredMessage, delivery_tag: int):
+        self._channel = channel
+        self.body = message.body
+        self.content_type = message.content_type
+        self.headers = dict(message.headers)
+        self.message_id = message.message_id
+        self.delivery_mode = message.delivery_mode
+        self.exchange = message.exchange
+        self.routing_key = message.routing_key
+        self.redelivered = message.redelivered
+        self.delivery_tag = delivery_tag
+
+    async def ack(self, multiple: bool = False) -> None:
+        self._channel._settle(self.delivery_tag, None)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True) -> None:
+        self._channel._settle(self.delivery_tag, requeue)
+
+    async def reject(self, requeue: bool = False) -> None:
+        self._channel._settle(self.delivery_tag, requeue)
+
+
+_brokers: Dict[str, InMemoryBroker] = {}
+
+
+def get_broker(name: str = "default") -> InMemoryBroker:
+    broker = _brokers.get(name)
+    if broker is None:
+        broker = _brokers[name] = InMemoryBroker()
+    return broker
+
+
+def install_broker(broker: InMemoryBroker, name: str = "default") -> None:
+    """Подставляет общий брокер, например один на несколько сервисов в одном процессе."""
+    _brokers[name] = broker
@@ -0,0 +1,98 @@
+import aio_pika
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Tuple
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractQueue
+from pydantic import BaseModel
+from common.auth.revocation import RevocationList
+from common.monitoring.tracing import TRACEPARENT_HEADER, parse_traceparent, tracer
+from common.rabbit.connection import connect
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_EXCHANGE = "token_revocations"
+REVOCATION_QUEUE = "token_revocations"
+# Stream хранит отзывы дольше, чем живёт access-токен (JWT_ACCESS_TOKEN_EXPIRES = 1 ч).
+REVOCATION_QUEUE_ARGUMENTS = {"x-queue-type": "stream", "x-max-age": "2h"}
+
+
+class TokenRevocation(BaseModel):
+    """Отзыв токенов: по `sub` (все токены пользователя) или по `jti` (один токен)."""
+    sub: Optional[str] = None
+    jti: Optional[str] = None
+    expires_at: datetime
+
+
+async def declare_revocations(channel: AbstractChannel) -> Tuple[AbstractExchange, AbstractQueue]:
+    """Объявляет fanout-обменник отзывов и привязанный к нему stream; вызывают и продюсер, и потребители."""
+    exchange = await channel.declare_exchange(REVOCATION_EXCHANGE, aio_pika.ExchangeType.FANOUT, durable=True)
+    queue = await channel.declare_queue(REVOCATION_QUEUE, durable=True, arguments=REVOCATION_QUEUE_ARGUMENTS)
+    await queue.bind(exchange)
+    return exchange, queue
+
+
+class RevocationConsumer:
+    """Принимает отзывы токенов от user_service в локальный RevocationList.
+
+    Отзывы лежат в stream-очереди: чтение их не удаляет, и каждый процесс читает поток
+    с начала. Так отзыв доходит до всех экземпляров сервиса, а процесс, который в момент
+    отзыва запускался, перезапускался или был отключён от брокера, получает его при
+    подключении: robust-соединение после обрыва подписывается заново с той же позиции.
+    Повторное чтение безопасно — `RevocationList.revoke` идемпотентен.
+    """
+
+    def __init__(self, amqp_url: str, revocations: RevocationList, purge_interval: float = 60.0,
+                 retry_interval: float = 5.0, prefetch_count: int = 500):
+        self.amqp_url = amqp_url
+        self._revocations = revocations
+        self._purge_interval = purge_interval
+        self._retry_interval = retry_interval
+        self._prefetch_count = prefetch_count
+        self._connection = None
+        self._channel = None
+
+    async def _connect(self):
+        while True:
+            try:
+                return await connect(self.amqp_url)
+            except Exception as e:
+                logger.error(f"Revocation consumer cannot connect to RabbitMQ: {e}")
+                await asyncio.sleep(self._retry_interval)
+
+    async def consume(self):
+        self._connection = await self._connect()
+        try:
+            self._channel = await self._connection.channel()
+            # Stream-очередь читается только с подтверждениями и ограниченной предвыборкой.
+            await self._channel.set_qos(prefetch_count=self._prefetch_count)
+            _, queue = await declare_revocations(self._channel)
+            await queue.consume(self._process_message, arguments={"x-stream-offset": "first"})
+
+            logger.info("Revocation consumer started")
+
+            while True:
+                await asyncio.sleep(self._purge_interval)
+                self._revocations.purge_expired()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._connection:
+                await self._connection.close()
+
+    async def _process_message(self, message: aio_pika.IncomingMessage):
+        parent = parse_traceparent((message.headers or {}).get(TRACEPARENT_HEADER))
+        with tracer.span("process token revocation", kind="consumer", parent=parent) as span:
+            try:
+                revocation = TokenRevocation.model_validate_json(message.body)
+                expires_at = revocation.expires_at.timestamp()
+                if revocation.sub:
+                    self._revocations.revoke(f"sub:{revocation.sub}", expires_at)
+                if revocation.jti:
+                    self._revocations.revoke(f"jti:{revocation.jti}", expires_at)
+            except Exception as e:
+                logger.error(f"Revocation message failed: {e}")
+                if span is not None:
+                    span.status = "error"
+            finally:
+                await message.ack()
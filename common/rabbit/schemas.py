@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import List, Optional
+
+class BookEvent(BaseModel):
+    book_id: UUID
+    action: str  
+    # Проставляет продюсер в момент публикации; по нему потребитель считает задержку доставки.
+    published_at: Optional[datetime] = None
+
+
+    class Config:
+        json_encoders = {
+            UUID: lambda v: str(v)
+        }
+
+
+class BookEventEnvelope(BaseModel):
+    """Несколько событий одной операции в одном сообщении; у всех событий одно действие."""
+    events: List[BookEvent]
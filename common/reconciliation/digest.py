@@ -0,0 +1,70 @@
+from typing import List
+from uuid import UUID
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Select, Text, cast, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import BIT
+
+# Диапазон ключей задаётся hex-префиксом UUID: "" — всё пространство, "a" — 1/16 его, и т. д.
+# Дайджест префикса возвращается по 16 дочерним диапазонам, поэтому префикс не длиннее 31 символа.
+MAX_PREFIX_LENGTH = 31
+# Длина префикса корзин key_digest_buckets: 16³ = 4096 корзин, которые триггеры таблицы
+# ключей поддерживают при каждой записи. Дайджесты префиксов короче BUCKET_LENGTH
+# собираются из корзин, длиннее — сканированием диапазона ключа (1/4096 таблицы и меньше).
+BUCKET_LENGTH = 3
+PREFIX_PATTERN = rf"^[0-9a-f]{{0,{MAX_PREFIX_LENGTH}}}$"
+
+
+class RangeDigest(BaseModel):
+    """Количество и хеш ключей одного дочернего диапазона; пустые диапазоны не возвращаются."""
+    prefix: str
+    count: int
+    hash: str
+
+
+def prefix_bounds(prefix: str) -> tuple[UUID, UUID]:
+    return UUID(prefix.ljust(32, "0")), UUID(prefix.ljust(32, "f"))
+
+
+def key_hash(column):
+    """Первые 60 бит md5 ключа: сумма по диапазону не зависит от порядка строк и
+    одинаково считается в базах обоих сервисов (bit_xor появился только в PostgreSQL 14).
+    То же выражение вычисляют триггеры корзин в миграциях."""
+    key_text = cast(column, Text)
+    return cast(cast(literal("x").concat(func.substr(func.md5(key_text), 1, 15)), BIT(60)), BigInteger)
+
+
+def range_digest_query(column, buckets, prefix: str) -> Select:
+    """Дайджесты 16 дочерних диапазонов префикса.
+
+    Короткие префиксы (в том числе корень) агрегируются из не более чем 4096 строк
+    предвычисленных корзин `buckets`, длинные — одним запросом по индексу первичного
+    ключа в границах префикса. Группировка по псевдониму: с параметрами запроса
+    выражения в SELECT и GROUP BY не совпали бы; псевдоним не совпадает с именами
+    столбцов, иначе GROUP BY взял бы столбец.
+    """
+    if len(prefix) < BUCKET_LENGTH:
+        child = func.substr(buckets.bucket, 1, len(prefix) + 1).label("prefix")
+        return (
+            select(child, cast(func.sum(buckets.count), BigInteger).label("count"), func.sum(buckets.hash).label("hash"))
+            .where(buckets.bucket.startswith(prefix))
+            .group_by(literal_column("prefix"))
+            .having(func.sum(buckets.count) > 0)
+            .order_by(literal_column("prefix"))
+        )
+    low, high = prefix_bounds(prefix)
+    child = func.substr(func.replace(cast(column, Text), "-", ""), 1, len(prefix) + 1).label("prefix")
+    return (
+        select(child, func.count().label("count"), func.sum(key_hash(column)).label("hash"))
+        .where(column.between(low, high))
+        .group_by(literal_column("prefix"))
+        .order_by(literal_column("prefix"))
+    )
+
+
+def ids_in_range_query(column, prefix: str, limit: int) -> Select:
+    low, high = prefix_bounds(prefix)
+    return select(column).where(column.between(low, high)).order_by(column).limit(limit)
+
+
+def to_range_digests(rows) -> List[RangeDigest]:
+    return [RangeDigest(prefix=row.prefix, count=row.count, hash=str(row.hash)) for row in rows]
@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах. Если всё полученное WAL уже применено, реплика догнала
+# мастер: иначе при отсутствии записей pg_last_xact_replay_timestamp() «стареет» без отставания.
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Метка недавней записи: момент, до которого клиент читает с мастера. Уходит в ответе на запись
+# и cookie, и заголовком: клиенты API с bearer-токеном cookie обычно не хранят и должны
+# вернуть заголовок в следующих запросах сами. Клиент, не вернувший метку ни так, ни так,
+# сразу после записи может прочитать с реплики устаревшие данные.
+RECENT_WRITE_COOKIE = "recent_write"
+RECENT_WRITE_HEADER = "X-Recent-Write"
+# Допуск на расхождение часов экземпляров и округление метки.
+CLOCK_SKEW_SECONDS = 1.0
+
+
+class _Replica:
+    __slots__ = ("name", "session_factory", "lag")
+
+    def __init__(self, name: str, session_factory: async_sessionmaker):
+        self.name = name
+        self.session_factory = session_factory
+        self.lag: Optional[float] = None
+
+
+class ReplicaRouter:
+    """Выбирает базу для сессий только на чтение.
+
+    Чтение идёт на реплику, отставание которой не больше `max_lag_seconds`; отставание
+    проверяет фоновая задача (`start`/`stop`) раз в `lag_check_interval` секунд, так что
+    запрос на чтение сам в реплику за отставанием не ходит. Если подходящей реплики нет,
+    или клиент сам писал в последние `read_your_writes_seconds` секунд, чтение идёт на мастер.
+    Без реплик `read_session` просто открывает сессию мастера.
+
+    Метку недавней записи несёт cookie клиента, а не память процесса: её видит любой
+    воркер, и запись одного клиента не переводит на мастер чтения других. Подделать
+    cookie можно, но так клиент лишь отправит на мастер собственные чтения, и не дольше
+    окна `read_your_writes_seconds` на запрос.
+    """
+
+    def __init__(self,
+                 primary: async_sessionmaker,
+                 replicas: Sequence[async_sessionmaker] = (),
+                 max_lag_seconds: float = 5.0,
+                 read_your_writes_seconds: float = 5.0,
+                 lag_check_interval: float = 1.0):
+        self.primary = primary
+        self.replicas = [_Replica(f"replica-{index}", factory) for index, factory in enumerate(replicas)]
+        self.max_lag_seconds = max_lag_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.lag_check_interval = lag_check_interval
+        self._next = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._task: Optional[asyncio.Task] = None
+        self.reads: Dict[str, int] = {"replica": 0, "primary_read_your_writes": 0, "primary_fallback": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def wrote_recently(self, request: Request) -> bool:
+        marker = request.headers.get(RECENT_WRITE_HEADER) or request.cookies.get(RECENT_WRITE_COOKIE, "")
+        try:
+            until = float(marker)
+        except ValueError:
+            return False
+        now = time.time()
+        return now < until <= now + self.read_your_writes_seconds + CLOCK_SKEW_SECONDS
+
+    def mark_write(self, response: Response) -> None:
+        until = f"{time.time() + self.read_your_writes_seconds:.3f}"
+        response.headers[RECENT_WRITE_HEADER] = until
+        response.set_cookie(RECENT_WRITE_COOKIE, until, max_age=math.ceil(self.read_your_writes_seconds),
+                            httponly=True, samesite="lax")
+
+    async def _refresh_lag(self, replica: _Replica) -> None:
+        try:
+            async with replica.session_factory() as session:
+                replica.lag = float(await session.scalar(LAG_QUERY))
+        except Exception as e:
+            logger.warning(f"{replica.name} is unavailable: {e}")
+            replica.lag = None
+
+    async def refresh(self) -> None:
+        await asyncio.gather(*(self._refresh_lag(replica) for replica in self.replicas))
+
+    async def _watch_lag(self) -> None:
+        while True:
+            await asyncio.sleep(self.lag_check_interval)
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Проверяет отставание реплик и запускает фоновую проверку; вызывается из lifespan."""
+        if not self.replicas or self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._watch_lag())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def choose(self, wrote_recently: bool = False) -> async_sessionmaker:
+        if not self.replicas:
+            return self.primary
+        if wrote_recently:
+            self.reads["primary_read_your_writes"] += 1
+            return self.primary
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            if replica.lag is not None and replica.lag <= self.max_lag_seconds:
+                self.reads["replica"] += 1
+                return replica.session_factory
+        self.reads["primary_fallback"] += 1
+        return self.primary
+
+    @asynccontextmanager
+    async def read_session(self, wrote_recently: bool = False) -> AsyncIterator[AsyncSession]:
+        factory = self.choose(wrote_recently)
+        async with factory() as session:
+            yield session
+
+    def status(self) -> List[Dict]:
+        return [{"name": replica.name, "lag_seconds": replica.lag} for replica in self.replicas]
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """Ставит метку недавней записи клиентам, чьи изменяющие запросы завершились успешно."""
+
+    def __init__(self, app, router: ReplicaRouter):
+        super().__init__(app)
+        self.router = router
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        response = await call_next(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.router.mark_write(response)
+        return response
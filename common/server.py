@@ -0,0 +1,87 @@
+"""Производственный запуск сервиса через uvicorn; `src/server.py` сервиса передаёт сюда имя и приложения.
+
+По умолчанию воркеров столько, сколько CPU доступно процессу (affinity и квота cgroup
+контейнера); --workers N или SERVER_WORKERS задают число явно. Каждый воркер — отдельный
+процесс, который сам импортирует `src.main` и проходит lifespan: у него свой пул соединений
+с БД (в БД приходит DB_POOL_SIZE × воркеры соединений), свой продюсер RabbitMQ и свой
+читатель stream отзывов токенов.
+
+Состояние в памяти процесса между воркерами не делится. /metrics сводится по всем воркерам
+через каталог METRICS_MULTIPROC_DIR (см. common.monitoring.multiprocess), а /admin/* —
+профили и лимит их частоты, tracemalloc и снимки памяти, медленные запросы, пул соединений —
+описывает и меняет только тот воркер, которому достался запрос.
+
+uvloop и httptools используются, если установлены.
+"""
+import argparse
+import importlib.util
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+
+from common.monitoring.logs import configure_logging
+from common.monitoring.multiprocess import MULTIPROC_DIR_ENV, clear_directory
+
+
+def available_cpus() -> int:
+    """CPU, на которых процессу разрешено выполняться, с учётом лимита CPU контейнера (cgroup v2)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def uvicorn_options(settings: Any, app: str, port: int, workers: int) -> Dict:
+    return {
+        "app": app,
+        "host": settings.SERVER_HOST,
+        "port": port,
+        "workers": workers,
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_S,
+        "access_log": settings.SERVER_ACCESS_LOG,
+        # Логирование настраивает common.monitoring.logs: и здесь, и в каждом воркере при импорте приложения.
+        "log_config": None,
+    }
+
+
+def prepare_multiprocess_metrics(service: str) -> None:
+    """Каталог снимков метрик для воркеров: из METRICS_MULTIPROC_DIR или временный.
+
+    Вызывается до запуска воркеров: они наследуют переменную окружения и читают её при импорте.
+    """
+    directory = os.environ.get(MULTIPROC_DIR_ENV) or tempfile.mkdtemp(prefix=f"{service}-metrics-")
+    clear_directory(Path(directory))
+    os.environ[MULTIPROC_DIR_ENV] = directory
+
+
+def main(service: str, apps: Dict[str, str], settings: Any, argv: Optional[List[str]] = None) -> None:
+    """Разбирает аргументы и запускает uvicorn; `apps` — роль процесса → путь к приложению, первая — по умолчанию."""
+    parser = argparse.ArgumentParser(description=f"Запуск {service}")
+    if len(apps) > 1:
+        parser.add_argument("role", nargs="?", choices=list(apps), default=next(iter(apps)))
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="число процессов; 0 — по числу доступных CPU")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    args = parser.parse_args(argv)
+
+    configure_logging(service, settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLING, settings.LOG_QUEUE_SIZE)
+    workers = args.workers or available_cpus()
+    if workers > 1:
+        prepare_multiprocess_metrics(service)
+    app = apps[getattr(args, "role", next(iter(apps)))]
+    uvicorn.run(**uvicorn_options(settings, app, args.port, workers))
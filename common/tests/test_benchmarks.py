@@ -0,0 +1,31 @@
+from common.benchmarks.harness import Benchmark, Result, compare, load_baseline, measure, save_baseline
+
+
+def test_measure_runs_sync_and_async_benchmarks():
+    calls = []
+
+    async def tick():
+        calls.append(1)
+
+    result = measure(Benchmark("tick", tick, is_async=True), min_time=0.001, repeats=2)
+
+    assert result.number >= 1
+    assert len(calls) >= result.number * 2
+    assert 0 < result.min_ns <= result.median_ns
+
+
+def test_compare_flags_regressions_against_saved_baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline([Result("fast", 100, 5, 1000.0, 1100.0), Result("slow", 100, 5, 1000.0, 1000.0)], path)
+    save_baseline([Result("stable", 100, 5, 1000.0, 1000.0)], path, merge=True)
+
+    rows = compare(
+        [Result("fast", 100, 5, 700.0, 700.0), Result("slow", 100, 5, 1300.0, 1300.0),
+         Result("stable", 100, 5, 1050.0, 1050.0), Result("added", 100, 5, 10.0, 10.0)],
+        load_baseline(path),
+        threshold=0.15,
+    )
+
+    assert {row["name"]: row["status"] for row in rows} == {
+        "fast": "improvement", "slow": "regression", "stable": "ok", "added": "new",
+    }
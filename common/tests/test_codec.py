@@ -0,0 +1,112 @@
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+from common.rabbit.codec import (
+    BINARY_CONTENT_TYPE,
+    BINARY_ENVELOPE_CONTENT_TYPE,
+    JSON_CONTENT_TYPE,
+    EventDecodeError,
+    decode_event,
+    decode_events,
+    encode_binary,
+    encode_event,
+    encode_events,
+)
+from common.rabbit.schemas import BookEvent
+
+
+@pytest.mark.parametrize("encoding", ["json", "binary"])
+@pytest.mark.parametrize("action", ["created", "deleted"])
+def test_round_trip(encoding, action):
+    event = BookEvent(book_id=uuid4(), action=action)
+
+    body, content_type = encode_event(event, encoding)
+
+    assert decode_event(body, content_type) == event
+
+
+def test_binary_is_compact():
+    event = BookEvent(book_id=uuid4(), action="created")
+
+    body, content_type = encode_event(event, "binary")
+
+    assert content_type == BINARY_CONTENT_TYPE
+    assert len(body) == 19
+
+
+def test_unknown_action_falls_back_to_json():
+    event = BookEvent(book_id=uuid4(), action="archived")
+
+    body, content_type = encode_event(event, "binary")
+
+    assert content_type == JSON_CONTENT_TYPE
+    assert decode_event(body, content_type) == event
+
+
+def test_legacy_message_without_content_type():
+    event = BookEvent(book_id=uuid4(), action="deleted")
+
+    assert decode_event(event.model_dump_json().encode(), None) == event
+
+
+def test_binary_rejects_unknown_version():
+    body = bytearray(encode_binary(BookEvent(book_id=uuid4(), action="created")))
+    body[0] = 99
+
+    with pytest.raises(EventDecodeError):
+        decode_event(bytes(body), BINARY_CONTENT_TYPE)
+
+
+@pytest.mark.parametrize("encoding", ["json", "binary"])
+def test_envelope_round_trip(encoding):
+    events = [BookEvent(book_id=uuid4(), action="deleted") for _ in range(3)]
+    body, content_type = encode_events(events, encoding)
+    assert decode_events(body, content_type) == events
+
+
+def test_single_event_is_not_wrapped():
+    event = BookEvent(book_id=uuid4(), action="created")
+    assert encode_events([event], "binary") == encode_event(event, "binary")
+    assert decode_events(*encode_event(event, "json")) == [event]
+
+
+def test_envelope_rejects_mixed_actions():
+    with pytest.raises(ValueError):
+        encode_events([BookEvent(book_id=uuid4(), action="created"), BookEvent(book_id=uuid4(), action="deleted")])
+
+
+def test_binary_envelope_length_mismatch():
+    events = [BookEvent(book_id=uuid4(), action="created") for _ in range(2)]
+    body, content_type = encode_events(events, "binary")
+    with pytest.raises(EventDecodeError):
+        decode_events(body[:-1], content_type)
+
+
+@pytest.mark.parametrize("encoding", ["json", "binary"])
+@pytest.mark.parametrize("count", [1, 3])
+def test_published_at_round_trip(encoding, count):
+    published_at = datetime(2026, 10, 19, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    events = [BookEvent(book_id=uuid4(), action="created") for _ in range(count)]
+
+    body, content_type = encode_events(events, encoding, published_at=published_at)
+
+    decoded = decode_events(body, content_type)
+    assert [event.book_id for event in decoded] == [event.book_id for event in events]
+    assert {event.published_at for event in decoded} == {published_at}
+
+
+@pytest.mark.parametrize("content_type", [BINARY_CONTENT_TYPE, BINARY_ENVELOPE_CONTENT_TYPE])
+def test_binary_decode_builds_ordinary_events(content_type):
+    published_at = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    events = [BookEvent(book_id=uuid4(), action="created", published_at=published_at) for _ in range(2)]
+    body, encoded_type = encode_events(events[:1] if content_type == BINARY_CONTENT_TYPE else events, "binary")
+    assert encoded_type == content_type
+
+    decoded = decode_events(body, content_type)
+
+    # События собраны без валидации, но ведут себя как провалидированные.
+    assert decoded == events[:len(decoded)]
+    assert decoded[0].model_dump_json() == events[0].model_dump_json()
+    assert decoded[0].model_copy(update={"action": "deleted"}).action == "deleted"
+    assert {decoded[0].book_id: 1}[events[0].book_id] == 1
+    assert str(decoded[0].book_id) == str(events[0].book_id)
@@ -0,0 +1,46 @@
+from sqlalchemy import BigInteger, Column, Numeric, String, UUID
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+
+from common.reconciliation.digest import range_digest_query
+
+Base = declarative_base()
+
+
+class KeyModel(Base):
+    __tablename__ = "keys"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+
+
+class BucketModel(Base):
+    __tablename__ = "key_digest_buckets"
+
+    bucket = Column(String(3), primary_key=True)
+    count = Column(BigInteger, nullable=False)
+    hash = Column(Numeric, nullable=False)
+
+
+def compiled(prefix):
+    query = range_digest_query(KeyModel.id, BucketModel, prefix)
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_short_prefixes_read_precomputed_buckets_only():
+    for prefix in ("", "a", "ab"):
+        sql = compiled(prefix)
+        assert "FROM key_digest_buckets" in sql
+        assert "keys" not in sql
+        assert f"substr(key_digest_buckets.bucket, 1, {len(prefix) + 1})" in sql
+
+
+def test_long_prefix_scans_only_its_key_range():
+    sql = compiled("abc")
+    assert "FROM keys" in sql
+    assert "key_digest_buckets" not in sql
+    assert "BETWEEN 'abc00000-0000-0000-0000-000000000000' AND 'abcfffff-ffff-ffff-ffff-ffffffffffff'" in sql
+
+
+def test_group_alias_does_not_shadow_bucket_column():
+    # В GROUP BY PostgreSQL предпочитает имя столбца псевдониму: группировка по "bucket" взяла бы всю корзину.
+    assert "GROUP BY prefix" in compiled("")
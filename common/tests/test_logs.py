@@ -0,0 +1,45 @@
+import json
+import logging
+import queue
+
+from common.monitoring.logs import DROPPED, JsonFormatter, NonBlockingQueueHandler, SamplingFilter, parse_sampling
+from common.monitoring.tracing import SpanExporter, Tracer
+
+
+def make_record(name: str = "src.books.service", level: int = logging.INFO, msg: str = "Book %s created", args=("42",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_handler_defers_formatting_and_keeps_trace_context():
+    log_queue = queue.Queue()
+    handler = NonBlockingQueueHandler(log_queue)
+    local = Tracer("book_service", SpanExporter(), sample_ratio=1.0)
+    local.exporter.export = lambda span: None
+    with local.span("request") as span:
+        record = make_record()
+        record.book_id = "42"
+        handler.emit(record)
+
+    queued = log_queue.get_nowait()
+    assert record.args == ("42",)
+    entry = json.loads(JsonFormatter("book_service").format(queued))
+    assert entry["message"] == "Book 42 created"
+    assert entry["service"] == "book_service"
+    assert entry["book_id"] == "42"
+    assert entry["trace_id"] == span.context.trace_id
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+    dropped = DROPPED.value()
+    handler.emit(make_record())
+    handler.emit(make_record())
+    assert DROPPED.value() == dropped + 1
+
+
+def test_sampling_applies_to_longest_prefix_below_warning():
+    sampling = SamplingFilter(parse_sampling("uvicorn.access=0, src=1"))
+    assert not sampling.filter(make_record("uvicorn.access"))
+    assert sampling.filter(make_record("uvicorn.access", logging.WARNING))
+    assert sampling.filter(make_record("src.books.service"))
+    assert sampling.filter(make_record("sqlalchemy.engine"))
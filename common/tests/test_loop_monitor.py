@@ -0,0 +1,41 @@
+import asyncio
+import logging
+import time
+
+from common.monitoring.loop import BLOCKS, LAG, LoopMonitor
+
+
+def blocking_hash():
+    time.sleep(0.2)
+
+
+def test_reports_blocking_call_with_its_stack(caplog):
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    samples, blocks = LAG.count(), BLOCKS.value()
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_hash()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="common.monitoring.loop"):
+        asyncio.run(scenario())
+
+    assert LAG.count() > samples
+    assert BLOCKS.value() == blocks + 1
+    [record] = caplog.records
+    assert "Event loop blocked for" in record.message
+    assert "in blocking_hash" in record.message
+
+
+def test_disabled_monitor_starts_nothing():
+    monitor = LoopMonitor(interval=0, threshold=0.05)
+
+    async def scenario():
+        monitor.start()
+        await monitor.stop()
+
+    asyncio.run(scenario())
+    assert monitor._task is None and monitor._watchdog is None
@@ -0,0 +1,50 @@
+import asyncio
+import gc
+
+from common.monitoring.memory import MemoryTracker, install_gc_metrics
+from common.monitoring.metrics import registry
+
+leaked = []
+
+
+def leak_records():
+    leaked.extend(bytearray(1024) for _ in range(500))
+
+
+def test_snapshot_diff_points_at_growing_allocation_site():
+    tracker = MemoryTracker(keep=2)
+    assert tracker.start(frames=1)
+    try:
+        assert not tracker.start()
+        base = tracker.take_snapshot()["id"]
+        leak_records()
+        target = tracker.take_snapshot()["id"]
+
+        growth = tracker.diff(tracker.get(base), tracker.get(target))
+        assert "test_memory.py" in growth[0]["traceback"][0]
+        assert growth[0]["size_diff_bytes"] >= 500 * 1024
+        assert tracker.top(tracker.get(target), "filename", limit=3)
+
+        tracker.take_snapshot()
+        assert tracker.get(base) is None
+        assert len(tracker.status()["snapshots"]) == 2
+    finally:
+        assert tracker.stop()
+        leaked.clear()
+    assert not tracker.stop()
+    assert tracker.status()["snapshots"] == []
+
+
+async def render() -> str:
+    return registry.render()
+
+
+def test_process_metrics_are_exported():
+    install_gc_metrics()
+    gc.collect()
+    # Часть метрик (число задач asyncio) считается только внутри event loop, как при scrape.
+    rendered = asyncio.run(render())
+    assert "process_resident_memory_bytes " in rendered
+    assert 'python_gc_collections_total{generation="2"}' in rendered
+    assert 'python_gc_pause_seconds_count{generation="2"}' in rendered
+    assert any(row["type"] == "function" for row in MemoryTracker.object_counts(50))
@@ -0,0 +1,103 @@
+import json
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from common.monitoring.http import DURATION, REQUESTS, UNMATCHED_ROUTE, HTTPMetricsMiddleware
+from common.monitoring.metrics import MetricsRegistry, merge_snapshots
+from common.monitoring.multiprocess import MultiprocessMetrics
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    messages = registry.counter("messages_total", "Messages", ["outcome"])
+    duration = registry.histogram("duration_seconds", "Duration", buckets=(0.1, 1.0))
+    registry.gauge("depth", "Depth", function=lambda: 7)
+
+    messages.inc(outcome="processed")
+    messages.inc(2, outcome="retried")
+    duration.observe(0.05)
+    duration.observe(0.5)
+
+    text = registry.render()
+    assert '# TYPE messages_total counter' in text
+    assert 'messages_total{outcome="retried"} 2' in text
+    assert 'duration_seconds_bucket{le="0.1"} 1' in text
+    assert 'duration_seconds_bucket{le="+Inf"} 2' in text
+    assert 'duration_seconds_count 2' in text
+    assert 'depth 7' in text
+
+
+def test_registering_twice_returns_same_metric():
+    registry = MetricsRegistry()
+    assert registry.counter("a_total", "A") is registry.counter("a_total", "A")
+
+
+def test_bound_labels_and_function_metrics():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    duration = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.1,))
+    registry.gauge("pool_size", "Size", ["pool"], function=lambda: {("primary",): 10, ("replica-0",): 5})
+
+    bound = requests.labels(route="/books")
+    bound.inc()
+    bound.inc()
+    duration.labels(route="/books").observe(0.5)
+
+    assert requests.value(route="/books") == 2
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/books",le="+Inf"} 1' in text
+    assert 'pool_size{pool="replica-0"} 5' in text
+
+
+def test_http_middleware_uses_route_template():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(HTTPMetricsMiddleware)
+    client = TestClient(app)
+    before = REQUESTS.value(method="GET", route="/items/{item_id}", status="200")
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert REQUESTS.value(method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert REQUESTS.value(method="GET", route=UNMATCHED_ROUTE, status="404") >= 1
+    assert DURATION.count(method="GET", route="/items/{item_id}") >= 2
+
+
+def test_merge_sums_counters_and_histograms_and_labels_live_gauges():
+    snapshots = []
+    for worker, alive in (("101", True), ("102", False)):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests", ["route"]).inc(route="/books")
+        registry.histogram("latency_seconds", "Latency", buckets=(0.1,)).observe(0.05)
+        registry.gauge("in_flight", "In flight", function=lambda: 3)
+        snapshots.append((worker, json.loads(json.dumps(registry.snapshot())), alive))
+
+    text = merge_snapshots(snapshots).render()
+    assert 'requests_total{route="/books"} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_count 2' in text
+    # Gauge завершившегося воркера не отдаётся: его состояние больше не существует.
+    assert 'in_flight{worker="101"} 3' in text
+    assert 'worker="102"' not in text
+
+
+def test_multiprocess_render_includes_other_workers(tmp_path):
+    other = MetricsRegistry()
+    other.counter("jobs_total", "Jobs").inc(5)
+    # pid больше pid_max: процесса заведомо нет, но его счётчики входят в сумму.
+    (tmp_path / "999999999.json").write_text(json.dumps(other.snapshot()))
+
+    own = MetricsRegistry()
+    own.counter("jobs_total", "Jobs").inc(2)
+    metrics = MultiprocessMetrics(own, str(tmp_path))
+
+    assert "jobs_total 7" in metrics.render()
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    assert MultiprocessMetrics(own, None).render() == own.render()
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import QueuePool
+
+from common.monitoring.router import create_monitoring_router
+from common.replicas import ReplicaRouter
+
+
+async def require_admin(x_role: str = Header("user")):
+    if x_role != "admin":
+        raise HTTPException(status_code=403)
+    return SimpleNamespace(sub="1", role=[x_role])
+
+
+def make_client() -> TestClient:
+    engine = SimpleNamespace(pool=QueuePool(lambda: None, pool_size=3, max_overflow=1))
+    extra = APIRouter()
+
+    @extra.get("/admin/extra")
+    async def extra_route():
+        return {"extra": True}
+
+    app = FastAPI()
+    app.include_router(create_monitoring_router(require_admin, engine, [], ReplicaRouter(None, []), extra_routes=extra))
+    return TestClient(app)
+
+
+def test_admin_routes_use_the_given_dependency():
+    client = make_client()
+
+    assert client.get("/admin/db-pool").status_code == 403
+    response = client.get("/admin/db-pool", headers={"x-role": "admin"})
+    assert response.status_code == 200
+    assert response.json()["primary"]["size"] == 3
+    assert client.get("/metrics").status_code == 200
+
+
+def test_extra_routes_are_mounted():
+    assert make_client().get("/admin/extra").json() == {"extra": True}
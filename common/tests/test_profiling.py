@@ -0,0 +1,47 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from common.monitoring.profiling import ProfilingMiddleware, RequestProfiler
+
+ADMIN = {"Authorization": "Bearer admin", "X-Profile": "1"}
+
+
+def busy_handler_work():
+    return sum(range(1000))
+
+
+def make_client(profiler: RequestProfiler) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"sum": busy_handler_work()}
+
+    app.add_middleware(ProfilingMiddleware, authorize=lambda token: token == "admin", profiler=profiler)
+    return TestClient(app)
+
+
+def test_profiles_admin_requests_and_stores_pstats(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), max_per_minute=5, keep=5)
+    client = make_client(profiler)
+
+    assert "x-profile" not in client.get("/work").headers
+    assert client.get("/work", headers={**ADMIN, "Authorization": "Bearer user"}).headers["x-profile"] == "forbidden"
+
+    response = client.get("/work", headers=ADMIN)
+    profile_id = response.headers["x-profile"]
+    assert response.json() == {"sum": 499500}
+    assert profiler.path(profile_id).exists()
+    assert profiler.list()[0]["path"] == "/work"
+    assert "busy_handler_work" in profiler.summary(profile_id)
+
+
+def test_rate_limit_and_retention(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), max_per_minute=2, keep=1)
+    client = make_client(profiler)
+
+    first, second, third = (client.get("/work", headers=ADMIN).headers["x-profile"] for _ in range(3))
+    assert third == "rate-limited"
+    assert profiler.path(first) is None
+    assert [entry["id"] for entry in profiler.list()] == [second]
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from common.replicas import RECENT_WRITE_COOKIE, RECENT_WRITE_HEADER, ReplicaRouter
+
+
+class FakeSession:
+    def __init__(self, factory):
+        self.factory = factory
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def scalar(self, statement):
+        self.factory.lag_checks += 1
+        if isinstance(self.factory.lag, Exception):
+            raise self.factory.lag
+        return self.factory.lag
+
+
+class FakeFactory:
+    def __init__(self, name, lag=0.0):
+        self.name = name
+        self.lag = lag
+        self.lag_checks = 0
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+def request_with(cookie_header="", marker_header=""):
+    headers = [(b"cookie", cookie_header.encode())] if cookie_header else []
+    if marker_header:
+        headers.append((RECENT_WRITE_HEADER.lower().encode(), marker_header.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+def test_without_replicas_reads_go_to_primary():
+    primary = FakeFactory("primary")
+    router = ReplicaRouter(primary)
+
+    assert router.choose() is primary
+    assert not router.enabled
+
+
+@pytest.mark.asyncio
+async def test_stale_or_broken_replicas_fall_back_to_primary():
+    primary, stale, broken = FakeFactory("primary"), FakeFactory("stale", lag=30.0), FakeFactory("broken", lag=OSError("down"))
+    router = ReplicaRouter(primary, [stale, broken], max_lag_seconds=5.0, lag_check_interval=0.01)
+
+    await router.start()
+    try:
+        assert router.choose() is primary
+        assert router.reads["primary_fallback"] == 1
+
+        stale.lag = 0.5
+        checks = stale.lag_checks
+        assert router.choose() is primary  # чтение отставание не проверяет
+        assert stale.lag_checks == checks
+        while stale.lag_checks == checks:
+            await asyncio.sleep(0.01)
+        assert router.choose() is stale
+    finally:
+        await router.stop()
+
+
+def test_client_reads_own_writes_from_primary():
+    primary, replica = FakeFactory("primary"), FakeFactory("replica")
+    router = ReplicaRouter(primary, [replica], read_your_writes_seconds=60)
+    router.replicas[0].lag = 0.0
+
+    response = Response()
+    router.mark_write(response)
+    cookie = response.headers["set-cookie"].split(";")[0]
+
+    assert router.choose(router.wrote_recently(request_with(cookie))) is primary
+    assert router.choose(router.wrote_recently(request_with())) is replica
+    # Метка из прошлого или дальше окна не действует.
+    assert not router.wrote_recently(request_with(f"{RECENT_WRITE_COOKIE}=1"))
+    assert not router.wrote_recently(request_with(f"{RECENT_WRITE_COOKIE}=99999999999"))
+    assert not router.wrote_recently(request_with(f"{RECENT_WRITE_COOKIE}=oops"))
+    assert router.reads == {"replica": 1, "primary_read_your_writes": 1, "primary_fallback": 0}
+
+
+def test_bearer_client_without_cookies_echoes_header():
+    primary, replica = FakeFactory("primary"), FakeFactory("replica")
+    router = ReplicaRouter(primary, [replica], read_your_writes_seconds=60)
+    router.replicas[0].lag = 0.0
+
+    response = Response()
+    router.mark_write(response)
+    marker = response.headers[RECENT_WRITE_HEADER]
+
+    # Клиент без cookie, вернувший заголовок, читает свою запись с мастера.
+    assert router.choose(router.wrote_recently(request_with(marker_header=marker))) is primary
+    # Клиент, не вернувший метку вовсе, гарантии не получает и читает с реплики.
+    assert router.choose(router.wrote_recently(request_with())) is replica
+    assert not router.wrote_recently(request_with(marker_header="99999999999"))
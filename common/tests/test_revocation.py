@@ -0,0 +1,77 @@
+import aio_pika
+import asyncio
+import pytest
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from common.auth.revocation import BloomFilter, RevocationList
+from common.rabbit.inmemory import InMemoryBroker, install_broker
+from common.rabbit.revocations import RevocationConsumer, TokenRevocation, declare_revocations
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    keys = [str(uuid4()) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+
+
+def test_bloom_filter_false_positive_rate_is_bounded():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for _ in range(1000):
+        bloom.add(str(uuid4()))
+
+    false_positives = sum(str(uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_revoked_subject_and_jti():
+    revocations = RevocationList(capacity=10)
+    revocations.revoke("sub:user-1", time.time() + 60)
+    revocations.revoke("jti:token-1", time.time() + 60)
+
+    assert revocations.is_token_revoked("user-1", "other")
+    assert revocations.is_token_revoked("user-2", "token-1")
+    assert not revocations.is_token_revoked("user-2", "token-2")
+
+
+def test_expired_revocations_are_ignored_and_purged():
+    revocations = RevocationList(capacity=10)
+    revocations.revoke("sub:user-1", time.time() + 60)
+    revocations._expires["sub:user-1"] = time.time() - 1
+
+    assert not revocations.is_revoked("sub:user-1")
+    assert revocations.purge_expired() == 1
+    assert len(revocations) == 0
+
+
+def test_revocation_list_grows_beyond_capacity():
+    revocations = RevocationList(capacity=4)
+    keys = [f"jti:{uuid4()}" for _ in range(20)]
+    for key in keys:
+        revocations.revoke(key, time.time() + 60)
+
+    assert all(revocations.is_revoked(key) for key in keys)
+
+
+@pytest.mark.asyncio
+async def test_consumer_started_after_revocation_still_receives_it():
+    broker = InMemoryBroker()
+    install_broker(broker, "revocations")
+    channel = await (await broker.connect()).channel()
+    exchange, _ = await declare_revocations(channel)
+    revocation = TokenRevocation(jti="token-1", expires_at=datetime.now(timezone.utc) + timedelta(minutes=5))
+    await exchange.publish(aio_pika.Message(body=revocation.model_dump_json().encode()), routing_key="")
+
+    # Два процесса сервиса, поднятые уже после отзыва, читают stream с начала.
+    lists = [RevocationList(capacity=10), RevocationList(capacity=10)]
+    tasks = [asyncio.create_task(RevocationConsumer("memory://revocations", revocations).consume()) for revocations in lists]
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+    assert all(revocations.is_token_revoked(None, "token-1") for revocations in lists)
+    for task in tasks:
+        task.cancel()
+        await task
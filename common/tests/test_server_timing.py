@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from common.monitoring.timing import ServerTimingMiddleware, TimedJSONResponse, mark_admin, phase, timed_auth
+
+
+async def fake_token(request):
+    role = request.headers.get("x-role", "user")
+    return SimpleNamespace(sub="1", role=role, revoked="x-revoked" in request.headers)
+
+
+def make_app(mode: str) -> FastAPI:
+    app = FastAPI(default_response_class=TimedJSONResponse)
+    access_token_required = timed_auth(fake_token)
+
+    async def require_authenticated(token=Depends(access_token_required)):
+        if token.revoked:
+            raise HTTPException(status_code=401)
+        mark_admin(token)
+        return token
+
+    @app.get("/work")
+    async def work(token=Depends(require_authenticated)):
+        with phase("db"):
+            await asyncio.sleep(0.01)
+            # Вложенный вход в открытую фазу не учитывается второй раз.
+            with phase("db"):
+                pass
+        return {"ok": True}
+
+    app.add_middleware(ServerTimingMiddleware, mode=mode)
+    return app
+
+
+def parse(header: str) -> dict:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+def test_admin_mode_emits_header_only_for_admin_tokens():
+    client = TestClient(make_app("admin"))
+    assert "server-timing" not in client.get("/work").headers
+
+    metrics = parse(client.get("/work", headers={"x-role": "admin"}).headers["server-timing"])
+    assert set(metrics) == {"auth", "db", "serialization", "total"}
+    assert metrics["db"]["desc"] == '"1x"'
+    assert 10.0 <= float(metrics["db"]["dur"]) <= float(metrics["total"]["dur"])
+
+
+def test_revoked_admin_token_gets_no_header():
+    response = TestClient(make_app("admin")).get("/work", headers={"x-role": "admin", "x-revoked": "1"})
+    assert response.status_code == 401
+    assert "server-timing" not in response.headers
+
+
+def test_all_and_off_modes():
+    assert "server-timing" in TestClient(make_app("all")).get("/work").headers
+    assert "server-timing" not in TestClient(make_app("off")).get("/work", headers={"x-role": "admin"}).headers
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from common.monitoring.sql import (
+    BUDGET_EXCEEDED,
+    QueryBudgetMiddleware,
+    SlowQuerySampler,
+    current_query_stats,
+    instrument_engine,
+    normalize_sql,
+    slow_queries,
+)
+
+
+def test_normalize_sql_strips_values():
+    statement = "SELECT books.id FROM books WHERE books.isbn = 'x''y' AND books.id IN ($1, $2, $3) LIMIT 10"
+    assert normalize_sql(statement) == "SELECT books.id FROM books WHERE books.isbn = ? AND books.id IN (...) LIMIT ?"
+
+
+def test_normalize_sql_keeps_type_casts():
+    statement = "SELECT CAST(books.id AS TEXT)::bit(60)::bigint FROM books WHERE books.id = :id_1"
+    assert normalize_sql(statement) == "SELECT CAST(books.id AS TEXT)::bit(?)::bigint FROM books WHERE books.id = ?"
+
+
+def test_sampler_keeps_slowest_statement_shapes():
+    sampler = SlowQuerySampler(size=2)
+    sampler.observe("a", 10)
+    sampler.observe("b", 30)
+    sampler.observe("a", 50)
+    sampler.observe("c", 5)
+    sampler.observe("d", 40)
+
+    assert [(entry["statement"], entry["count"]) for entry in sampler.top()] == [("a", 2), ("d", 1)]
+
+
+def make_app(queries_per_request, budget):
+    engine = create_engine("sqlite://")
+    instrument_engine(SimpleNamespace(sync_engine=engine), slow_query_ms=0.0)
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, budget=budget)
+
+    @app.get("/")
+    def endpoint():
+        with engine.connect() as connection:
+            for _ in range(queries_per_request):
+                connection.execute(text("SELECT 1"))
+        return {"queries": current_query_stats().count}
+
+    return TestClient(app)
+
+
+def test_request_query_count_and_slow_sampling():
+    response = make_app(queries_per_request=3, budget=0).get("/")
+
+    assert response.json() == {"queries": 3}
+    assert any(entry["statement"] == "SELECT ?" for entry in slow_queries.top())
+
+
+def test_query_budget_fails_request_before_extra_query():
+    client = make_app(queries_per_request=3, budget=2)
+    exceeded = BUDGET_EXCEEDED.value(method="GET", route="/")
+
+    response = client.get("/")
+
+    assert response.status_code == 500
+    assert "Query budget exceeded" in response.json()["detail"]
+    assert BUDGET_EXCEEDED.value(method="GET", route="/") == exceeded + 1
+
+
+def test_query_budget_fails_request_when_handler_wraps_the_error():
+    engine = create_engine("sqlite://")
+    instrument_engine(SimpleNamespace(sync_engine=engine), slow_query_ms=1000.0)
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, budget=1)
+    committed = []
+
+    @app.get("/")
+    def endpoint():
+        try:
+            with engine.begin() as connection:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
+            committed.append(True)
+        except Exception:
+            return {"handled": True}
+
+    response = TestClient(app).get("/")
+
+    assert response.status_code == 500
+    assert committed == []
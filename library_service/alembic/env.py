@@ -7,6 +7,7 @@ from alembic import context
 from src.config import settings
 from src.database import Base
 from src.library.models import BookStatusModel #noqa
+from src.reconciliation.models import KeyDigestBucketModel #noqa
 
 
 config = context.config
@@ -0,0 +1,83 @@
+"""key_digest_buckets
+
+Revision ID: 4a8f6b2d1e57
+Revises: 2ef85ab6d4ca
+Create Date: 2026-10-19 21:04:37.512843
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8f6b2d1e57'
+down_revision: Union[str, None] = '2ef85ab6d4ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Корзина — первые три hex-символа ключа; хеш — сумма первых 60 бит md5 ключей,
+# как в common.reconciliation.digest.key_hash. Ключи book_status не изменяются, поэтому
+# триггеры нужны только на INSERT, DELETE и TRUNCATE.
+BUCKET_ROWS = """
+    SELECT substr(replace(book_id::text, '-', ''), 1, 3) AS bucket,
+           {sign} * count(*) AS count,
+           {sign} * sum(('x' || substr(md5(book_id::text), 1, 15))::bit(60)::bigint) AS hash
+    FROM {source}
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+# ORDER BY в BUCKET_ROWS: параллельные транзакции обновляют корзины в одном порядке и не взаимоблокируются.
+APPLY_FUNCTION = """
+CREATE FUNCTION book_status_digest_{name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO key_digest_buckets AS b (bucket, count, hash)
+    {rows}
+    ON CONFLICT (bucket) DO UPDATE SET count = b.count + EXCLUDED.count, hash = b.hash + EXCLUDED.hash;
+    RETURN NULL;
+END $$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('key_digest_buckets',
+    sa.Column('bucket', sa.String(length=3), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('hash', sa.Numeric(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket')
+    )
+    # Записи в book_status ждут конца миграции: заполнение и триггеры видят одно и то же множество ключей.
+    op.execute("LOCK TABLE book_status IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(APPLY_FUNCTION.format(name="insert", rows=BUCKET_ROWS.format(sign=1, source="inserted")))
+    op.execute(APPLY_FUNCTION.format(name="delete", rows=BUCKET_ROWS.format(sign=-1, source="deleted")))
+    op.execute("""
+        CREATE FUNCTION book_status_digest_truncate() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM key_digest_buckets;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER book_status_digest_insert AFTER INSERT ON book_status
+        REFERENCING NEW TABLE AS inserted FOR EACH STATEMENT EXECUTE FUNCTION book_status_digest_insert()
+    """)
+    op.execute("""
+        CREATE TRIGGER book_status_digest_delete AFTER DELETE ON book_status
+        REFERENCING OLD TABLE AS deleted FOR EACH STATEMENT EXECUTE FUNCTION book_status_digest_delete()
+    """)
+    op.execute("""
+        CREATE TRIGGER book_status_digest_truncate AFTER TRUNCATE ON book_status
+        FOR EACH STATEMENT EXECUTE FUNCTION book_status_digest_truncate()
+    """)
+    op.execute("INSERT INTO key_digest_buckets (bucket, count, hash)" + BUCKET_ROWS.format(sign=1, source="book_status"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in ("insert", "delete", "truncate"):
+        op.execute(f"DROP TRIGGER book_status_digest_{operation} ON book_status")
+        op.execute(f"DROP FUNCTION book_status_digest_{operation}()")
+    op.drop_table('key_digest_buckets')
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+from benchmarks import bench_hot_paths  # noqa: F401 — регистрирует бенчмарки
+from common.benchmarks.harness import main
+
+sys.exit(main(Path(__file__).with_name("baseline.json")))
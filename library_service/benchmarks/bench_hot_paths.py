@@ -0,0 +1,104 @@
+"""Горячие функции library_service на каждый запрос и каждое событие."""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from starlette.requests import Request
+
+from common.benchmarks.harness import benchmark
+from benchmarks.memory import MemoryLibraryRepository
+from src.auth.auth import security
+from src.auth.permissions import require_authenticated
+from src.library.models import BookStatusModel
+from src.library.schemas import BookStatus
+from src.library.service import LibraryService
+from common.rabbit.codec import decode_event, decode_events, encode_event, encode_events
+from common.rabbit.schemas import BookEvent
+
+PAGE_SIZE = 100
+
+EVENT = BookEvent(book_id=uuid4(), action="created", published_at=datetime.now(timezone.utc))
+EVENTS = [BookEvent(book_id=uuid4(), action="created") for _ in range(PAGE_SIZE)]
+PUBLISHED_AT = datetime.now(timezone.utc)
+ENCODED = {encoding: encode_event(EVENT, encoding) for encoding in ("json", "binary")}
+ENCODED_ENVELOPES = {encoding: encode_events(EVENTS, encoding, PUBLISHED_AT) for encoding in ("json", "binary")}
+
+
+def _register_codec(encoding: str):
+    body, content_type = ENCODED[encoding]
+    envelope, envelope_content_type = ENCODED_ENVELOPES[encoding]
+
+    benchmark(f"codec.decode_event[{encoding}]")(lambda: decode_event(body, content_type))
+    benchmark(f"codec.decode_events[{encoding},{PAGE_SIZE}]")(lambda: decode_events(envelope, envelope_content_type))
+
+
+for _encoding in ("json", "binary"):
+    _register_codec(_encoding)
+
+
+STATUS_MODEL = BookStatusModel(book_id=uuid4(), borrowed_at=datetime.now(), returned_at=None, is_available=False)
+
+
+@benchmark("schemas.BookStatus.model_validate(orm)")
+def book_status_from_orm():
+    BookStatus.model_validate(STATUS_MODEL)
+
+
+ACCESS_TOKEN = security.create_access_token(uid=str(uuid4()), data={"role": "user"})
+ACCESS_TOKEN_REQUIRED = security.access_token_required
+REQUEST_SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/library/available",
+    "query_string": b"",
+    "headers": [(b"authorization", f"Bearer {ACCESS_TOKEN}".encode())],
+}
+
+
+@benchmark("auth.access_token_required")
+async def access_token_required():
+    await ACCESS_TOKEN_REQUIRED(Request(REQUEST_SCOPE))
+
+
+@benchmark("auth.require_authenticated")
+async def authenticated():
+    require_authenticated(await ACCESS_TOKEN_REQUIRED(Request(REQUEST_SCOPE)))
+
+
+STATUSES = [BookStatusModel(book_id=uuid4(), borrowed_at=None, returned_at=None, is_available=True)
+            for _ in range(PAGE_SIZE)]
+repo = MemoryLibraryRepository(STATUSES)
+service = LibraryService(repo)
+BOOK_ID = STATUSES[0].book_id
+NEW_BOOK_IDS = [uuid4() for _ in range(PAGE_SIZE)]
+
+
+@benchmark("service.get_book_status")
+async def get_book_status():
+    await service.get_book_status(BOOK_ID)
+
+
+@benchmark("service.get_book_status_row")
+async def get_book_status_row():
+    await service.get_book_status_row(BOOK_ID)
+
+
+@benchmark(f"service.get_available_books[{PAGE_SIZE}]")
+async def get_available_books():
+    await service.get_available_books()
+
+
+@benchmark(f"service.get_available_book_rows[{PAGE_SIZE}]")
+async def get_available_book_rows():
+    await service.get_available_book_rows()
+
+
+@benchmark("service.borrow_book+return_book")
+async def borrow_and_return():
+    await service.borrow_book(BOOK_ID)
+    await service.return_book(BOOK_ID)
+
+
+@benchmark(f"service.create_book_statuses+delete_book_statuses[{PAGE_SIZE}]")
+async def create_and_delete_statuses():
+    await service.create_book_statuses(NEW_BOOK_IDS)
+    await service.delete_book_statuses(NEW_BOOK_IDS)
@@ -0,0 +1,60 @@
+"""Репозиторий в памяти для бенчмарков сервисного слоя: без БД замеряется только код сервиса."""
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from src.library.models import BookStatusModel
+from src.library.repository import BOOK_STATUS_COLUMNS, ILibraryRepository
+from common.reconciliation.digest import RangeDigest
+
+_ROW_KEYS = tuple(column.key for column in BOOK_STATUS_COLUMNS)
+
+
+class MemoryLibraryRepository(ILibraryRepository):
+    def __init__(self, statuses: List[BookStatusModel] = ()):
+        self.statuses: Dict[UUID, BookStatusModel] = {status.book_id: status for status in statuses}
+
+    async def create(self, book_status: BookStatusModel) -> BookStatusModel:
+        self.statuses[book_status.book_id] = book_status
+        return book_status
+
+    async def create_many(self, book_ids: List[UUID]) -> int:
+        created = 0
+        for book_id in book_ids:
+            if book_id not in self.statuses:
+                self.statuses[book_id] = BookStatusModel(book_id=book_id, is_available=True)
+                created += 1
+        return created
+
+    def _filtered(self, skip: int, limit: int, is_available: Optional[bool]) -> List[BookStatusModel]:
+        statuses = [status for status in self.statuses.values()
+                    if is_available is None or status.is_available == is_available]
+        return statuses[skip:skip + limit]
+
+    async def get_all(self, skip: int = 0, limit: int = 100, is_available: Optional[bool] = None) -> List[BookStatusModel]:
+        return self._filtered(skip, limit, is_available)
+
+    async def get(self, book_id: UUID) -> BookStatusModel | None:
+        return self.statuses.get(book_id)
+
+    async def get_all_rows(self, skip: int = 0, limit: int = 100, is_available: Optional[bool] = None) -> List[Dict]:
+        return [{key: getattr(status, key) for key in _ROW_KEYS} for status in self._filtered(skip, limit, is_available)]
+
+    async def get_row(self, book_id: UUID) -> Dict | None:
+        status = self.statuses.get(book_id)
+        return {key: getattr(status, key) for key in _ROW_KEYS} if status is not None else None
+
+    async def update(self, book_status: BookStatusModel) -> BookStatusModel:
+        self.statuses[book_status.book_id] = book_status
+        return book_status
+
+    async def delete(self, book_id: UUID) -> int:
+        return 1 if self.statuses.pop(book_id, None) is not None else 0
+
+    async def delete_many(self, book_ids: List[UUID]) -> int:
+        return sum(1 for book_id in book_ids if self.statuses.pop(book_id, None) is not None)
+
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        return []
+
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        return []
@@ -1,5 +1,7 @@
 from authx import AuthX, AuthXConfig
 from src.config import settings
+from common.auth.revocation import RevocationList
+from common.monitoring.timing import timed_auth
 
 config = AuthXConfig(
 JWT_SECRET_KEY=settings.JWT_KEY,
@@ -8,4 +10,8 @@ JWT_ACCESS_TOKEN_EXPIRES=3600,
 JWT_TOKEN_LOCATION=["headers"]
 )
 
-security = AuthX(config)
\ No newline at end of file
+security = AuthX(config)
+# Проверка токена с учётом времени в фазе auth заголовка Server-Timing.
+access_token_required = timed_auth(security.access_token_required)
+
+revocation_list = RevocationList(settings.REVOCATION_BLOOM_CAPACITY)
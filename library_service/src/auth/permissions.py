@@ -1,18 +1,37 @@
+import jwt
 from fastapi import Depends, HTTPException, status
 from authx import RequestToken, TokenPayload
+from authx.exceptions import RevokedTokenError
 
-from src.auth.auth import security
+from src.auth.auth import access_token_required, config, revocation_list
+from common.monitoring.timing import mark_admin
 
 
-def require_admin(payload: TokenPayload = Depends(security.access_token_required)):
+def require_admin(payload: TokenPayload = Depends(access_token_required)):
+    if revocation_list.is_token_revoked(payload.sub, payload.jti):
+        raise RevokedTokenError("Token has been revoked")
     if "admin" not in getattr(payload, "role", []):
         from fastapi import HTTPException
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
         )
+    mark_admin(payload)
     return payload
 
-def require_authenticated(token: RequestToken = Depends(security.access_token_required)):
+def require_authenticated(token: RequestToken = Depends(access_token_required)):
+    if revocation_list.is_token_revoked(token.sub, token.jti):
+        raise RevokedTokenError("Token has been revoked")
+    mark_admin(token)
     return token
 
+
+def is_admin_token(token: str) -> bool:
+    """Проверка токена администратора вне зависимостей FastAPI (для middleware): подпись, срок, тип, отзыв и роль."""
+    try:
+        payload = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=[config.JWT_ALGORITHM])
+    except jwt.PyJWTError:
+        return False
+    if payload.get("type") != "access" or revocation_list.is_token_revoked(payload.get("sub"), payload.get("jti")):
+        return False
+    return "admin" in payload.get("role", [])
@@ -1,4 +1,4 @@
-from src.database import get_session
+from src.database import get_read_session, get_session
 from src.library.repository import SqlLibraryRepository, ILibraryRepository
 from src.library.service import LibraryService
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,4 +12,10 @@ async def get_library_repository(
 async def get_library_service(
     repo: ILibraryRepository = Depends(get_library_repository)
 ) -> LibraryService:
-    return LibraryService(repo)
\ No newline at end of file
+    return LibraryService(repo)
+
+async def get_library_read_service(
+    session: AsyncSession = Depends(get_read_session)
+) -> LibraryService:
+    """Сервис для обработчиков только на чтение: сессия может быть открыта на реплике."""
+    return LibraryService(SqlLibraryRepository(session))
\ No newline at end of file
@@ -6,7 +6,7 @@ from starlette.status import (
     HTTP_404_NOT_FOUND,
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
-from authx.exceptions import MissingTokenError, JWTDecodeError
+from authx.exceptions import MissingTokenError, JWTDecodeError, RevokedTokenError
 from src.library.exceptions import (
     InvalidUUIDError,
     BookStatusNotFoundError,
@@ -32,6 +32,12 @@ async def jwt_decode_error_handler(request: Request, exc: JWTDecodeError):
         content={"detail": detail},
     )
 
+async def revoked_token_handler(request: Request, exc: RevokedTokenError):
+    return JSONResponse(
+        status_code=HTTP_401_UNAUTHORIZED,
+        content={"detail": "Token has been revoked"},
+    )
+
 async def invalid_uuid_handler(request: Request, exc: InvalidUUIDError):
     return JSONResponse(
         status_code=HTTP_400_BAD_REQUEST,
@@ -70,6 +76,7 @@ async def service_error_handler(request: Request, exc: ServiceError):
 def register_exception_handlers(app):
     app.add_exception_handler(MissingTokenError, missing_token_exception_handler)
     app.add_exception_handler(JWTDecodeError, jwt_decode_error_handler)
+    app.add_exception_handler(RevokedTokenError, revoked_token_handler)
     app.add_exception_handler(MissingTokenError, missing_token_exception_handler)
     app.add_exception_handler(InvalidUUIDError, invalid_uuid_handler)
     app.add_exception_handler(BookStatusNotFoundError, book_status_not_found_handler)
@@ -1,6 +1,7 @@
 import logging
+from typing import List
 from uuid import UUID
-from src.rabbit.schemas import BookEvent
+from common.rabbit.schemas import BookEvent
 from src.database import get_session
 from src.library.repository import SqlLibraryRepository
 from src.library.service import LibraryService
@@ -9,21 +10,31 @@ logger = logging.getLogger(__name__)
 
 async def handle_book_event(event: BookEvent):
     """Обработчик событий о книгах"""
+    await handle_book_events([event])
+
+
+async def handle_book_events(events: List[BookEvent]):
+    """Обработчик сообщения с событиями о книгах; конверт применяется одной операцией"""
     async for session in get_session():
         try:
             service = LibraryService(SqlLibraryRepository(session))
-            
-            if event.action == "created":
-                logger.info(f"Creating book status for {event.book_id}")
-                await service.create_book_status(event.book_id)
-            elif event.action == "deleted":
-                logger.info(f"Deleting book status for {event.book_id}")
-                await service.delete_book_status(event.book_id)
-                
+
+            # В конверте все события с одним действием (см. encode_events у продюсера).
+            # Создание идёт через INSERT ... ON CONFLICT DO NOTHING: статус мог уже создать
+            # сверщик (src.reconciliation.reconciler), и повторное событие не должно падать.
+            action = events[0].action
+            book_ids = [event.book_id for event in events]
+            if action == "created":
+                logger.debug(f"Creating {len(book_ids)} book status(es)")
+                await service.create_book_statuses(book_ids)
+            elif action == "deleted":
+                logger.debug(f"Deleting {len(book_ids)} book status(es)")
+                await service.delete_book_statuses(book_ids)
+
             await session.commit()
         except Exception as e:
             logger.error(f"Error processing event: {e}")
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
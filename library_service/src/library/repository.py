@@ -1,16 +1,34 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, exc, delete
+from sqlalchemy.dialects.postgresql import insert
 from src.library.models import BookStatusModel 
+from src.reconciliation.models import KeyDigestBucketModel
 from uuid import UUID
 from src.library.exceptions import RepositoryError 
+from common.reconciliation.digest import RangeDigest, range_digest_query, ids_in_range_query, to_range_digests
+from common.monitoring.timing import timed_methods
+from common.monitoring.tracing import traced_methods
+
+# Порядок колонок совпадает с порядком полей схемы BookStatus, чтобы JSON быстрого пути не отличался.
+BOOK_STATUS_COLUMNS = (
+    BookStatusModel.book_id,
+    BookStatusModel.borrowed_at,
+    BookStatusModel.returned_at,
+    BookStatusModel.is_available,
+)
 
 class ILibraryRepository(ABC):
     @abstractmethod
     async def create(self, book_status: BookStatusModel) -> BookStatusModel:
         ...
 
+    @abstractmethod
+    async def create_many(self, book_ids: List[UUID]) -> int:
+        """Создаёт статусы для книг, у которых их ещё нет. Возвращает количество созданных."""
+        ...
+
     @abstractmethod
     async def get_all(self,
                       skip: int = 0,
@@ -24,6 +42,19 @@ class ILibraryRepository(ABC):
         """Получает статус книги по ID книги."""
         ...
 
+    @abstractmethod
+    async def get_all_rows(self,
+                           skip: int = 0,
+                           limit: int = 100,
+                           is_available: Optional[bool] = None
+                          ) -> List[Dict]:
+        """То же, что get_all, но строками-словарями в обход ORM."""
+        ...
+
+    @abstractmethod
+    async def get_row(self, book_id: UUID) -> Dict | None:
+        ...
+
     @abstractmethod
     async def update(self, book_status: BookStatusModel) -> BookStatusModel:
         ...
@@ -33,7 +64,22 @@ class ILibraryRepository(ABC):
         """Удаляет статус книги по ID книги. Возвращает количество удаленных записей."""
         ...
 
+    @abstractmethod
+    async def delete_many(self, book_ids: List[UUID]) -> int:
+        ...
+
+    @abstractmethod
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        """Дайджесты 16 дочерних диапазонов префикса для сверки с book_service."""
+        ...
+
+    @abstractmethod
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        ...
+
 
+@traced_methods
+@timed_methods("db")
 class SqlLibraryRepository(ILibraryRepository):
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -50,6 +96,20 @@ class SqlLibraryRepository(ILibraryRepository):
             raise RepositoryError("Database operation failed during book status creation", original_error=e) from e
 
 
+    async def create_many(self, book_ids: List[UUID]) -> int:
+        """Создает статусы одним INSERT; повторная доставка того же конверта ничего не меняет."""
+        try:
+            stmt = insert(BookStatusModel).values(
+                [{"book_id": book_id, "is_available": True} for book_id in book_ids]
+            ).on_conflict_do_nothing(index_elements=[BookStatusModel.book_id])
+            result = await self._session.execute(stmt)
+            await self._session.commit()
+            return result.rowcount
+        except exc.SQLAlchemyError as e:
+            await self._session.rollback()
+            raise RepositoryError("Database operation failed during bulk book status creation", original_error=e) from e
+
+
     async def get_all(self, skip: int = 0, limit: int = 100, is_available: Optional[bool] = None) -> List[BookStatusModel]:
         """Получает список статусов книг с пагинацией и фильтром по доступности."""
         try:
@@ -63,6 +123,29 @@ class SqlLibraryRepository(ILibraryRepository):
              raise RepositoryError("Database operation failed while retrieving book statuses", original_error=e) from e
 
 
+    async def get_all_rows(self, skip: int = 0, limit: int = 100, is_available: Optional[bool] = None) -> List[Dict]:
+        """Статусы книг строками-словарями в порядке полей BookStatus."""
+        try:
+            query = select(*BOOK_STATUS_COLUMNS)
+            if is_available is not None:
+                query = query.where(BookStatusModel.is_available == is_available)
+            result = await self._session.execute(query.offset(skip).limit(limit))
+            return [dict(row) for row in result.mappings()]
+        except exc.SQLAlchemyError as e:
+             raise RepositoryError("Database operation failed while retrieving book statuses", original_error=e) from e
+
+
+    async def get_row(self, book_id: UUID) -> Dict | None:
+        try:
+            result = await self._session.execute(
+                select(*BOOK_STATUS_COLUMNS).where(BookStatusModel.book_id == book_id)
+            )
+            row = result.mappings().one_or_none()
+            return dict(row) if row is not None else None
+        except exc.SQLAlchemyError as e:
+            raise RepositoryError(f"Database operation failed while retrieving book status with ID {book_id}", original_error=e) from e
+
+
     async def get(self, book_id: UUID) -> BookStatusModel | None:
         """Получает статус книги по её ID."""
         try:
@@ -96,4 +179,32 @@ class SqlLibraryRepository(ILibraryRepository):
             return deleted_count 
         except exc.SQLAlchemyError as e:
             await self._session.rollback()
-            raise RepositoryError(f"Database operation failed while deleting book status with ID {book_id}", original_error=e) from e
\ No newline at end of file
+            raise RepositoryError(f"Database operation failed while deleting book status with ID {book_id}", original_error=e) from e
+
+
+    async def delete_many(self, book_ids: List[UUID]) -> int:
+        """Удаляет статусы книг одним DELETE. Возвращает количество удаленных."""
+        try:
+            stmt = delete(BookStatusModel).where(BookStatusModel.book_id.in_(book_ids))
+            result = await self._session.execute(stmt)
+            await self._session.commit()
+            return result.rowcount
+        except exc.SQLAlchemyError as e:
+            await self._session.rollback()
+            raise RepositoryError("Database operation failed during bulk book status deletion", original_error=e) from e
+
+
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        try:
+            result = await self._session.execute(range_digest_query(BookStatusModel.book_id, KeyDigestBucketModel, prefix))
+            return to_range_digests(result)
+        except exc.SQLAlchemyError as e:
+            raise RepositoryError(f"Database operation failed while computing digest for range '{prefix}'", original_error=e) from e
+
+
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        try:
+            result = await self._session.execute(ids_in_range_query(BookStatusModel.book_id, prefix, limit))
+            return list(result.scalars().all())
+        except exc.SQLAlchemyError as e:
+            raise RepositoryError(f"Database operation failed while listing IDs in range '{prefix}'", original_error=e) from e
@@ -3,9 +3,10 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, status, Response, HTTPException
 from src.library.schemas import BookStatus, BookStatusCreate
 from src.library.service import LibraryService
-from src.dependencies import get_library_service
+from src.dependencies import get_library_read_service, get_library_service
 from authx import RequestToken
 from src.auth.permissions import require_admin, require_authenticated
+from src.responses import TrustedJSONResponse
 
 router = APIRouter(
     prefix="/library",
@@ -77,9 +78,9 @@ async def delete_book_status(
 async def get_book_status(
     book_id: UUID,
     token: RequestToken = Depends(require_authenticated),
-    library_service: LibraryService = Depends(get_library_service)
+    library_service: LibraryService = Depends(get_library_read_service)
 ):
-    return await library_service.get_book_status(book_id)
+    return TrustedJSONResponse(await library_service.get_book_status_row(book_id))
 
 
 @router.get(
@@ -95,9 +96,9 @@ async def get_book_status(
 )
 async def get_available_books(
     token: RequestToken = Depends(require_authenticated),
-    library_service: LibraryService = Depends(get_library_service)
+    library_service: LibraryService = Depends(get_library_read_service)
 ):
-    return await library_service.get_available_books()
+    return TrustedJSONResponse(await library_service.get_available_book_rows())
 
 
 @router.post(
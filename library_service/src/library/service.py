@@ -1,9 +1,10 @@
-from typing import List
+from typing import Dict, List
 from uuid import UUID
 from datetime import datetime
 from src.library.models import BookStatusModel
 from src.library.repository import ILibraryRepository
 from src.library.schemas import BookStatus
+from common.reconciliation.digest import RangeDigest
 from .exceptions import (
     BookStatusNotFoundError,
     BookNotAvailableError,
@@ -43,6 +44,24 @@ class LibraryService:
              raise ServiceError(f"An unexpected error occurred during deletion for ID {book_id}", original_error=e) from e
 
 
+    async def create_book_statuses(self, book_ids: List[UUID]) -> int:
+        try:
+            return await self._library_repo.create_many(book_ids)
+        except RepositoryError as e:
+            raise ServiceError(f"Database operation failed during bulk creation of {len(book_ids)} statuses", original_error=e) from e
+        except Exception as e:
+            raise ServiceError(f"An unexpected error occurred during bulk creation of {len(book_ids)} statuses", original_error=e) from e
+
+
+    async def delete_book_statuses(self, book_ids: List[UUID]) -> int:
+        try:
+            return await self._library_repo.delete_many(book_ids)
+        except RepositoryError as e:
+            raise ServiceError(f"Database operation failed during bulk deletion of {len(book_ids)} statuses", original_error=e) from e
+        except Exception as e:
+            raise ServiceError(f"An unexpected error occurred during bulk deletion of {len(book_ids)} statuses", original_error=e) from e
+
+
     async def borrow_book(self, book_id: UUID) -> BookStatus:
         try:
             book_status = await self._library_repo.get(book_id)
@@ -122,4 +141,43 @@ class LibraryService:
         except RepositoryError as e:
              raise ServiceError(f"Database operation failed while getting available books", original_error=e) from e
         except Exception as e:
-             raise ServiceError(f"An unexpected error occurred while getting available books", original_error=e) from e
\ No newline at end of file
+             raise ServiceError(f"An unexpected error occurred while getting available books", original_error=e) from e
+
+
+    async def get_book_status_row(self, book_id: UUID) -> Dict:
+        """Быстрый путь get_book_status: строка в форме BookStatus без ORM и повторной валидации."""
+        try:
+            row = await self._library_repo.get_row(book_id)
+            if row is None:
+                raise BookStatusNotFoundError(book_id)
+            return row
+        except BookStatusNotFoundError:
+             raise
+        except RepositoryError as e:
+             raise ServiceError(f"Database operation failed while getting status for ID {book_id}", original_error=e) from e
+        except Exception as e:
+             raise ServiceError(f"An unexpected error occurred while getting status for ID {book_id}", original_error=e) from e
+
+
+    async def get_available_book_rows(self) -> List[Dict]:
+        """Быстрый путь get_available_books, см. get_book_status_row."""
+        try:
+            return await self._library_repo.get_all_rows(is_available=True)
+        except RepositoryError as e:
+             raise ServiceError(f"Database operation failed while getting available books", original_error=e) from e
+        except Exception as e:
+             raise ServiceError(f"An unexpected error occurred while getting available books", original_error=e) from e
+
+
+    async def get_range_digest(self, prefix: str) -> List[RangeDigest]:
+        try:
+            return await self._library_repo.range_digest(prefix)
+        except RepositoryError as e:
+            raise ServiceError(f"Database operation failed during digest of range '{prefix}'", original_error=e) from e
+
+
+    async def get_ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        try:
+            return await self._library_repo.ids_in_range(prefix, limit)
+        except RepositoryError as e:
+            raise ServiceError(f"Database operation failed during listing IDs in range '{prefix}'", original_error=e) from e
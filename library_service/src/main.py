@@ -1,40 +1,136 @@
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from fastapi import FastAPI
 import asyncio
 from src.rabbit.consumer import RabbitMQConsumer
-from src.library.message_listeners import handle_book_event
+from src.rabbit.retry import RetryPolicy
+from common.rabbit.revocations import RevocationConsumer
+from src.auth.auth import revocation_list
+from src.library.message_listeners import handle_book_events
 from src.config import settings
 import logging
 from src.library.router import router
+from src.monitoring.router import router as monitoring_router
+from common.monitoring.http import HTTPMetricsMiddleware
+from src.auth.permissions import is_admin_token
+from common.monitoring.logs import configure_logging
+from common.monitoring.loop import loop_monitor
+from common.monitoring.multiprocess import multiprocess_metrics
+from common.monitoring.memory import install_gc_metrics, memory_tracker
+from common.monitoring.profiling import ProfilingMiddleware, profiler
+from common.monitoring.timing import ServerTimingMiddleware, TimedJSONResponse
+from common.monitoring.tracing import TracingMiddleware, load_exporter, tracer
+from common.monitoring.sql import QueryBudgetMiddleware
+from src.database import replica_router
+from common.replicas import ReadYourWritesMiddleware
+from src.reconciliation.router import router as reconciliation_router
 from src.openapi_config import configure_swagger
 from src.exception_handlers import register_exception_handlers
 
 logger = logging.getLogger(__name__)
 
+configure_logging("library_service", settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLING, settings.LOG_QUEUE_SIZE)
+tracer.configure("library_service", load_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE),
+                 settings.TRACING_SAMPLE_RATIO)
+profiler.configure(settings.PROFILING_DIR, settings.PROFILING_MAX_PER_MINUTE, settings.PROFILING_KEEP)
+install_gc_metrics()
+loop_monitor.configure(settings.LOOP_LAG_INTERVAL_MS / 1000, settings.LOOP_BLOCK_THRESHOLD_MS / 1000)
+if settings.TRACEMALLOC_FRAMES:
+    memory_tracker.start(settings.TRACEMALLOC_FRAMES)
+
 @asynccontextmanager
-async def app_lifespan(app: FastAPI):
-    logger.info("Starting application...")
-    
+async def book_events_consumer(app: FastAPI):
+    """Потребитель событий книг: в веб-процессе или в отдельном (`python -m src.server consumer`).
+
+    Несколько процессов читают одну очередь как конкурирующие потребители; предвыборка
+    RABBITMQ_PREFETCH_COUNT не даёт одному из них забрать себе всю очередь.
+    """
     consumer = RabbitMQConsumer(
         amqp_url=settings.RABBITMQ_URL,
-        queue_name=settings.RABBITMQ_CONSUMER_QUEUE_NAME
+        queue_name=settings.RABBITMQ_CONSUMER_QUEUE_NAME,
+        retry_policy=RetryPolicy(
+            settings.RABBITMQ_CONSUMER_QUEUE_NAME,
+            base_delay_ms=settings.RABBITMQ_RETRY_BASE_DELAY_MS,
+            multiplier=settings.RABBITMQ_RETRY_MULTIPLIER,
+            max_retries=settings.RABBITMQ_MAX_RETRIES,
+        ),
+        prefetch_count=settings.RABBITMQ_PREFETCH_COUNT,
     )
-    consumer.set_handler(handle_book_event)
-    
+    consumer.set_handler(handle_book_events)
+    app.state.rabbitmq_consumer = consumer
+
     consumer_task = asyncio.create_task(consumer.consume())
     app.state.rabbitmq_consumer_task = consumer_task
-    
     logger.info("RabbitMQ consumer started")
-    yield
-    
-    logger.info("Shutting down application...")
-    consumer_task.cancel()
     try:
-        await consumer_task
+        yield
+    finally:
+        consumer_task.cancel()
+        try:
+            await consumer_task
+        except asyncio.CancelledError:
+            logger.info("Consumer stopped gracefully")
+
+
+@asynccontextmanager
+async def app_lifespan(app: FastAPI):
+    loop_monitor.start()
+    await multiprocess_metrics.start()
+    await replica_router.start()
+    logger.info("Starting application...")
+
+    async with AsyncExitStack() as stack:
+        if settings.RABBITMQ_CONSUMER_IN_WEB:
+            await stack.enter_async_context(book_events_consumer(app))
+
+        revocation_consumer = RevocationConsumer(settings.RABBITMQ_URL, revocation_list)
+        revocation_task = asyncio.create_task(revocation_consumer.consume())
+
+        yield
+
+        logger.info("Shutting down application...")
+        revocation_task.cancel()
+        try:
+            await revocation_task
+        except asyncio.CancelledError:
+            pass
+    await replica_router.stop()
+    await multiprocess_metrics.stop()
+    await loop_monitor.stop()
+    tracer.shutdown()
+
+
+@asynccontextmanager
+async def consumer_lifespan(app: FastAPI):
+    loop_monitor.start()
+    await multiprocess_metrics.start()
+    revocation_task = asyncio.create_task(RevocationConsumer(settings.RABBITMQ_URL, revocation_list).consume())
+    async with book_events_consumer(app):
+        yield
+    revocation_task.cancel()
+    try:
+        await revocation_task
     except asyncio.CancelledError:
-        logger.info("Consumer stopped gracefully")
+        pass
+    await multiprocess_metrics.stop()
+    await loop_monitor.stop()
+    tracer.shutdown()
 
-app = FastAPI(lifespan=app_lifespan)
+app = FastAPI(lifespan=app_lifespan, default_response_class=TimedJSONResponse)
 app.include_router(router)
+app.include_router(reconciliation_router)
+app.include_router(monitoring_router)
+app.add_middleware(QueryBudgetMiddleware, budget=settings.SQL_QUERY_BUDGET)
+if replica_router.enabled:
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+app.add_middleware(ServerTimingMiddleware, mode=settings.SERVER_TIMING)
+app.add_middleware(ProfilingMiddleware, authorize=is_admin_token)
+app.add_middleware(TracingMiddleware)
+# Добавляется последним, чтобы быть внешним: в гистограмму попадает время всех middleware.
+app.add_middleware(HTTPMetricsMiddleware)
 configure_swagger(app)
 register_exception_handlers(app)
+
+# Отдельный процесс потребителя: только события книг и эндпоинты мониторинга (/metrics, /admin/queues).
+consumer_app = FastAPI(lifespan=consumer_lifespan, docs_url=None, redoc_url=None, openapi_url=None)
+consumer_app.include_router(monitoring_router)
+consumer_app.add_middleware(HTTPMetricsMiddleware)
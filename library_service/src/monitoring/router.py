@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from authx import RequestToken
+from aio_pika.exceptions import AMQPError, ChannelInvalidStateError
+
+from src.auth.permissions import require_admin
+from src.database import engine, replica_engines, replica_router
+from common.monitoring.router import create_monitoring_router
+
+queues_router = APIRouter()
+
+
+@queues_router.get(
+    "/admin/queues",
+    summary="Глубина очередей событий",
+    description="Количество сообщений и потребителей в основной очереди, очередях повтора и DLQ; очередь, которой нет на брокере, отмечена `exists: false`. Только для администратора.",
+    responses={
+        401: {"description": "Необходима авторизация"},
+        403: {"description": "Нет прав администратора"},
+        503: {"description": "Нет подключения к RabbitMQ"},
+    }
+)
+async def queue_depths(request: Request, token: RequestToken = Depends(require_admin)):
+    consumer = getattr(request.app.state, "rabbitmq_consumer", None)
+    try:
+        if consumer is None:
+            raise ConnectionError("RabbitMQ consumer is not running")
+        return await consumer.queue_depths()
+    except (ConnectionError, AMQPError, ChannelInvalidStateError) as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+
+router = create_monitoring_router(require_admin, engine, replica_engines, replica_router, extra_routes=queues_router)
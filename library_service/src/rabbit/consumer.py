@@ -1,21 +1,57 @@
 import aio_pika
 import logging
-from typing import Callable, Awaitable
-from src.rabbit.schemas import BookEvent
+import time
+from typing import Callable, Awaitable, Dict, List, Optional
+from aio_pika.exceptions import ChannelInvalidStateError, ChannelNotFoundEntity
+from pydantic import ValidationError
+from common.monitoring.metrics import registry
+from common.monitoring.tracing import TRACEPARENT_HEADER, parse_traceparent, tracer
+from common.rabbit.schemas import BookEvent
+from common.rabbit.codec import EventDecodeError, decode_events
+from src.rabbit.retry import RetryPolicy
+from common.rabbit.connection import connect
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+EVENT_LAG = registry.histogram(
+    "book_events_lag_seconds",
+    "Время от публикации события в book_service до начала его обработки",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+HANDLER_DURATION = registry.histogram(
+    "book_events_handler_duration_seconds", "Время обработки одного сообщения", ["outcome"]
+)
+BATCH_SIZE = registry.histogram(
+    "book_events_batch_size", "Количество событий в сообщении",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+MESSAGES = registry.counter(
+    "book_events_messages_total",
+    "Обработанные сообщения по исходу: processed, retried, dead_lettered, requeued",
+    ["outcome"],
+)
+EVENTS = registry.counter("book_events_events_total", "Обработанные события по действию", ["action"])
+REDELIVERED = registry.counter(
+    "book_events_redelivered_total", "Сообщения, повторно доставленные брокером после обрыва или nack"
+)
+RETRY_DELIVERIES = registry.counter(
+    "book_events_retry_deliveries_total", "Сообщения, вернувшиеся из очередей отложенного повтора"
+)
+
 class RabbitMQConsumer:
-    def __init__(self, amqp_url: str, queue_name: str):
+    def __init__(self, amqp_url: str, queue_name: str, retry_policy: Optional[RetryPolicy] = None,
+                 prefetch_count: int = 0):
         self.amqp_url = amqp_url
         self.queue_name = queue_name
+        self.retry_policy = retry_policy or RetryPolicy(queue_name)
+        self.prefetch_count = prefetch_count
         self._handler = None
         self._connection = None
         self._channel = None
 
-    def set_handler(self, handler: Callable[[BookEvent], Awaitable[None]]):
-        """Установка асинхронного обработчика сообщений"""
+    def set_handler(self, handler: Callable[[List[BookEvent]], Awaitable[None]]):
+        """Установка асинхронного обработчика сообщений; обработчик получает все события сообщения сразу"""
         if not asyncio.iscoroutinefunction(handler):
             raise TypeError("Handler must be an async function")
         self._handler = handler
@@ -23,19 +59,23 @@ class RabbitMQConsumer:
     async def _ensure_connection(self):
         """Гарантирует наличие подключения"""
         if not self._connection or self._connection.is_closed:
-            self._connection = await aio_pika.connect_robust(self.amqp_url)
-            self._channel = await self._connection.channel()
+            self._connection = await connect(self.amqp_url)
+            # Подтверждения публикации нужны, чтобы не подтвердить исходное сообщение раньше его копии в retry/DLQ.
+            self._channel = await self._connection.channel(publisher_confirms=True)
+            if self.prefetch_count:
+                await self._channel.set_qos(prefetch_count=self.prefetch_count)
 
     async def consume(self):
         await self._ensure_connection()
-        
+
         exchange = await self._channel.declare_exchange(
             "book_events", aio_pika.ExchangeType.TOPIC, durable=True)
         queue = await self._channel.declare_queue(self.queue_name, durable=True)
         await queue.bind(exchange, routing_key="book.*")
+        await self.retry_policy.declare(self._channel)
 
         logger.info(f"Consumer started for {self.queue_name}")
-        
+
         try:
             await queue.consume(self._process_message)
             while True: await asyncio.sleep(1)
@@ -45,12 +85,91 @@ class RabbitMQConsumer:
             if self._connection:
                 await self._connection.close()
 
-    async def _process_message(self, message: aio_pika.IncomingMessage):
-        async with message.process():
-            try:
-                event = BookEvent.model_validate_json(message.body.decode())
+    async def queue_depths(self) -> List[Dict]:
+        """Глубина основной очереди, очередей повтора и DLQ через пассивное объявление.
+
+        Очередь, которой нет на брокере, возвращается с `exists: false`.
+        """
+        if not self._connection or self._connection.is_closed:
+            raise ConnectionError("RabbitMQ is not connected")
+        policy = self.retry_policy
+        names = [self.queue_name, *(policy.retry_queue(attempt) for attempt in range(policy.max_retries)),
+                 policy.dead_letter_queue]
+        return [await self._queue_depth(name) for name in names]
+
+    async def _queue_depth(self, name: str) -> Dict:
+        # Канал на каждую очередь: пассивное объявление несуществующей очереди закрывает канал.
+        try:
+            channel = await self._connection.channel()
+        except ChannelInvalidStateError as e:
+            raise ConnectionError(f"RabbitMQ is not connected: {e}") from e
+        try:
+            queue = await channel.declare_queue(name, passive=True)
+        except ChannelNotFoundEntity:
+            return {"queue": name, "exists": False, "messages": 0, "consumers": 0}
+        except ChannelInvalidStateError as e:
+            raise ConnectionError(f"RabbitMQ channel closed while probing {name}: {e}") from e
+        finally:
+            if not channel.is_closed:
+                await channel.close()
+        return {
+            "queue": name,
+            "exists": True,
+            "messages": queue.declaration_result.message_count,
+            "consumers": queue.declaration_result.consumer_count,
+        }
+
+    async def _process_message(self, message: aio_pika.abc.AbstractIncomingMessage):
+        if message.redelivered:
+            REDELIVERED.inc()
+        if self.retry_policy.retry_count(message):
+            RETRY_DELIVERIES.inc()
+        try:
+            events = decode_events(message.body, message.content_type)
+        except (EventDecodeError, ValidationError) as e:
+            # Сообщение не разобрать никогда: повторять бессмысленно.
+            logger.error(f"Undecodable message: {e}")
+            await self._reroute(message, e, permanent=True)
+            return
+        BATCH_SIZE.observe(len(events))
+        published_at = events[0].published_at
+        if published_at is not None:
+            EVENT_LAG.observe(max(0.0, time.time() - published_at.timestamp()))
+        started = time.perf_counter()
+        parent = parse_traceparent((message.headers or {}).get(TRACEPARENT_HEADER))
+        try:
+            with tracer.span(f"process book.{events[0].action}", kind="consumer", parent=parent,
+                             **{"messaging.batch_size": len(events),
+                                "messaging.retry_count": self.retry_policy.retry_count(message)}):
                 if self._handler:
-                    await self._handler(event)
-            except Exception as e:
-                logger.error(f"Message failed: {e}")
-                await message.reject(requeue=False)
\ No newline at end of file
+                    await self._handler(events)
+        except Exception as e:
+            HANDLER_DURATION.observe(time.perf_counter() - started, outcome="failed")
+            logger.error(f"Message failed: {e}")
+            await self._reroute(message, e)
+            return
+        HANDLER_DURATION.observe(time.perf_counter() - started, outcome="processed")
+        EVENTS.inc(len(events), action=events[0].action)
+        await message.ack()
+        MESSAGES.inc(outcome="processed")
+
+    async def _reroute(self, message: aio_pika.abc.AbstractIncomingMessage, error: Exception, permanent: bool = False):
+        """Перекладывает сообщение в очередь повтора или в DLQ и только потом подтверждает исходное."""
+        destination = self.retry_policy.next_destination(message, permanent)
+        try:
+            await self._channel.default_exchange.publish(
+                self.retry_policy.failed_copy(message, error), routing_key=destination
+            )
+        except Exception as e:
+            logger.error(f"Cannot move message to {destination}: {e}")
+            # Брокер вернёт сообщение в очередь; без паузы это был бы горячий цикл.
+            await asyncio.sleep(1)
+            await message.nack(requeue=True)
+            MESSAGES.inc(outcome="requeued")
+            return
+        if destination == self.retry_policy.dead_letter_queue:
+            logger.warning(f"Message dead-lettered after {self.retry_policy.retry_count(message)} retries: {error}")
+            MESSAGES.inc(outcome="dead_lettered")
+        else:
+            MESSAGES.inc(outcome="retried")
+        await message.ack()
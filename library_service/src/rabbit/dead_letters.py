@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import logging
+import time
+from typing import Optional
+import aio_pika
+from src.config import settings
+from common.rabbit.connection import connect
+from src.rabbit.retry import (
+    LAST_ERROR_HEADER,
+    REPLAY_COUNT_HEADER,
+    RETRY_COUNT_HEADER,
+    RetryPolicy,
+    copy_message,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def replay_dead_letters(amqp_url: str,
+                              policy: RetryPolicy,
+                              rate: float,
+                              limit: Optional[int] = None) -> int:
+    """Возвращает сообщения из DLQ в основную очередь не быстрее `rate` сообщений в секунду.
+
+    Счётчик повторов сбрасывается, так что каждое сообщение снова получает полный
+    цикл отложенных попыток; число ручных возвратов копится в `x-replay-count`.
+    Сообщение удаляется из DLQ только после подтверждения публикации брокером.
+    """
+    interval = 1.0 / rate
+    replayed = 0
+    connection = await connect(amqp_url)
+    try:
+        channel = await connection.channel(publisher_confirms=True)
+        dead_letters = await channel.declare_queue(policy.dead_letter_queue, durable=True)
+        next_slot = time.monotonic()
+        while limit is None or replayed < limit:
+            message = await dead_letters.get(no_ack=False, fail=False)
+            if message is None:
+                break
+            headers = dict(message.headers or {})
+            headers.pop(RETRY_COUNT_HEADER, None)
+            headers.pop(LAST_ERROR_HEADER, None)
+            headers[REPLAY_COUNT_HEADER] = int(headers.get(REPLAY_COUNT_HEADER, 0)) + 1
+            try:
+                await channel.default_exchange.publish(copy_message(message, headers), routing_key=policy.queue_name)
+            except Exception:
+                await message.nack(requeue=True)
+                raise
+            await message.ack()
+            replayed += 1
+            next_slot += interval
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                next_slot = time.monotonic()
+    finally:
+        await connection.close()
+    return replayed
+
+
+async def count_dead_letters(amqp_url: str, policy: RetryPolicy) -> int:
+    connection = await connect(amqp_url)
+    try:
+        channel = await connection.channel()
+        queue = await channel.declare_queue(policy.dead_letter_queue, durable=True)
+        return queue.declaration_result.message_count
+    finally:
+        await connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Просмотр и повторная отправка сообщений из dead-letter очереди")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("count", help="Количество сообщений в DLQ")
+    replay = subparsers.add_parser("replay", help="Вернуть сообщения из DLQ в основную очередь")
+    replay.add_argument("--rate", type=float, default=10.0, help="Сообщений в секунду")
+    replay.add_argument("--limit", type=int, default=None, help="Не больше N сообщений")
+    args = parser.parse_args()
+
+    policy = RetryPolicy(
+        settings.RABBITMQ_CONSUMER_QUEUE_NAME,
+        base_delay_ms=settings.RABBITMQ_RETRY_BASE_DELAY_MS,
+        multiplier=settings.RABBITMQ_RETRY_MULTIPLIER,
+        max_retries=settings.RABBITMQ_MAX_RETRIES,
+    )
+    if args.command == "count":
+        print(asyncio.run(count_dead_letters(settings.RABBITMQ_URL, policy)))
+    else:
+        replayed = asyncio.run(replay_dead_letters(settings.RABBITMQ_URL, policy, args.rate, args.limit))
+        print(f"Replayed {replayed} message(s) into {policy.queue_name}")
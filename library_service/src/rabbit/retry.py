@@ -0,0 +1,73 @@
+import time
+from typing import Optional
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage
+
+RETRY_COUNT_HEADER = "x-retry-count"
+FIRST_FAILED_AT_HEADER = "x-first-failed-at"
+LAST_ERROR_HEADER = "x-last-error"
+ORIGINAL_ROUTING_KEY_HEADER = "x-original-routing-key"
+REPLAY_COUNT_HEADER = "x-replay-count"
+
+
+class RetryPolicy:
+    """Отложенные повторы через очереди-ступени и финальная dead-letter очередь.
+
+    Для каждой попытки своя очередь `<queue>.retry.<delay>ms` с TTL на уровне очереди:
+    все сообщения в ней живут одинаково, поэтому истекают строго по порядку и
+    не блокируют друг друга. Истёкшее сообщение dead-letter'ом возвращается
+    через exchange по умолчанию в основную очередь. После `max_retries` попыток
+    сообщение уходит в `<queue>.dead` и ждёт ручного replay.
+    """
+
+    def __init__(self, queue_name: str, base_delay_ms: int = 1000, multiplier: int = 4, max_retries: int = 5):
+        self.queue_name = queue_name
+        self.max_retries = max_retries
+        self.delays_ms = [base_delay_ms * multiplier ** attempt for attempt in range(max_retries)]
+        self.dead_letter_queue = f"{queue_name}.dead"
+
+    def retry_queue(self, attempt: int) -> str:
+        return f"{self.queue_name}.retry.{self.delays_ms[attempt]}ms"
+
+    async def declare(self, channel: AbstractChannel) -> None:
+        for attempt, delay_ms in enumerate(self.delays_ms):
+            await channel.declare_queue(
+                self.retry_queue(attempt),
+                durable=True,
+                arguments={
+                    "x-message-ttl": delay_ms,
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": self.queue_name,
+                },
+            )
+        await channel.declare_queue(self.dead_letter_queue, durable=True)
+
+    @staticmethod
+    def retry_count(message: AbstractIncomingMessage) -> int:
+        return int((message.headers or {}).get(RETRY_COUNT_HEADER, 0))
+
+    def next_destination(self, message: AbstractIncomingMessage, permanent: bool = False) -> str:
+        """Очередь, в которую переложить неудачное сообщение."""
+        attempt = self.retry_count(message)
+        if permanent or attempt >= self.max_retries:
+            return self.dead_letter_queue
+        return self.retry_queue(attempt)
+
+    def failed_copy(self, message: AbstractIncomingMessage, error: Exception) -> aio_pika.Message:
+        headers = dict(message.headers or {})
+        headers[RETRY_COUNT_HEADER] = self.retry_count(message) + 1
+        headers.setdefault(FIRST_FAILED_AT_HEADER, int(time.time()))
+        headers.setdefault(ORIGINAL_ROUTING_KEY_HEADER, message.routing_key or "")
+        headers[LAST_ERROR_HEADER] = f"{type(error).__name__}: {error}"[:500]
+        return copy_message(message, headers)
+
+
+def copy_message(message: AbstractIncomingMessage, headers: Optional[dict] = None) -> aio_pika.Message:
+    return aio_pika.Message(
+        body=message.body,
+        content_type=message.content_type,
+        headers=headers if headers is not None else dict(message.headers or {}),
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        message_id=message.message_id,
+    )
+
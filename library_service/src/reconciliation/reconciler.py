@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import List
+from uuid import UUID
+
+import httpx
+
+from src.auth.auth import security
+from src.config import settings
+from src.database import session_factory
+from src.library.repository import SqlLibraryRepository
+from src.library.service import LibraryService
+from common.monitoring.tracing import inject_headers, load_exporter, tracer
+from common.reconciliation.digest import RangeDigest
+
+logger = logging.getLogger(__name__)
+
+
+class IDigestSource(ABC):
+    @abstractmethod
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        ...
+
+    @abstractmethod
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        ...
+
+
+class HttpDigestSource(IDigestSource):
+    """Дайджесты другого сервиса через его /internal/reconciliation."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        response = await self._client.get("/internal/reconciliation/digest", params={"prefix": prefix})
+        response.raise_for_status()
+        return [RangeDigest.model_validate(item) for item in response.json()]
+
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        response = await self._client.get("/internal/reconciliation/ids", params={"prefix": prefix, "limit": limit})
+        response.raise_for_status()
+        return [UUID(item) for item in response.json()]
+
+
+class LocalDigestSource(IDigestSource):
+    def __init__(self, service: LibraryService):
+        self._service = service
+
+    async def range_digest(self, prefix: str) -> List[RangeDigest]:
+        return await self._service.get_range_digest(prefix)
+
+    async def ids_in_range(self, prefix: str, limit: int) -> List[UUID]:
+        return await self._service.get_ids_in_range(prefix, limit)
+
+
+class ReconciliationReport:
+    def __init__(self):
+        self.missing: List[UUID] = []
+        self.extra: List[UUID] = []
+        self.digest_queries = 0
+        self.id_queries = 0
+
+    def __str__(self) -> str:
+        return (f"missing={len(self.missing)} extra={len(self.extra)} "
+                f"digest_queries={self.digest_queries} id_queries={self.id_queries}")
+
+
+class MerkleReconciler:
+    """Сверка множеств ключей двух сервисов по дереву диапазонов UUID.
+
+    На каждом уровне оба сервиса возвращают дайджесты 16 дочерних диапазонов;
+    спускаемся только в расходящиеся. Диапазон не крупнее `leaf_size` сверяется
+    прямым сравнением списков ID. Для совпадающих таблиц это один запрос на сервис:
+    дайджесты первых двух уровней собираются из 4096 предвычисленных корзин
+    (key_digest_buckets), а не из таблицы ключей. Начиная с третьего уровня каждый
+    запрос сканирует диапазон первичного ключа — в среднем 1/4096 таблицы на запрос.
+    """
+
+    def __init__(self, source: IDigestSource, target: IDigestSource, leaf_size: int = 1000):
+        self._source = source
+        self._target = target
+        self._leaf_size = leaf_size
+
+    async def diff(self) -> ReconciliationReport:
+        """ID, которые есть в источнике и нет в цели (missing), и наоборот (extra)."""
+        report = ReconciliationReport()
+        await self._diff_range("", report)
+        return report
+
+    async def _diff_range(self, prefix: str, report: ReconciliationReport) -> None:
+        source_digests, target_digests = await asyncio.gather(
+            self._source.range_digest(prefix), self._target.range_digest(prefix)
+        )
+        report.digest_queries += 2
+        source_by_prefix = {digest.prefix: digest for digest in source_digests}
+        target_by_prefix = {digest.prefix: digest for digest in target_digests}
+
+        for bucket in sorted(source_by_prefix.keys() | target_by_prefix.keys()):
+            source_digest = source_by_prefix.get(bucket)
+            target_digest = target_by_prefix.get(bucket)
+            if source_digest == target_digest:
+                continue
+            largest = max(digest.count for digest in (source_digest, target_digest) if digest is not None)
+            if largest <= self._leaf_size or len(bucket) == 32:
+                await self._diff_leaf(bucket, largest, report)
+            else:
+                await self._diff_range(bucket, report)
+
+    async def _diff_leaf(self, prefix: str, limit: int, report: ReconciliationReport) -> None:
+        source_ids, target_ids = await asyncio.gather(
+            self._source.ids_in_range(prefix, limit), self._target.ids_in_range(prefix, limit)
+        )
+        report.id_queries += 2
+        source_set, target_set = set(source_ids), set(target_ids)
+        report.missing.extend(book_id for book_id in source_ids if book_id not in target_set)
+        report.extra.extend(book_id for book_id in target_ids if book_id not in source_set)
+
+
+async def apply_report(service: LibraryService, report: ReconciliationReport, batch_size: int) -> None:
+    """Создаёт недостающие и удаляет лишние статусы пачками по `batch_size`."""
+    for start in range(0, len(report.missing), batch_size):
+        await service.create_book_statuses(report.missing[start:start + batch_size])
+    for start in range(0, len(report.extra), batch_size):
+        await service.delete_book_statuses(report.extra[start:start + batch_size])
+
+
+async def _inject_traceparent(request: httpx.Request) -> None:
+    inject_headers(request.headers)
+
+
+async def reconcile(book_service_url: str, leaf_size: int, batch_size: int, apply: bool) -> ReconciliationReport:
+    token = security.create_access_token(uid="library-reconciler", data={"role": "admin"})
+    async with httpx.AsyncClient(base_url=book_service_url,
+                                 headers={"Authorization": f"Bearer {token}"},
+                                 event_hooks={"request": [_inject_traceparent]},
+                                 timeout=60.0) as client, session_factory() as session:
+        service = LibraryService(SqlLibraryRepository(session))
+        reconciler = MerkleReconciler(HttpDigestSource(client), LocalDigestSource(service), leaf_size)
+        report = await reconciler.diff()
+        logger.info(f"Reconciliation diff: {report}")
+        if apply:
+            await apply_report(service, report, batch_size)
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сверка book_status с таблицей books в book_service")
+    parser.add_argument("--book-service-url", default=settings.BOOK_SERVICE_URL)
+    parser.add_argument("--leaf-size", type=int, default=settings.RECONCILIATION_LEAF_SIZE)
+    parser.add_argument("--batch-size", type=int, default=settings.RECONCILIATION_BATCH_SIZE)
+    parser.add_argument("--apply", action="store_true", help="Исправить расхождения, а не только показать их")
+    args = parser.parse_args()
+
+    tracer.configure("library_reconciler", load_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE),
+                     settings.TRACING_SAMPLE_RATIO)
+
+    async def traced_reconcile() -> ReconciliationReport:
+        with tracer.span("reconcile book_status", apply=args.apply):
+            return await reconcile(args.book_service_url, args.leaf_size, args.batch_size, args.apply)
+
+    report = asyncio.run(traced_reconcile())
+    tracer.shutdown()
+    print(report)
@@ -0,0 +1,48 @@
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+from authx import RequestToken
+
+from src.auth.permissions import require_admin
+from src.library.service import LibraryService
+from src.dependencies import get_library_service
+from common.reconciliation.digest import PREFIX_PATTERN, RangeDigest
+
+router = APIRouter(prefix="/internal/reconciliation", tags=["internal"])
+
+
+@router.get(
+    "/digest",
+    response_model=List[RangeDigest],
+    summary="Дайджест диапазона ключей",
+    description="Количество и хеш ID книг со статусом по 16 дочерним диапазонам hex-префикса.",
+    responses={
+        401: {"description": "Необходима авторизация"},
+        403: {"description": "Нет прав администратора"},
+    }
+)
+async def get_range_digest(
+    prefix: str = Query("", pattern=PREFIX_PATTERN, description="Hex-префикс UUID"),
+    token: RequestToken = Depends(require_admin),
+    service: LibraryService = Depends(get_library_service)
+):
+    return await service.get_range_digest(prefix)
+
+
+@router.get(
+    "/ids",
+    response_model=List[UUID],
+    summary="ID книг со статусом в диапазоне",
+    description="ID книг со статусом с заданным hex-префиксом в порядке возрастания.",
+    responses={
+        401: {"description": "Необходима авторизация"},
+        403: {"description": "Нет прав администратора"},
+    }
+)
+async def get_ids_in_range(
+    prefix: str = Query(..., pattern=PREFIX_PATTERN, description="Hex-префикс UUID"),
+    limit: int = Query(10_000, ge=1, le=100_000),
+    token: RequestToken = Depends(require_admin),
+    service: LibraryService = Depends(get_library_service)
+):
+    return await service.get_ids_in_range(prefix, limit)
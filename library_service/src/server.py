@@ -0,0 +1,25 @@
+"""Производственный запуск сервиса: `python -m src.server [web|consumer] [--workers N] [--port P]`.
+
+Общее для сервисов — число воркеров, сводный /metrics, параметры uvicorn — в common.server.
+У каждого воркера свой потребитель событий книг: воркеры читают общую очередь как
+конкурирующие потребители.
+
+Роль `consumer` запускает отдельный процесс только с потребителем событий книг и эндпоинтами
+мониторинга; веб-процессы тогда запускаются с RABBITMQ_CONSUMER_IN_WEB=false. Так потребитель
+масштабируется и перезапускается независимо от HTTP.
+"""
+from typing import List, Optional
+
+from src.config import settings
+from common.server import main as run_server
+
+SERVICE = "library_service"
+APPS = {"web": "src.main:app", "consumer": "src.main:consumer_app"}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    run_server(SERVICE, APPS, settings, argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+from common.rabbit.codec import JSON_CONTENT_TYPE
+from src.rabbit.consumer import RabbitMQConsumer
+from src.rabbit.retry import RETRY_COUNT_HEADER, RetryPolicy
+from common.rabbit.schemas import BookEvent
+
+
+def make_message(retry_count=None, body=None):
+    message = MagicMock()
+    message.body = body if body is not None else BookEvent(book_id=uuid4(), action="created").model_dump_json().encode()
+    message.content_type = JSON_CONTENT_TYPE
+    message.headers = {RETRY_COUNT_HEADER: retry_count} if retry_count is not None else {}
+    message.routing_key = "book.created"
+    message.message_id = None
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    return message
+
+
+def make_consumer(handler):
+    consumer = RabbitMQConsumer("amqp://", "books", RetryPolicy("books", base_delay_ms=1000, multiplier=4, max_retries=3))
+    consumer.set_handler(handler)
+    consumer._channel = MagicMock()
+    consumer._channel.default_exchange.publish = AsyncMock()
+    return consumer
+
+
+def test_retry_delays_grow_exponentially():
+    policy = RetryPolicy("books", base_delay_ms=1000, multiplier=4, max_retries=3)
+    assert [policy.retry_queue(attempt) for attempt in range(3)] == \
+        ["books.retry.1000ms", "books.retry.4000ms", "books.retry.16000ms"]
+
+
+@pytest.mark.asyncio
+async def test_success_acks_without_republish():
+    consumer = make_consumer(AsyncMock())
+    message = make_message()
+
+    await consumer._process_message(message)
+
+    message.ack.assert_awaited_once()
+    consumer._channel.default_exchange.publish.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failure_moves_message_to_next_retry_tier():
+    consumer = make_consumer(AsyncMock(side_effect=RuntimeError("db down")))
+    message = make_message(retry_count=1)
+
+    await consumer._process_message(message)
+
+    copy, = consumer._channel.default_exchange.publish.await_args.args
+    assert consumer._channel.default_exchange.publish.await_args.kwargs["routing_key"] == "books.retry.4000ms"
+    assert copy.headers[RETRY_COUNT_HEADER] == 2
+    message.ack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_go_to_dead_letter_queue():
+    consumer = make_consumer(AsyncMock(side_effect=RuntimeError("db down")))
+    message = make_message(retry_count=3)
+
+    await consumer._process_message(message)
+
+    assert consumer._channel.default_exchange.publish.await_args.kwargs["routing_key"] == "books.dead"
+
+
+@pytest.mark.asyncio
+async def test_undecodable_message_is_dead_lettered_immediately():
+    handler = AsyncMock()
+    consumer = make_consumer(handler)
+    message = make_message(body=b"not json")
+
+    await consumer._process_message(message)
+
+    handler.assert_not_awaited()
+    assert consumer._channel.default_exchange.publish.await_args.kwargs["routing_key"] == "books.dead"
+
+
+@pytest.mark.asyncio
+async def test_requeue_when_retry_publish_fails():
+    consumer = make_consumer(AsyncMock(side_effect=RuntimeError("db down")))
+    consumer._channel.default_exchange.publish.side_effect = ConnectionError("broker gone")
+    message = make_message()
+
+    with patch("src.rabbit.consumer.asyncio.sleep", AsyncMock()):
+        await consumer._process_message(message)
+
+    message.nack.assert_awaited_once_with(requeue=True)
+    message.ack.assert_not_awaited()
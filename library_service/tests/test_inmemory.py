@@ -0,0 +1,51 @@
+import aio_pika
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from uuid import uuid4
+from src.rabbit.consumer import EVENT_LAG, MESSAGES, RabbitMQConsumer
+from common.rabbit.inmemory import InMemoryBroker, install_broker
+from src.rabbit.retry import RetryPolicy
+from common.rabbit.schemas import BookEvent
+
+
+@pytest.mark.asyncio
+async def test_consumer_retries_through_delay_queue_over_in_memory_broker():
+    broker = InMemoryBroker()
+    install_broker(broker, "retry")
+    event = BookEvent(book_id=uuid4(), action="created", published_at=datetime.now(timezone.utc))
+    handler = AsyncMock(side_effect=[RuntimeError("db down"), None])
+    consumer = RabbitMQConsumer("memory://retry", "books", RetryPolicy("books", base_delay_ms=10, max_retries=2))
+    consumer.set_handler(handler)
+    consume_task = asyncio.create_task(consumer.consume())
+    await asyncio.sleep(0.01)
+
+    connection = await broker.connect()
+    exchange = await (await connection.channel()).declare_exchange("book_events", aio_pika.ExchangeType.TOPIC)
+    retried_before = MESSAGES.value(outcome="retried")
+    lag_before = EVENT_LAG.count()
+    await exchange.publish(
+        aio_pika.Message(body=event.model_dump_json().encode(), content_type="application/json"),
+        routing_key="book.created",
+    )
+    await asyncio.sleep(0.1)
+
+    assert handler.await_count == 2
+    assert handler.await_args.args[0] == [event]
+    assert broker.stats.dead_lettered == 1
+    assert broker.queue("books.dead").message_count == 0
+    assert MESSAGES.value(outcome="retried") == retried_before + 1
+    assert EVENT_LAG.count() == lag_before + 2
+    depths = await consumer.queue_depths()
+    assert [depth["queue"] for depth in depths] == ["books", "books.retry.10ms", "books.retry.40ms", "books.dead"]
+    assert depths[0]["consumers"] == 1
+    assert all(depth["exists"] for depth in depths)
+    # Пропавшая очередь закрывает свой канал пробы, но не мешает пробе остальных.
+    broker._delete_queue(broker.queue("books.retry.10ms"))
+    depths = await consumer.queue_depths()
+    assert [depth["exists"] for depth in depths] == [True, False, True, True]
+    assert depths[1] == {"queue": "books.retry.10ms", "exists": False, "messages": 0, "consumers": 0}
+    consume_task.cancel()
+    await consume_task
+    broker.close()
@@ -0,0 +1,68 @@
+import pytest
+from collections import defaultdict
+from hashlib import md5
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from common.reconciliation.digest import RangeDigest
+from src.reconciliation.reconciler import IDigestSource, MerkleReconciler, ReconciliationReport, apply_report
+
+
+class InMemoryDigestSource(IDigestSource):
+    """Считает дайджесты так же, как range_digest_query в PostgreSQL."""
+
+    def __init__(self, ids):
+        self.ids = sorted(ids)
+
+    async def range_digest(self, prefix):
+        buckets = defaultdict(lambda: [0, 0])
+        for book_id in self.ids:
+            if book_id.hex.startswith(prefix):
+                bucket = buckets[book_id.hex[:len(prefix) + 1]]
+                bucket[0] += 1
+                bucket[1] += int(md5(str(book_id).encode()).hexdigest()[:15], 16)
+        return [RangeDigest(prefix=p, count=c, hash=str(h)) for p, (c, h) in sorted(buckets.items())]
+
+    async def ids_in_range(self, prefix, limit):
+        return [book_id for book_id in self.ids if book_id.hex.startswith(prefix)][:limit]
+
+
+@pytest.mark.asyncio
+async def test_in_sync_tables_cost_one_digest_query_per_side():
+    ids = [uuid4() for _ in range(5000)]
+    reconciler = MerkleReconciler(InMemoryDigestSource(ids), InMemoryDigestSource(ids), leaf_size=50)
+
+    report = await reconciler.diff()
+
+    assert report.missing == [] and report.extra == []
+    assert report.digest_queries == 2
+    assert report.id_queries == 0
+
+
+@pytest.mark.asyncio
+async def test_diff_finds_missing_and_extra_ids():
+    shared = [uuid4() for _ in range(5000)]
+    missing = [uuid4() for _ in range(3)]
+    extra = [uuid4() for _ in range(2)]
+    reconciler = MerkleReconciler(
+        InMemoryDigestSource(shared + missing), InMemoryDigestSource(shared + extra), leaf_size=50
+    )
+
+    report = await reconciler.diff()
+
+    assert sorted(report.missing) == sorted(missing)
+    assert sorted(report.extra) == sorted(extra)
+    assert report.digest_queries < 2 * 16
+
+
+@pytest.mark.asyncio
+async def test_apply_report_in_batches():
+    report = ReconciliationReport()
+    report.missing = [uuid4() for _ in range(5)]
+    report.extra = [uuid4()]
+    service = AsyncMock()
+
+    await apply_report(service, report, batch_size=2)
+
+    assert [len(call.args[0]) for call in service.create_book_statuses.await_args_list] == [2, 2, 1]
+    service.delete_book_statuses.assert_awaited_once_with(report.extra)
@@ -247,3 +247,38 @@ async def test_get_available_books_repository_error():
     
     with pytest.raises(ServiceError):
         await service.get_available_books()
+
+
+@pytest.mark.asyncio
+async def test_create_book_statuses_bulk():
+    book_ids = [uuid4() for _ in range(3)]
+    mock_repo = AsyncMock()
+    mock_repo.create_many.return_value = 3
+
+    service = LibraryService(mock_repo)
+
+    assert await service.create_book_statuses(book_ids) == 3
+    mock_repo.create_many.assert_awaited_once_with(book_ids)
+
+
+@pytest.mark.asyncio
+async def test_delete_book_statuses_repository_error():
+    mock_repo = AsyncMock()
+    mock_repo.delete_many.side_effect = RepositoryError("DB error")
+
+    service = LibraryService(mock_repo)
+
+    with pytest.raises(ServiceError):
+        await service.delete_book_statuses([uuid4(), uuid4()])
+
+@pytest.mark.asyncio
+async def test_get_book_status_row_not_found():
+    book_id = uuid4()
+    mock_repo = AsyncMock()
+    mock_repo.get_row.return_value = None
+
+    service = LibraryService(mock_repo)
+
+    with pytest.raises(BookStatusNotFoundError):
+        await service.get_book_status_row(book_id)
+    mock_repo.get_row.assert_awaited_once_with(book_id)
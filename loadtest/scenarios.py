@@ -0,0 +1,131 @@
+"""Сценарии пользователей и их смеси (профили нагрузки).
+
+Сценарий — корутина от `ScenarioContext`, выполняющая цепочку запросов. Каждый запрос
+проходит через общий ограничитель частоты и попадает в статистику под именем шаблона
+эндпоинта, а не конкретного URL.
+"""
+import asyncio
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from loadtest.dataset import GENRES, LANGUAGES, book_id
+from loadtest.stats import Recorder
+
+
+class RateLimiter:
+    """Выдаёт моменты отправки с шагом 1/rate; при отставании слот остаётся в прошлом.
+
+    Задержка считается от назначенного слота, а не от фактической отправки, поэтому
+    очередь внутри генератора нагрузки не прячет задержку (coordinated omission).
+    Отставание больше `max_backlog` секунд списывается: не хватает виртуальных
+    пользователей, и это видно по разнице целевой и фактической частоты.
+    """
+
+    def __init__(self, rate: float, max_backlog: float = 1.0):
+        self.interval = 1.0 / rate
+        self.max_backlog = max_backlog
+        self._next = time.perf_counter()
+
+    async def slot(self) -> float:
+        now = time.perf_counter()
+        slot = max(self._next, now - self.max_backlog)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        return slot
+
+
+@dataclass
+class ScenarioContext:
+    clients: Dict[str, httpx.AsyncClient]
+    limiter: RateLimiter
+    recorder: Recorder
+    books: int
+    user_token: str
+    admin_token: str
+    rng: random.Random = field(default_factory=random.Random)
+
+    async def request(self, service: str, method: str, path: str, name: str,
+                      token: Optional[str] = None, **kwargs) -> httpx.Response:
+        slot = await self.limiter.slot()
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        try:
+            response = await self.clients[service].request(method, path, headers=headers, **kwargs)
+        except Exception as e:
+            self.recorder.record(name, time.perf_counter() - slot, None, error=type(e).__name__)
+            raise
+        self.recorder.record(name, time.perf_counter() - slot, response.status_code)
+        return response
+
+    def random_book_id(self) -> uuid.UUID:
+        return book_id(self.rng.randrange(self.books))
+
+
+async def browse_catalog(ctx: ScenarioContext) -> None:
+    """Первые страницы каталога, иногда с фильтром, затем карточка книги."""
+    params = {"skip": ctx.rng.choice((0, 0, 0, 100, 200)), "limit": 100}
+    if ctx.rng.random() < 0.3:
+        params["language"] = ctx.rng.choice(LANGUAGES)
+    await ctx.request("book_service", "GET", "/books/", "GET /books/", ctx.user_token, params=params)
+    await ctx.request("book_service", "GET", f"/books/{ctx.random_book_id()}", "GET /books/{book_id}", ctx.user_token)
+
+
+async def check_availability(ctx: ScenarioContext) -> None:
+    await ctx.request("library_service", "GET", f"/library/status/{ctx.random_book_id()}",
+                      "GET /library/status/{book_id}", ctx.user_token)
+    await ctx.request("library_service", "GET", "/library/available", "GET /library/available", ctx.user_token)
+
+
+async def borrow_and_return(ctx: ScenarioContext, token: Optional[str] = None) -> None:
+    token = token or ctx.user_token
+    target = ctx.random_book_id()
+    await ctx.request("library_service", "GET", f"/library/status/{target}", "GET /library/status/{book_id}", token)
+    borrowed = await ctx.request("library_service", "POST", f"/library/{target}/borrow",
+                                 "POST /library/{book_id}/borrow", token)
+    if borrowed.status_code == 200:
+        await ctx.request("library_service", "POST", f"/library/{target}/return",
+                          "POST /library/{book_id}/return", token)
+
+
+async def user_journey(ctx: ScenarioContext) -> None:
+    """register → login → list → borrow → return."""
+    credentials = {"email": f"load-{uuid.uuid4().hex[:16]}@example.com", "password": "load-test-password"}
+    await ctx.request("user_service", "POST", "/users/register", "POST /users/register", json=credentials)
+    login = await ctx.request("user_service", "POST", "/users/login", "POST /users/login", json=credentials)
+    if login.status_code != 200:
+        return
+    token = login.json()["access_token"]
+    await ctx.request("user_service", "GET", "/users/me", "GET /users/me", token)
+    await ctx.request("book_service", "GET", "/books/", "GET /books/", token, params={"limit": 100})
+    await borrow_and_return(ctx, token)
+
+
+async def catalog_import(ctx: ScenarioContext, size: int = 100) -> None:
+    """Пакет новых книг от администратора: outbox, конверт событий и bulk-вставка статусов."""
+    books = [
+        {
+            "title": f"Imported {uuid.uuid4().hex[:12]}",
+            "author": "Import Author",
+            # Префикс 979 не пересекается с ISBN синтетического каталога (978...).
+            "isbn": f"979{ctx.rng.randrange(10 ** 10):010d}",
+            "language": ctx.rng.choice(LANGUAGES),
+            "genre": ctx.rng.choice(GENRES),
+        }
+        for _ in range(size)
+    ]
+    await ctx.request("book_service", "POST", "/books/bulk", "POST /books/bulk", ctx.admin_token, json=books)
+
+
+Scenario = Callable[[ScenarioContext], Awaitable[None]]
+
+PROFILES: Dict[str, List[Tuple[int, Scenario]]] = {
+    "browse-heavy": [(70, browse_catalog), (20, check_availability), (7, borrow_and_return), (3, user_journey)],
+    "checkout-rush": [(60, borrow_and_return), (25, browse_catalog), (10, check_availability), (5, user_journey)],
+    "catalog-import": [(10, catalog_import), (75, browse_catalog), (15, check_availability)],
+    "journey": [(100, user_journey)],
+}
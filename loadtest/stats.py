@@ -0,0 +1,73 @@
+"""Статистика по эндпоинтам: перцентили задержки, пропускная способность, коды ответов."""
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Перцентиль по ближайшему рангу на отсортированном списке."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.recording = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self) -> None:
+        self.recording = True
+        self.started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        self.recording = False
+        self.finished_at = time.perf_counter()
+
+    def record(self, name: str, latency: float, status: Optional[int], error: Optional[str] = None) -> None:
+        if not self.recording:
+            return
+        self.latencies[name].append(latency)
+        self.statuses[name][error or str(status)] += 1
+
+    def report(self) -> Dict:
+        elapsed = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        endpoints = {}
+        for name in sorted(self.latencies):
+            ordered = sorted(self.latencies[name])
+            statuses = self.statuses[name]
+            endpoints[name] = {
+                "count": len(ordered),
+                "rps": len(ordered) / elapsed if elapsed > 0 else 0.0,
+                "p50_ms": percentile(ordered, 0.50) * 1000,
+                "p95_ms": percentile(ordered, 0.95) * 1000,
+                "p99_ms": percentile(ordered, 0.99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "errors": sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 500),
+                "statuses": dict(statuses),
+            }
+        total = sum(endpoint["count"] for endpoint in endpoints.values())
+        return {
+            "duration_s": elapsed,
+            "requests": total,
+            "rps": total / elapsed if elapsed > 0 else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"{'endpoint':<36} {'count':>8} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}  statuses"
+    ]
+    for name, endpoint in report["endpoints"].items():
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(endpoint["statuses"].items()))
+        lines.append(
+            f"{name:<36} {endpoint['count']:>8} {endpoint['rps']:>8.1f} {endpoint['p50_ms']:>9.1f} "
+            f"{endpoint['p95_ms']:>9.1f} {endpoint['p99_ms']:>9.1f} {endpoint['max_ms']:>9.1f} {endpoint['errors']:>7}  {statuses}"
+        )
+    lines.append(f"total: {report['requests']} requests in {report['duration_s']:.1f} s, {report['rps']:.1f} req/s")
+    return "\n".join(lines)
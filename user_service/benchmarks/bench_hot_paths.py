@@ -0,0 +1,54 @@
+"""Горячие функции user_service: проверка пароля, выпуск и проверка JWT, валидация запросов."""
+from uuid import uuid4
+
+from starlette.requests import Request
+
+from common.benchmarks.harness import benchmark
+from src.auth import security
+from src.config import settings
+from src.users.hashing import pwd_context
+from src.users.schemas import UserRequest
+
+PASSWORD = "correct horse battery staple"
+# Хеш с рабочей стоимостью BCRYPT_ROUNDS: именно его проверяет каждый вход.
+PASSWORD_HASH = pwd_context.hash(PASSWORD)
+
+
+@benchmark(f"hashing.verify[bcrypt,{settings.BCRYPT_ROUNDS}]")
+def verify_password():
+    pwd_context.verify(PASSWORD, PASSWORD_HASH)
+
+
+@benchmark("hashing.needs_update")
+def needs_update():
+    pwd_context.needs_update(PASSWORD_HASH)
+
+
+USER_PAYLOAD = {"email": "reader@example.com", "password": PASSWORD}
+
+
+@benchmark("schemas.UserRequest.model_validate")
+def user_request_validate():
+    UserRequest.model_validate(USER_PAYLOAD)
+
+
+USER_ID = str(uuid4())
+ACCESS_TOKEN = security.create_access_token(uid=USER_ID, data={"role": "user"})
+ACCESS_TOKEN_REQUIRED = security.access_token_required
+REQUEST_SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/users/me",
+    "query_string": b"",
+    "headers": [(b"authorization", f"Bearer {ACCESS_TOKEN}".encode())],
+}
+
+
+@benchmark("auth.create_access_token")
+def create_access_token():
+    security.create_access_token(uid=USER_ID, data={"role": "user"})
+
+
+@benchmark("auth.access_token_required")
+async def access_token_required():
+    await ACCESS_TOKEN_REQUIRED(Request(REQUEST_SCOPE))
@@ -1,5 +1,10 @@
-from authx import AuthX, AuthXConfig
+import jwt
+from authx import AuthX, AuthXConfig, RequestToken, TokenPayload
+from authx.exceptions import RevokedTokenError
+from fastapi import Depends, HTTPException, status
 from src.config import settings
+from common.auth.revocation import RevocationList
+from common.monitoring.timing import mark_admin, timed_auth
 
 config = AuthXConfig(
 JWT_SECRET_KEY=settings.JWT_KEY,
@@ -8,4 +13,39 @@ JWT_ACCESS_TOKEN_EXPIRES=3600,
 JWT_TOKEN_LOCATION=["headers"]
 )
 
-security = AuthX(config)
\ No newline at end of file
+security = AuthX(config)
+# Проверка токена с учётом времени в фазе auth заголовка Server-Timing.
+access_token_required = timed_auth(security.access_token_required)
+
+# Отзывы приходят из stream token_revocations, в том числе собственные: их видит каждый воркер.
+revocation_list = RevocationList(settings.REVOCATION_BLOOM_CAPACITY)
+
+
+async def require_authenticated(token: RequestToken = Depends(access_token_required)) -> RequestToken:
+    if revocation_list.is_token_revoked(token.sub, token.jti):
+        raise RevokedTokenError("Token has been revoked")
+    mark_admin(token)
+    return token
+
+
+async def require_admin(payload: TokenPayload = Depends(access_token_required)) -> TokenPayload:
+    if revocation_list.is_token_revoked(payload.sub, payload.jti):
+        raise RevokedTokenError("Token has been revoked")
+    if "admin" not in getattr(payload, "role", []):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    mark_admin(payload)
+    return payload
+
+
+def is_admin_token(token: str) -> bool:
+    """Проверка токена администратора вне зависимостей FastAPI (для middleware): подпись, срок, тип, отзыв и роль."""
+    try:
+        payload = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=[config.JWT_ALGORITHM])
+    except jwt.PyJWTError:
+        return False
+    if payload.get("type") != "access" or revocation_list.is_token_revoked(payload.get("sub"), payload.get("jti")):
+        return False
+    return "admin" in payload.get("role", [])
@@ -10,15 +10,96 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASS: str
     DB_NAME: str
+    # Построчный лог SQL только для отладки; в остальном запросы учитывает common/monitoring/sql.py.
+    SQL_ECHO: bool = False
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_SLOW_QUERY_SAMPLES: int = 20
+    # Запрос к БД сверх бюджета прерывает HTTP-запрос ошибкой 500; 0 отключает проверку. Для разработки.
+    SQL_QUERY_BUDGET: int = 0
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    # Соединения старше этого числа секунд пересоздаются; -1 — без ограничения.
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Таймаут одной команды asyncpg в секундах; 0 — без ограничения.
+    DB_COMMAND_TIMEOUT: float = 0
+    # Режим для PgBouncer в transaction pooling: без кэша подготовленных запросов.
+    DB_PGBOUNCER: bool = False
+    # Реплики для чтения: DSN через запятую в формате DATABASE_URL; пусто — всё читается с мастера.
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    # Сколько секунд после своей записи клиент читает с мастера. Метка записи приходит cookie recent_write
+    # и заголовком X-Recent-Write; клиент без cookie должен вернуть заголовок сам, иначе может прочитать реплику.
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+
+    RABBITMQ_HOST: str
+    RABBITMQ_PORT: int 
+    RABBITMQ_USER: str
+    RABBITMQ_PASS: str
+    # amqp — настоящий RabbitMQ; memory — брокер-заглушка в памяти процесса (src/rabbit/inmemory.py)
+    RABBITMQ_BACKEND: str = "amqp"
 
 
     JWT_KEY: str
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+
+
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_TARGET_MS: int = 250
+
+    # Трассировка: пусто — выключена; json — в TRACING_FILE; log — в лог; модуль:фабрика — свой экспортёр.
+    TRACING_EXPORTER: str = ""
+    TRACING_FILE: str = "traces.jsonl"
+    # Доля трасс, начатых в этом сервисе, которые записываются; пришедшие извне следуют решению источника.
+    TRACING_SAMPLE_RATIO: float = 0.1
+
+    # Заголовок Server-Timing с разбивкой времени запроса: off | admin (только токены администратора) | all.
+    SERVER_TIMING: str = "admin"
+
+    # Профилирование запросов по X-Profile: 1 с токеном администратора; 0 профилей в минуту — выключено.
+    PROFILING_MAX_PER_MINUTE: int = 6
+    PROFILING_DIR: str = "profiles"
+    PROFILING_KEEP: int = 20
+
+    # Глубина стека tracemalloc при старте сервиса; 0 — выключен (включается через /admin/memory).
+    TRACEMALLOC_FRAMES: int = 0
+
+    # Замер задержки event loop раз в LOOP_LAG_INTERVAL_MS (0 — выключен); блокировки дольше
+    # LOOP_BLOCK_THRESHOLD_MS пишутся в лог со стеком того, что выполнялось (0 — без стеков).
+    LOOP_LAG_INTERVAL_MS: int = 100
+    LOOP_BLOCK_THRESHOLD_MS: int = 250
+
+    # Логи пишутся в stdout из отдельного потока: json | text. LOG_SAMPLING — доли записей ниже
+    # WARNING по префиксам логгеров, например `uvicorn.access=0.1`; лишнее сверх очереди отбрасывается.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLING: str = ""
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Запуск через `python -m src.server`; 0 воркеров — по числу CPU, доступных контейнеру.
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8002
+    SERVER_WORKERS: int = 0
+    # Keep-alive дольше простоя соединения у балансировщика, иначе он пишет в уже закрытое соединение и отдаёт 502.
+    SERVER_KEEPALIVE_S: int = 75
+    # Очередь принятых ядром соединений; сверху её ограничивает net.core.somaxconn.
+    SERVER_BACKLOG: int = 2048
+    SERVER_ACCESS_LOG: bool = True
 
     @property
     def DATABASE_URL(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
-   
+    @property
+    def RABBITMQ_URL(self):
+        if self.RABBITMQ_BACKEND == "memory":
+            return "memory://default"
+        return f"amqp://{self.RABBITMQ_USER}:{self.RABBITMQ_PASS}@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/"
+
     model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
\ No newline at end of file
@@ -1,8 +1,13 @@
-from src.database import get_session
+from src.database import get_read_session, get_session
 from src.users.repository import SqlUserRepository, IUserRepository
 from src.users.service import UserService
+from src.users.tasks import rehash_password
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends
+from fastapi import BackgroundTasks, Depends
+from functools import partial
+from src.rabbit.dependencies import get_rabbit_producer
+from src.rabbit.producer import RabbitMQProducer
+from src.auth import revocation_list
 
 
 async def get_user_repository(
@@ -11,6 +16,18 @@ async def get_user_repository(
     return SqlUserRepository(session)
 
 async def get_user_service(
+    background_tasks: BackgroundTasks,
     repo: IUserRepository = Depends(get_user_repository),
+    producer: RabbitMQProducer = Depends(get_rabbit_producer),
 ) -> UserService:
-    return UserService(repo)
\ No newline at end of file
+    return UserService(repo, producer, rehash_scheduler=partial(background_tasks.add_task, rehash_password),
+                       revocations=revocation_list)
+
+async def get_user_read_service(
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_read_session),
+    producer: RabbitMQProducer = Depends(get_rabbit_producer),
+) -> UserService:
+    """Сервис для обработчиков только на чтение: сессия может быть открыта на реплике."""
+    return UserService(SqlUserRepository(session), producer, rehash_scheduler=partial(background_tasks.add_task, rehash_password),
+                       revocations=revocation_list)
\ No newline at end of file
@@ -6,7 +6,7 @@ from starlette.status import (
     HTTP_404_NOT_FOUND,
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
-from authx.exceptions import MissingTokenError, JWTDecodeError
+from authx.exceptions import MissingTokenError, JWTDecodeError, RevokedTokenError
 from src.users.exceptions import (
     UserNotFoundError,
     EmailAlreadyExistsError,
@@ -33,6 +33,13 @@ async def jwt_decode_exception_handler(request: Request, exc: JWTDecodeError):
     )
 
 
+async def revoked_token_handler(request: Request, exc: RevokedTokenError):
+    return JSONResponse(
+        status_code=HTTP_401_UNAUTHORIZED,
+        content={"detail": "Token has been revoked"},
+    )
+
+
 async def user_not_found_exception_handler(request: Request, exc: UserNotFoundError):
     return JSONResponse(
         status_code=HTTP_404_NOT_FOUND,
@@ -64,6 +71,7 @@ async def service_error_handler(request: Request, exc: ServiceError):
 def register_user_exception_handlers(app):
     app.add_exception_handler(MissingTokenError, missing_token_exception_handler)
     app.add_exception_handler(JWTDecodeError, jwt_decode_exception_handler)
+    app.add_exception_handler(RevokedTokenError, revoked_token_handler)
     app.add_exception_handler(UserNotFoundError, user_not_found_exception_handler)
     app.add_exception_handler(EmailAlreadyExistsError, email_exists_exception_handler)
     app.add_exception_handler(InvalidCredentialsError, invalid_credentials_exception_handler)
@@ -1,11 +1,83 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+import logging
+from src.config import settings
+from src.rabbit.producer import RabbitMQProducer
 from src.users.router import router
+from src.monitoring.router import router as monitoring_router
+from common.monitoring.http import HTTPMetricsMiddleware
+from src.auth import is_admin_token, revocation_list
+from common.rabbit.revocations import RevocationConsumer
+from common.monitoring.logs import configure_logging
+from common.monitoring.loop import loop_monitor
+from common.monitoring.multiprocess import multiprocess_metrics
+from common.monitoring.memory import install_gc_metrics, memory_tracker
+from common.monitoring.profiling import ProfilingMiddleware, profiler
+from common.monitoring.timing import ServerTimingMiddleware, TimedJSONResponse
+from common.monitoring.tracing import TracingMiddleware, load_exporter, tracer
+from common.monitoring.sql import QueryBudgetMiddleware
+from src.database import replica_router
+from common.replicas import ReadYourWritesMiddleware
 from src.openapi_config import configure_swagger
 from src.exception_handlers import register_user_exception_handlers
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+configure_logging("user_service", settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLING, settings.LOG_QUEUE_SIZE)
+tracer.configure("user_service", load_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE),
+                 settings.TRACING_SAMPLE_RATIO)
+profiler.configure(settings.PROFILING_DIR, settings.PROFILING_MAX_PER_MINUTE, settings.PROFILING_KEEP)
+install_gc_metrics()
+loop_monitor.configure(settings.LOOP_LAG_INTERVAL_MS / 1000, settings.LOOP_BLOCK_THRESHOLD_MS / 1000)
+if settings.TRACEMALLOC_FRAMES:
+    memory_tracker.start(settings.TRACEMALLOC_FRAMES)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_monitor.start()
+    await multiprocess_metrics.start()
+    await replica_router.start()
+    producer = RabbitMQProducer(settings.RABBITMQ_URL)
+    if await producer.connect():
+        logger.info("RabbitMQ producer connected successfully")
+    else:
+        logger.error("Failed to connect RabbitMQ, revocations will be retried on demand")
+    app.state.rabbitmq_producer = producer
+
+    revocation_task = asyncio.create_task(RevocationConsumer(settings.RABBITMQ_URL, revocation_list).consume())
+
+    yield
+
+    revocation_task.cancel()
+    try:
+        await revocation_task
+    except asyncio.CancelledError:
+        pass
+
+    try:
+        await producer.disconnect()
+        logger.info("RabbitMQ producer disconnected")
+    except Exception as e:
+        logger.error(f"Error disconnecting RabbitMQ: {str(e)}")
+
+    await replica_router.stop()
+    await multiprocess_metrics.stop()
+    await loop_monitor.stop()
+    tracer.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=TimedJSONResponse)
 app.include_router(router)
+app.include_router(monitoring_router)
+app.add_middleware(QueryBudgetMiddleware, budget=settings.SQL_QUERY_BUDGET)
+if replica_router.enabled:
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+app.add_middleware(ServerTimingMiddleware, mode=settings.SERVER_TIMING)
+app.add_middleware(ProfilingMiddleware, authorize=is_admin_token)
+app.add_middleware(TracingMiddleware)
+# Добавляется последним, чтобы быть внешним: в гистограмму попадает время всех middleware.
+app.add_middleware(HTTPMetricsMiddleware)
 
 configure_swagger(app)
 register_user_exception_handlers(app)
@@ -0,0 +1,5 @@
+from src.auth import require_admin
+from src.database import engine, replica_engines, replica_router
+from common.monitoring.router import create_monitoring_router
+
+router = create_monitoring_router(require_admin, engine, replica_engines, replica_router)
@@ -0,0 +1,78 @@
+import aio_pika
+from datetime import datetime
+from typing import Optional
+from common.monitoring.metrics import registry
+from common.monitoring.timing import phase
+from common.monitoring.tracing import inject_headers, tracer
+from common.rabbit.connection import connect
+from common.rabbit.revocations import TokenRevocation, declare_revocations
+import logging
+
+logger = logging.getLogger(__name__)
+
+REVOCATIONS = registry.counter(
+    "token_revocations_published_total", "Рассылки отзыва токенов по исходу: sent, expired, failed", ["outcome"]
+)
+
+
+class RabbitMQProducer:
+    def __init__(self, amqp_url: str):
+        self.amqp_url = amqp_url
+        self.connection = None
+        self.channel = None
+        self.exchange = None
+
+    async def connect(self):
+        try:
+            self.connection = await connect(self.amqp_url)
+            self.channel = await self.connection.channel()
+            # Stream объявляется до первой публикации: отзыв сохраняется, даже если потребителей ещё нет.
+            self.exchange, _ = await declare_revocations(self.channel)
+            logger.info("Connected to RabbitMQ")
+            return True
+        except Exception as e:
+            logger.error(f"Connection error: {str(e)}")
+            return False
+
+    async def is_connected(self):
+        return self.connection and not self.connection.is_closed
+
+    async def send_revocation(self, expires_at: datetime, sub: Optional[str] = None, jti: Optional[str] = None):
+        """Рассылает отзыв токенов всем сервисам-потребителям.
+
+        Отзыв уже истёкших токенов не публикуется; остальные stream хранит дольше срока жизни токена.
+        """
+        if not await self.is_connected():
+            if not await self.connect():
+                raise ConnectionError("RabbitMQ connection failed")
+
+        with tracer.span("publish token revocation", kind="producer") as span, phase("publish"):
+            try:
+                revocation = TokenRevocation(sub=sub, jti=jti, expires_at=expires_at)
+                ttl = (expires_at - datetime.now(expires_at.tzinfo)).total_seconds()
+                if ttl <= 0:
+                    REVOCATIONS.inc(outcome="expired")
+                    return True
+                await self.exchange.publish(
+                    aio_pika.Message(
+                        body=revocation.model_dump_json().encode(),
+                        content_type="application/json",
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                        headers=inject_headers({}),
+                    ),
+                    routing_key=""
+                )
+                logger.debug(f"Sent revocation: {revocation}")
+                REVOCATIONS.inc(outcome="sent")
+                return True
+            except Exception as e:
+                logger.error(f"Error sending revocation: {str(e)}")
+                if span is not None:
+                    span.status = "error"
+                REVOCATIONS.inc(outcome="failed")
+                return False
+
+    async def disconnect(self):
+        if self.connection and not self.connection.is_closed:
+            await self.connection.close()
+            logger.info("Disconnected from RabbitMQ")
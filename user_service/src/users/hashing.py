@@ -0,0 +1,60 @@
+import argparse
+import statistics
+import time
+from passlib.context import CryptContext
+from src.config import settings
+
+# bcrypt не принимает стоимость ниже 4 и выше 31; ниже BCRYPT_MIN_ROUNDS не опускаемся сами.
+BCRYPT_MAX_ROUNDS = 31
+
+
+def build_pwd_context(rounds: int) -> CryptContext:
+    """Контекст, для которого любой хеш с другой стоимостью считается устаревшим (`needs_update`)."""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def measure_hash_ms(rounds: int, samples: int = 3) -> float:
+    """Медианное время одного bcrypt-хеширования на этой машине, в миллисекундах."""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = settings.BCRYPT_MIN_ROUNDS, samples: int = 3) -> int:
+    """Подбирает максимальную стоимость bcrypt, укладывающуюся в бюджет `target_ms`.
+
+    Каждый раунд удваивает время, поэтому измеряем нижнюю границу, экстраполируем
+    и проверяем кандидата замером, отступая на раунд вниз при промахе.
+    """
+    base_ms = measure_hash_ms(min_rounds, samples)
+    rounds = min_rounds
+    while rounds < BCRYPT_MAX_ROUNDS and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+    while rounds > min_rounds and measure_hash_ms(rounds, samples) > target_ms:
+        rounds -= 1
+    return rounds
+
+
+pwd_context = build_pwd_context(settings.BCRYPT_ROUNDS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Подбор стоимости bcrypt под бюджет задержки на текущем железе")
+    parser.add_argument("--target-ms", type=float, default=settings.BCRYPT_TARGET_MS)
+    parser.add_argument("--min-rounds", type=int, default=settings.BCRYPT_MIN_ROUNDS)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms, args.min_rounds, args.samples)
+    print(f"# ~{measure_hash_ms(rounds, args.samples):.0f} ms per hash (target {args.target_ms:.0f} ms)")
+    print(f"BCRYPT_ROUNDS={rounds}")
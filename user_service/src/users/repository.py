@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, exc
+from sqlalchemy import select, delete, update, exc
 from uuid import UUID
 from src.users.models import UserModel
 from src.users.exceptions import UserNotFoundError, EmailAlreadyExistsError, RepositoryError
+from common.monitoring.timing import timed_methods
+from common.monitoring.tracing import traced_methods
 
 
 class IUserRepository(ABC):
@@ -20,7 +22,12 @@ class IUserRepository(ABC):
     @abstractmethod
     async def get_by_email(self, email: str) -> Optional[UserModel]: ...
 
+    @abstractmethod
+    async def update_password(self, user_id: UUID, old_hash: str, new_hash: str) -> int: ...
+
 
+@traced_methods
+@timed_methods("db")
 class SqlUserRepository(IUserRepository):
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -67,4 +74,19 @@ class SqlUserRepository(IUserRepository):
             )
             return result.scalar_one_or_none()
         except exc.SQLAlchemyError as e:
-            raise RepositoryError(f"Database error during getting user by email {email}", original_error=e) from e
\ No newline at end of file
+            raise RepositoryError(f"Database error during getting user by email {email}", original_error=e) from e
+
+    async def update_password(self, user_id: UUID, old_hash: str, new_hash: str) -> int:
+        try:
+            # Условие по старому хешу не даёт затереть пароль, сменившийся параллельно.
+            stmt = (
+                update(UserModel)
+                .where(UserModel.id == user_id, UserModel.password == old_hash)
+                .values(password=new_hash)
+            )
+            result = await self._session.execute(stmt)
+            await self._session.commit()
+            return result.rowcount
+        except exc.SQLAlchemyError as e:
+            await self._session.rollback()
+            raise RepositoryError(f"Database error during updating password of user with ID {user_id}", original_error=e) from e
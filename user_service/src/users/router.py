@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from uuid import UUID
 from src.users.service import UserService
 from src.users.schemas import UserResponse, UserRequest, Token
-from src.dependencies import get_user_service
-from src.auth import security
-from authx import RequestToken
+from src.dependencies import get_user_read_service, get_user_service
+from src.auth import require_authenticated, security
+from authx import RequestToken, TokenPayload
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -58,6 +58,24 @@ async def login(
     return {"access_token": token, "token_type": "bearer"}
 
 
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Выйти из системы",
+    description="Отзывает текущий токен доступа во всех сервисах.",
+    response_description="Токен отозван",
+    responses={
+        204: {"description": "Токен отозван"},
+        401: {"description": "Необходима авторизация"},
+    },
+)
+async def logout(
+    token: TokenPayload = Depends(require_authenticated),
+    service: UserService = Depends(get_user_service),
+):
+    await service.logout(token.jti, token.exp)
+
+
 @router.get(
     "/me",
     response_model=UserResponse,
@@ -71,8 +89,8 @@ async def login(
     },
 )
 async def get_me(
-    token: RequestToken = Depends(security.access_token_required),
-    service: UserService = Depends(get_user_service),
+    token: RequestToken = Depends(require_authenticated),
+    service: UserService = Depends(get_user_read_service),
 ):
     return await service.get_user(UUID(token.sub))
 
@@ -92,7 +110,7 @@ async def get_me(
 )
 async def delete_user(
     user_id: UUID,
-    token: RequestToken = Depends(security.access_token_required),
+    token: RequestToken = Depends(require_authenticated),
     service: UserService = Depends(get_user_service),
 ):
     if str(token.sub) != str(user_id):
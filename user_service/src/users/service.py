@@ -2,7 +2,13 @@ from src.users.repository import IUserRepository
 from src.users.schemas import UserResponse, UserRequest, UserRole
 from src.users.models import UserModel
 from uuid import UUID
-from passlib.context import CryptContext
+from datetime import datetime, timezone
+from typing import Callable, Optional
+import logging
+from src.auth import security
+from src.users.hashing import pwd_context
+from src.rabbit.producer import RabbitMQProducer
+from common.auth.revocation import RevocationList
 from src.users.exceptions import (
     UserNotFoundError, 
     EmailAlreadyExistsError, 
@@ -11,10 +17,19 @@ from src.users.exceptions import (
     ServiceError
 )
 
+logger = logging.getLogger(__name__)
+
 class UserService:
-    def __init__(self, repo: IUserRepository):
+    def __init__(self,
+                 repo: IUserRepository,
+                 producer: Optional[RabbitMQProducer] = None,
+                 rehash_scheduler: Optional[Callable[[UUID, str, str], None]] = None,
+                 revocations: Optional[RevocationList] = None):
         self._repo = repo
-        self._pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self._producer = producer
+        self._revocations = revocations
+        self._pwd_context = pwd_context
+        self._rehash_scheduler = rehash_scheduler
 
     async def create_user(self, user_req: UserRequest) -> UserResponse:
         try:
@@ -62,6 +77,10 @@ class UserService:
             deleted_count = await self._repo.delete(user_id)
             if deleted_count == 0:
                 raise UserNotFoundError(str(user_id))
+            # Все токены удалённого пользователя истекут не позже, чем через JWT_ACCESS_TOKEN_EXPIRES.
+            expires_at = datetime.now(timezone.utc) + security.config.JWT_ACCESS_TOKEN_EXPIRES
+            if not await self._revoke(expires_at, sub=str(user_id)):
+                logger.error(f"Failed to publish token revocation for deleted user {user_id}")
         except RepositoryError as e:
             raise ServiceError(f"Repository error occurred while deleting user: {e}", original_error=e) from e
         except UserNotFoundError:
@@ -76,6 +95,8 @@ class UserService:
                 raise UserNotFoundError(user_req.email)
             if not self._pwd_context.verify(user_req.password, user.password):
                 raise InvalidCredentialsError()
+            if self._rehash_scheduler and self._pwd_context.needs_update(user.password):
+                self._rehash_scheduler(user.id, user.password, user_req.password)
             return UserResponse(
                 id=user.id,
                 email=user.email,
@@ -87,3 +108,28 @@ class UserService:
             raise
         except Exception as e:
             raise ServiceError("Unexpected error occurred during login attempt", original_error=e) from e
+
+    async def logout(self, jti: str, expires_at: datetime) -> None:
+        try:
+            if not await self._revoke(expires_at, jti=jti):
+                raise ServiceError("Failed to publish token revocation")
+        except ServiceError:
+            raise
+        except Exception as e:
+            raise ServiceError("Unexpected error occurred during logout", original_error=e) from e
+
+    async def _revoke(self, expires_at: datetime, sub: Optional[str] = None, jti: Optional[str] = None) -> bool:
+        if self._producer is None:
+            return False
+        try:
+            sent = await self._producer.send_revocation(expires_at, sub=sub, jti=jti)
+        except ConnectionError as e:
+            logger.error(f"RabbitMQ unavailable for token revocation: {e}")
+            return False
+        # Свой процесс отклоняет токен сразу, не дожидаясь отзыва из stream.
+        if sent and self._revocations is not None:
+            if sub:
+                self._revocations.revoke(f"sub:{sub}", expires_at.timestamp())
+            if jti:
+                self._revocations.revoke(f"jti:{jti}", expires_at.timestamp())
+        return sent
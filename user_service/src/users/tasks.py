@@ -0,0 +1,24 @@
+import asyncio
+import logging
+from uuid import UUID
+from src.database import get_session
+from src.users.hashing import pwd_context
+from src.users.repository import SqlUserRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def rehash_password(user_id: UUID, old_hash: str, password: str) -> None:
+    """Перехеширует пароль под текущую стоимость bcrypt после успешного входа.
+
+    Выполняется фоновой задачей после отправки ответа; сам bcrypt уходит в поток,
+    чтобы не блокировать event loop.
+    """
+    try:
+        new_hash = await asyncio.to_thread(pwd_context.hash, password)
+        async for session in get_session():
+            updated = await SqlUserRepository(session).update_password(user_id, old_hash, new_hash)
+            if updated:
+                logger.info(f"Password hash upgraded for user {user_id}")
+    except Exception as e:
+        logger.error(f"Password rehash failed for user {user_id}: {e}")
@@ -1,7 +1,10 @@
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
+from datetime import datetime, timedelta, timezone
 from src.users.service import UserService
+from common.auth.revocation import RevocationList
+from src.users.hashing import build_pwd_context
 from src.users.schemas import UserRequest, UserRole
 from src.users.exceptions import (
     EmailAlreadyExistsError,
@@ -130,3 +133,79 @@ async def test_login_invalid_password(user_service, mock_repo):
 
     with pytest.raises(InvalidCredentialsError):
         await user_service.login(user_req)
+
+@pytest.mark.asyncio
+async def test_delete_user_publishes_sub_revocation(mock_repo):
+    mock_repo.delete.return_value = 1
+    mock_producer = AsyncMock()
+    mock_producer.send_revocation.return_value = True
+    service = UserService(mock_repo, mock_producer)
+    fake_user_id = uuid4()
+
+    await service.delete_user(fake_user_id)
+
+    mock_producer.send_revocation.assert_awaited_once()
+    assert mock_producer.send_revocation.await_args.kwargs["sub"] == str(fake_user_id)
+
+@pytest.mark.asyncio
+async def test_delete_user_revocation_failure_does_not_fail_delete(mock_repo):
+    mock_repo.delete.return_value = 1
+    mock_producer = AsyncMock()
+    mock_producer.send_revocation.side_effect = ConnectionError("RabbitMQ connection failed")
+    service = UserService(mock_repo, mock_producer)
+
+    await service.delete_user(uuid4())
+
+    mock_repo.delete.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_logout_publishes_jti_revocation(mock_repo):
+    mock_producer = AsyncMock()
+    mock_producer.send_revocation.return_value = True
+    revocations = RevocationList(capacity=10)
+    service = UserService(mock_repo, mock_producer, revocations=revocations)
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    await service.logout("token-jti", expires_at)
+
+    mock_producer.send_revocation.assert_awaited_once_with(expires_at, sub=None, jti="token-jti")
+    assert revocations.is_token_revoked("user-1", "token-jti")
+
+@pytest.mark.asyncio
+async def test_logout_publish_failure(mock_repo):
+    mock_producer = AsyncMock()
+    mock_producer.send_revocation.return_value = False
+    service = UserService(mock_repo, mock_producer)
+
+    with pytest.raises(ServiceError):
+        await service.logout("token-jti", datetime.now(timezone.utc) + timedelta(minutes=5))
+
+@pytest.mark.asyncio
+async def test_login_schedules_rehash_for_outdated_hash(mock_repo):
+    scheduler = MagicMock()
+    service = UserService(mock_repo, rehash_scheduler=scheduler)
+    user_in_db = AsyncMock()
+    user_in_db.id = uuid4()
+    user_in_db.email = "old@example.com"
+    user_in_db.role = UserRole.user
+    user_in_db.password = build_pwd_context(4).hash("password123")
+    mock_repo.get_by_email.return_value = user_in_db
+
+    await service.login(UserRequest(email="old@example.com", password="password123"))
+
+    scheduler.assert_called_once_with(user_in_db.id, user_in_db.password, "password123")
+
+@pytest.mark.asyncio
+async def test_login_does_not_rehash_current_hash(mock_repo):
+    scheduler = MagicMock()
+    service = UserService(mock_repo, rehash_scheduler=scheduler)
+    user_in_db = AsyncMock()
+    user_in_db.id = uuid4()
+    user_in_db.email = "new@example.com"
+    user_in_db.role = UserRole.user
+    user_in_db.password = service._pwd_context.hash("password123")
+    mock_repo.get_by_email.return_value = user_in_db
+
+    await service.login(UserRequest(email="new@example.com", password="password123"))
+
+    scheduler.assert_not_called()